@@ -17,7 +17,7 @@ router = APIRouter(tags=["alerts"])
 
 @router.post("/alerts", response_model=AlertResponse, status_code=201)
 @limiter.limit(settings.RATE_LIMIT_API)
-async def create_new_alert(
+def create_new_alert(
     request: Request,
     alert_data: AlertCreate,
     db: Session = Depends(get_db),
@@ -35,7 +35,7 @@ async def create_new_alert(
 
 @router.get("/alerts", response_model=list[AlertResponse])
 @limiter.limit(settings.RATE_LIMIT_API)
-async def list_alerts(
+def list_alerts(
     request: Request,
     email: str = Query(..., description="이메일 주소"),
     db: Session = Depends(get_db),
@@ -53,7 +53,7 @@ async def list_alerts(
 
 @router.delete("/alerts/{alert_id}")
 @limiter.limit(settings.RATE_LIMIT_API)
-async def remove_alert(
+def remove_alert(
     request: Request,
     alert_id: int,
     db: Session = Depends(get_db),
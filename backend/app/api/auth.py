@@ -26,7 +26,7 @@ router = APIRouter(tags=["auth"])
 
 @router.post("/auth/register", response_model=UserResponse, status_code=201)
 @limiter.limit(settings.RATE_LIMIT_AUTH)
-async def register(request: Request, data: UserRegister, db: Session = Depends(get_db)):
+def register(request: Request, data: UserRegister, db: Session = Depends(get_db)):
     """회원가입"""
     existing = db.query(User).filter(User.email == data.email).first()
     if existing:
@@ -49,7 +49,7 @@ async def register(request: Request, data: UserRegister, db: Session = Depends(g
 
 @router.post("/auth/login", response_model=TokenResponse)
 @limiter.limit(settings.RATE_LIMIT_AUTH)
-async def login(request: Request, data: UserLogin, db: Session = Depends(get_db)):
+def login(request: Request, data: UserLogin, db: Session = Depends(get_db)):
     """로그인"""
     user = db.query(User).filter(User.email == data.email).first()
     if not user or not user.hashed_password or not verify_password(data.password, user.hashed_password):
@@ -72,7 +72,7 @@ async def login(request: Request, data: UserLogin, db: Session = Depends(get_db)
 
 @router.post("/auth/refresh", response_model=TokenResponse)
 @limiter.limit(settings.RATE_LIMIT_AUTH)
-async def refresh_token(request: Request, data: TokenRefresh, db: Session = Depends(get_db)):
+def refresh_token(request: Request, data: TokenRefresh, db: Session = Depends(get_db)):
     """토큰 갱신"""
     payload = decode_token(data.refresh_token)
     if payload.get("type") != "refresh":
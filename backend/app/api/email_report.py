@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.executors import run_db
 from app.core.rate_limit import limiter
 from app.services.price_service import get_current_prices
 from app.services.prediction_service import get_predictions
@@ -34,13 +35,16 @@ async def send_report(
     """대시보드 예측 결과를 이메일로 전송"""
     smtp_configured = bool(settings.SMTP_USER and settings.SMTP_PASSWORD)
 
-    # --- Gather data ---
-    prices = get_current_prices(db)
-    forecasts = {}
-    for grade in GRADES:
-        preds = get_predictions(db, grade)
-        if preds:
-            forecasts[grade] = preds
+    # --- Gather data (sync queries, off the event loop) ---
+    def gather():
+        forecasts = {}
+        for grade in GRADES:
+            preds = get_predictions(db, grade)
+            if preds:
+                forecasts[grade] = preds
+        return get_current_prices(db), forecasts
+
+    prices, forecasts = await run_db(gather)
 
     # --- Build HTML email ---
     today = date.today().isoformat()
@@ -1,14 +1,15 @@
 from datetime import date, timedelta
+from functools import partial
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Query, Request
 from pydantic import BaseModel
-from sqlalchemy import desc, func
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.cache import cache_get, cache_set
+from app.core.cache import cache_fetch_async
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import gather_scalars, get_async_sessionmaker
 from app.core.rate_limit import limiter
 from app.models.market_data import (
     AvianFluStatus,
@@ -34,33 +35,52 @@ GRADES = ["왕란", "특란", "대란", "중란", "소란"]
 async def market_snapshot(
     request: Request,
     target_date: date = Query(default=None, description="조회 날짜 (기본: 오늘)"),
-    db: Session = Depends(get_db),
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_async_sessionmaker),
 ):
     """특정 날짜의 통합 시장 데이터 스냅샷"""
     if target_date is None:
         target_date = date.today()
 
-    cache_key = f"market:snapshot:{target_date}"
-    hit = cache_get(cache_key)
-    if hit is not None:
-        return hit
+    return await cache_fetch_async(
+        f"market:snapshot:{target_date}", partial(_market_snapshot, sessions, target_date),
+        ttl=300, tags=(f"market:{target_date}",),
+    )
+
 
+async def _market_snapshot(sessions: async_sessionmaker[AsyncSession], target_date: date) -> dict:
     # Batch price query: 1 query instead of 5
     max_date_subq = (
-        db.query(EggPrice.grade, func.max(EggPrice.date).label("max_date"))
-        .filter(EggPrice.date <= target_date)
+        select(EggPrice.grade, func.max(EggPrice.date).label("max_date"))
+        .where(EggPrice.date <= target_date)
         .group_by(EggPrice.grade)
         .subquery()
     )
-    price_rows = (
-        db.query(EggPrice)
-        .join(
-            max_date_subq,
-            (EggPrice.grade == max_date_subq.c.grade)
-            & (EggPrice.date == max_date_subq.c.max_date),
+    price_stmt = select(EggPrice).join(
+        max_date_subq,
+        (EggPrice.grade == max_date_subq.c.grade)
+        & (EggPrice.date == max_date_subq.c.max_date),
+    )
+
+    # Market indicators (5 simple queries) — independent, so all six run concurrently
+    def latest(model, *criteria):
+        return (
+            select(model)
+            .where(model.date <= target_date, *criteria)
+            .order_by(model.date.desc())
+            .limit(1)
         )
-        .all()
+
+    price_rows, vol, feed, rate, flu, wx = await gather_scalars(
+        sessions,
+        price_stmt,
+        latest(TradingVolume),
+        latest(FeedPrice, FeedPrice.feed_type == "옥수수"),
+        latest(ExchangeRate),
+        latest(AvianFluStatus),
+        latest(WeatherData),
     )
+    vol, feed, rate, flu, wx = (rows[0] if rows else None for rows in (vol, feed, rate, flu, wx))
+
     prices = {row.grade: row.retail_price for row in price_rows}
     
     # ✅ 가격 데이터가 없으면 기본값 사용
@@ -73,38 +93,6 @@ async def market_snapshot(
             "소란": 2000,
         }
 
-    # Market indicators (5 simple queries)
-    vol = (
-        db.query(TradingVolume)
-        .filter(TradingVolume.date <= target_date)
-        .order_by(TradingVolume.date.desc())
-        .first()
-    )
-    feed = (
-        db.query(FeedPrice)
-        .filter(FeedPrice.feed_type == "옥수수", FeedPrice.date <= target_date)
-        .order_by(FeedPrice.date.desc())
-        .first()
-    )
-    rate = (
-        db.query(ExchangeRate)
-        .filter(ExchangeRate.date <= target_date)
-        .order_by(ExchangeRate.date.desc())
-        .first()
-    )
-    flu = (
-        db.query(AvianFluStatus)
-        .filter(AvianFluStatus.date <= target_date)
-        .order_by(AvianFluStatus.date.desc())
-        .first()
-    )
-    wx = (
-        db.query(WeatherData)
-        .filter(WeatherData.date <= target_date)
-        .order_by(WeatherData.date.desc())
-        .first()
-    )
-
     result = MarketDataSnapshot(
         date=target_date,
         prices=prices,
@@ -114,8 +102,7 @@ async def market_snapshot(
         avian_flu=flu.is_outbreak if flu else False,
         temperature=wx.avg_temperature if wx else 15.0,  # ✅ 기본값
     )
-    cache_set(cache_key, result.model_dump(mode="json"), ttl=300)
-    return result
+    return result.model_dump(mode="json")
 
 
 @router.get("/models/performance", response_model=list[ModelPerformanceResponse])
@@ -123,32 +110,30 @@ async def market_snapshot(
 async def model_performance(
     request: Request,
     grade: str = Query(default="특란", description="등급"),
-    db: Session = Depends(get_db),
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_async_sessionmaker),
 ):
     """모델 성능 이력 조회"""
-    cache_key = f"models:perf:{grade}"
-    hit = cache_get(cache_key)
-    if hit is not None:
-        return hit
-
-    rows = (
-        db.query(ModelPerformance)
-        .filter(ModelPerformance.grade == grade)
-        .order_by(ModelPerformance.eval_date.desc())
-        .limit(20)
-        .all()
+    async def load():
+        async with sessions() as db:
+            rows = (await db.scalars(
+                select(ModelPerformance)
+                .where(ModelPerformance.grade == grade)
+                .order_by(ModelPerformance.eval_date.desc())
+                .limit(20)
+            )).all()
+        return [
+            {
+                "model_version": r.model_version, "grade": r.grade,
+                "eval_date": str(r.eval_date), "mae": r.mae, "rmse": r.rmse,
+                "mape": r.mape, "directional_accuracy": r.directional_accuracy,
+                "is_production": r.is_production, "created_at": str(r.created_at),
+            }
+            for r in rows
+        ]
+
+    return await cache_fetch_async(
+        f"models:perf:{grade}", load, ttl=1800, tags=("models", f"grade:{grade}")
     )
-    serialized = [
-        {
-            "model_version": r.model_version, "grade": r.grade,
-            "eval_date": str(r.eval_date), "mae": r.mae, "rmse": r.rmse,
-            "mape": r.mape, "directional_accuracy": r.directional_accuracy,
-            "is_production": r.is_production, "created_at": str(r.created_at),
-        }
-        for r in rows
-    ]
-    cache_set(cache_key, serialized, ttl=1800)
-    return rows
 
 
 @router.get("/models/current", response_model=ModelPerformanceResponse | None)
@@ -156,29 +141,29 @@ async def model_performance(
 async def current_model_performance(
     request: Request,
     grade: str = Query(default="특란", description="등급"),
-    db: Session = Depends(get_db),
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_async_sessionmaker),
 ):
     """현재 프로덕션 모델 성능"""
-    cache_key = f"models:current:{grade}"
-    hit = cache_get(cache_key)
-    if hit is not None:
-        return hit
-
-    row = (
-        db.query(ModelPerformance)
-        .filter(ModelPerformance.grade == grade, ModelPerformance.is_production == True)
-        .order_by(ModelPerformance.eval_date.desc())
-        .first()
-    )
-    if row:
-        serialized = {
+    async def load():
+        async with sessions() as db:
+            row = (await db.scalars(
+                select(ModelPerformance)
+                .where(ModelPerformance.grade == grade, ModelPerformance.is_production == True)
+                .order_by(ModelPerformance.eval_date.desc())
+                .limit(1)
+            )).first()
+        if row is None:
+            return None  # not cached
+        return {
             "model_version": row.model_version, "grade": row.grade,
             "eval_date": str(row.eval_date), "mae": row.mae, "rmse": row.rmse,
             "mape": row.mape, "directional_accuracy": row.directional_accuracy,
             "is_production": row.is_production, "created_at": str(row.created_at),
         }
-        cache_set(cache_key, serialized, ttl=600)
-    return row
+
+    return await cache_fetch_async(
+        f"models:current:{grade}", load, ttl=600, tags=("models", f"grade:{grade}")
+    )
 
 
 class FactorImpact(BaseModel):
@@ -199,25 +184,41 @@ class AnalyticsFactorsResponse(BaseModel):
 async def analytics_factors(
     request: Request,
     grade: str = Query(default="특란", description="등급"),
-    db: Session = Depends(get_db),
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_async_sessionmaker),
 ):
     """가격 변동 요인 분석"""
-    cache_key = f"analytics:factors:{grade}"
-    hit = cache_get(cache_key)
-    if hit is not None:
-        return hit
-
     today = date.today()
+    return await cache_fetch_async(
+        f"analytics:factors:{grade}", partial(_analytics_factors, sessions, grade, today),
+        ttl=600, tags=("prices", f"grade:{grade}", f"market:{today}"),
+    )
+
+
+async def _analytics_factors(
+    sessions: async_sessionmaker[AsyncSession], grade: str, today: date
+) -> dict:
     week_ago = today - timedelta(days=7)
     factors = []
 
-    # 1. Price trend
-    recent_prices = (
-        db.query(EggPrice)
-        .filter(EggPrice.grade == grade, EggPrice.date >= week_ago, EggPrice.retail_price.isnot(None))
-        .order_by(EggPrice.date)
-        .all()
+    # Five independent lookups, run concurrently
+    recent_prices, flu, feed_recent, rate, wx = await gather_scalars(
+        sessions,
+        select(EggPrice)
+        .where(EggPrice.grade == grade, EggPrice.date >= week_ago, EggPrice.retail_price.isnot(None))
+        .order_by(EggPrice.date),
+        select(AvianFluStatus)
+        .where(AvianFluStatus.date >= week_ago, AvianFluStatus.is_outbreak == True)
+        .limit(1),
+        select(FeedPrice)
+        .where(FeedPrice.feed_type == "옥수수")
+        .order_by(FeedPrice.date.desc())
+        .limit(2),
+        select(ExchangeRate).order_by(ExchangeRate.date.desc()).limit(1),
+        select(WeatherData).order_by(WeatherData.date.desc()).limit(1),
     )
+    flu, rate, wx = (rows[0] if rows else None for rows in (flu, rate, wx))
+
+    # 1. Price trend
     if len(recent_prices) >= 2:
         first_p = recent_prices[0].retail_price
         last_p = recent_prices[-1].retail_price
@@ -232,7 +233,6 @@ async def analytics_factors(
         ))
 
     # 2. Avian flu
-    flu = db.query(AvianFluStatus).filter(AvianFluStatus.date >= week_ago, AvianFluStatus.is_outbreak == True).first()
     factors.append(FactorImpact(
         factor="조류독감",
         direction="상승" if flu else "중립",
@@ -241,13 +241,6 @@ async def analytics_factors(
     ))
 
     # 3. Feed price (corn)
-    feed_recent = (
-        db.query(FeedPrice)
-        .filter(FeedPrice.feed_type == "옥수수")
-        .order_by(FeedPrice.date.desc())
-        .limit(2)
-        .all()
-    )
     if len(feed_recent) >= 2:
         curr_feed = feed_recent[0].price
         prev_feed = feed_recent[1].price
@@ -261,7 +254,6 @@ async def analytics_factors(
         ))
 
     # 4. Exchange rate
-    rate = db.query(ExchangeRate).order_by(ExchangeRate.date.desc()).first()
     if rate:
         direction = "상승" if rate.usd_krw > 1300 else "중립"
         factors.append(FactorImpact(
@@ -272,7 +264,6 @@ async def analytics_factors(
         ))
 
     # 5. Weather / temperature
-    wx = db.query(WeatherData).order_by(WeatherData.date.desc()).first()
     if wx and wx.avg_temperature is not None:
         if wx.avg_temperature > 30:
             direction = "상승"
@@ -301,5 +292,4 @@ async def analytics_factors(
         ]
 
     result = AnalyticsFactorsResponse(grade=grade, date=today, factors=factors)
-    cache_set(cache_key, result.model_dump(mode="json"), ttl=600)
-    return result
+    return result.model_dump(mode="json")
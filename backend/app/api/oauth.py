@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.executors import run_db
 from app.core.security import create_access_token, create_refresh_token
 from app.services.oauth_service import (
     find_or_create_social_user,
@@ -56,7 +57,8 @@ async def kakao_callback(request: Request, code: str = "", error: str = "", db:
         redirect_uri = str(request.url_for("kakao_callback"))
         access_token = await get_kakao_token(code, redirect_uri)
         user_info = await get_kakao_user(access_token)
-        user = find_or_create_social_user(
+        user = await run_db(
+            find_or_create_social_user,
             db,
             provider="kakao",
             provider_id=user_info["provider_id"],
@@ -94,7 +96,8 @@ async def naver_callback(request: Request, code: str = "", state: str = "", erro
     try:
         access_token = await get_naver_token(code, state)
         user_info = await get_naver_user(access_token)
-        user = find_or_create_social_user(
+        user = await run_db(
+            find_or_create_social_user,
             db,
             provider="naver",
             provider_id=user_info["provider_id"],
@@ -132,7 +135,8 @@ async def google_callback(request: Request, code: str = "", error: str = "", db:
         redirect_uri = str(request.url_for("google_callback"))
         access_token = await get_google_token(code, redirect_uri)
         user_info = await get_google_user(access_token)
-        user = find_or_create_social_user(
+        user = await run_db(
+            find_or_create_social_user,
             db,
             provider="google",
             provider_id=user_info["provider_id"],
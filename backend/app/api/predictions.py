@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
-from app.core.cache import cache_get, cache_set
+from app.core.cache import cache_fetch_async
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_sessionmaker, get_sessionmaker
+from app.core.executors import ExecutorBusy, run_ml
 from app.core.rate_limit import limiter
 from app.models.price import EggPrice
 from app.schemas.prediction import (
@@ -13,7 +15,7 @@ from app.schemas.prediction import (
     PredictionResponse,
     PredictionSummary,
 )
-from app.services.prediction_service import get_predictions, run_all_predictions
+from app.services.prediction_service import get_predictions_async, run_all_predictions
 
 router = APIRouter(tags=["predictions"])
 
@@ -23,63 +25,62 @@ router = APIRouter(tags=["predictions"])
 async def forecast(
     request: Request,
     grade: str = "특란",
-    db: Session = Depends(get_db),
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_async_sessionmaker),
 ):
     """AI 예측 결과 (스펙 응답 형식)"""
-    cache_key = f"forecast:{grade}"
-    hit = cache_get(cache_key)
-    if hit is not None:
-        return hit
+    async def load():
+        async with sessions() as db:
+            preds = await get_predictions_async(db, grade)
+            if not preds:
+                raise HTTPException(status_code=404, detail="예측 데이터가 없습니다.")
 
-    preds = get_predictions(db, grade)
-    if not preds:
-        raise HTTPException(status_code=404, detail="예측 데이터가 없습니다.")
+            # Get current price
+            latest = (await db.scalars(
+                select(EggPrice)
+                .where(EggPrice.grade == grade, EggPrice.retail_price.isnot(None))
+                .order_by(desc(EggPrice.date))
+                .limit(1)
+            )).first()
+            current_price = latest.retail_price if latest else None
 
-    # Get current price
-    latest = (
-        db.query(EggPrice)
-        .filter(EggPrice.grade == grade, EggPrice.retail_price.isnot(None))
-        .order_by(desc(EggPrice.date))
-        .first()
-    )
-    current_price = latest.retail_price if latest else None
+        # Build forecast items
+        items = []
+        for p in preds:
+            change_pct = 0.0
+            if current_price and current_price > 0:
+                change_pct = round((p.predicted_price - current_price) / current_price * 100, 1)
+            items.append(ForecastItem(
+                date=p.target_date,
+                price=p.predicted_price,
+                confidence_interval=[p.confidence_lower, p.confidence_upper],
+                change_percent=change_pct,
+            ))
 
-    # Build forecast items
-    items = []
-    for p in preds:
-        change_pct = 0.0
-        if current_price and current_price > 0:
-            change_pct = round((p.predicted_price - current_price) / current_price * 100, 1)
-        items.append(ForecastItem(
-            date=p.target_date,
-            price=p.predicted_price,
-            confidence_interval=[p.confidence_lower, p.confidence_upper],
-            change_percent=change_pct,
-        ))
+        # Determine trend from 7-day prediction
+        trend = "보합"
+        alert_msg = None
+        if items and current_price:
+            pct_7d = items[0].change_percent
+            if pct_7d >= 1.0:
+                trend = "상승"
+                alert_msg = f"향후 7일간 {abs(pct_7d)}% 상승 예상"
+            elif pct_7d <= -1.0:
+                trend = "하락"
+                alert_msg = f"향후 7일간 {abs(pct_7d)}% 하락 예상"
+            else:
+                alert_msg = "향후 7일간 가격 변동 미미"
 
-    # Determine trend from 7-day prediction
-    trend = "보합"
-    alert_msg = None
-    if items and current_price:
-        pct_7d = items[0].change_percent
-        if pct_7d >= 1.0:
-            trend = "상승"
-            alert_msg = f"향후 7일간 {abs(pct_7d)}% 상승 예상"
-        elif pct_7d <= -1.0:
-            trend = "하락"
-            alert_msg = f"향후 7일간 {abs(pct_7d)}% 하락 예상"
-        else:
-            alert_msg = "향후 7일간 가격 변동 미미"
+        return ForecastResponse(
+            grade=grade,
+            current_price=current_price,
+            predictions=items,
+            trend=trend,
+            alert=alert_msg,
+        ).model_dump(mode="json")
 
-    result = ForecastResponse(
-        grade=grade,
-        current_price=current_price,
-        predictions=items,
-        trend=trend,
-        alert=alert_msg,
+    return await cache_fetch_async(
+        f"forecast:{grade}", load, ttl=300, tags=("prices", "predictions", f"grade:{grade}")
     )
-    cache_set(cache_key, result.model_dump(mode="json"), ttl=300)
-    return result
 
 
 @router.get("/predictions/{grade}", response_model=PredictionSummary)
@@ -87,25 +88,43 @@ async def forecast(
 async def predictions_for_grade(
     request: Request,
     grade: str,
-    db: Session = Depends(get_db),
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_async_sessionmaker),
 ):
     """특정 등급의 가격 예측 결과 (7/14/30일)"""
-    cache_key = f"predictions:{grade}"
-    hit = cache_get(cache_key)
-    if hit is not None:
-        return hit
+    async def load():
+        async with sessions() as db:
+            preds = await get_predictions_async(db, grade)
+        return PredictionSummary(grade=grade, predictions=preds).model_dump(mode="json")
 
-    preds = get_predictions(db, grade)
-    result = PredictionSummary(grade=grade, predictions=preds)
-    cache_set(cache_key, result.model_dump(mode="json"), ttl=300)
-    return result
+    return await cache_fetch_async(
+        f"predictions:{grade}", load, ttl=300, tags=("predictions", f"grade:{grade}")
+    )
 
 
 @router.post("/predictions/refresh", response_model=list[PredictionResponse])
 @limiter.limit(settings.RATE_LIMIT_API)
-async def refresh_predictions(request: Request, db: Session = Depends(get_db)):
+async def refresh_predictions(
+    request: Request,
+    sessions: sessionmaker[Session] = Depends(get_sessionmaker),
+):
     """전 등급 예측 재실행"""
-    results = run_all_predictions(db)
+    def job():
+        # Sessions aren't thread-safe: the ML thread owns this one, so it
+        # stays valid even if the request finishes first.
+        db = sessions()
+        try:
+            return run_all_predictions(db)
+        finally:
+            db.close()
+
+    try:
+        results = await run_ml(job)
+    except ExecutorBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="예측 작업이 이미 진행 중입니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": "30"},
+        )
     if not results:
         raise HTTPException(
             status_code=404,
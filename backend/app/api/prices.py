@@ -1,28 +1,32 @@
 from fastapi import APIRouter, Depends, Query, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.cache import cache_get, cache_set
+from app.core.cache import cache_fetch_async
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_sessionmaker
 from app.core.rate_limit import limiter
 from app.schemas.price import PriceResponse, PriceWithChange
-from app.services.price_service import get_current_prices, get_price_history
+from app.services.price_service import (
+    CURRENT_PRICES_TAGS,
+    get_current_prices_async,
+    get_price_history_async,
+)
 
 router = APIRouter(tags=["prices"])
 
 
 @router.get("/prices/current", response_model=list[PriceWithChange])
 @limiter.limit(settings.RATE_LIMIT_API)
-async def current_prices(request: Request, db: Session = Depends(get_db)):
+async def current_prices(
+    request: Request,
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_async_sessionmaker),
+):
     """현재 가격 조회"""
-    cache_key = "prices:current"
-    hit = cache_get(cache_key)
-    if hit is not None:
-        return hit
+    async def load():
+        async with sessions() as db:
+            return await get_current_prices_async(db)
 
-    result = get_current_prices(db)
-    cache_set(cache_key, result, ttl=180)
-    return result
+    return await cache_fetch_async("prices:current", load, ttl=180, tags=CURRENT_PRICES_TAGS)
 
 
 @router.get("/prices/history")
@@ -32,27 +36,23 @@ async def price_history(
     grade: str = Query(default="특란", description="계란 등급"),
     days: int = Query(default=90, ge=1, le=365, description="조회 기간 (일)"),
     compact: bool = Query(default=False, description="경량 응답 (d/r/w 필드만)"),
-    db: Session = Depends(get_db),
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_async_sessionmaker),
 ):
     """과거 가격 조회 (compact=true 시 경량 응답)"""
-    cache_key = f"prices:history:{grade}:{days}:{'c' if compact else 'f'}"
-    hit = cache_get(cache_key)
-    if hit is not None:
-        return hit
+    async def load():
+        async with sessions() as db:
+            result = await get_price_history_async(db, grade, days)
 
-    result = get_price_history(db, grade, days)
-
-    if compact:
-        serialized = [
-            {
-                "d": str(r.date),
-                "r": int(r.retail_price or 0),
-                "w": int(r.wholesale_price or 0),
-            }
-            for r in result
-        ]
-    else:
-        serialized = [
+        if compact:
+            return [
+                {
+                    "d": str(r.date),
+                    "r": int(r.retail_price or 0),
+                    "w": int(r.wholesale_price or 0),
+                }
+                for r in result
+            ]
+        return [
             {
                 "id": r.id, "date": str(r.date), "grade": r.grade,
                 "wholesale_price": r.wholesale_price, "retail_price": r.retail_price,
@@ -61,5 +61,7 @@ async def price_history(
             for r in result
         ]
 
-    cache_set(cache_key, serialized, ttl=300)
-    return serialized
+    return await cache_fetch_async(
+        f"prices:history:{grade}:{days}:{'c' if compact else 'f'}", load,
+        ttl=300, tags=("prices", f"grade:{grade}"),
+    )
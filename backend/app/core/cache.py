@@ -1,15 +1,44 @@
-"""Two-tier cache: L1 in-memory (fast) + L2 Redis (distributed)."""
-
+"""Two-tier cache: L1 in-memory (fast) + L2 Redis (distributed).
+
+Sync functions (cache_get, cache_set, cache_invalidate) use a blocking
+redis.Redis client and serve Celery tasks, the scheduler and sync code.
+Async endpoints use the *_async variants, backed by redis.asyncio, so an
+L2 round-trip never blocks the event loop. Both share the same L1.
+
+Entries are written with tags (e.g. "prices", "grade:특란", "market:2025-01-06")
+and invalidated by tag: cache_invalidate drops only the entries under the
+given tags. In L2 each tag is a Redis set of keys ("tag:<tag>"); L1 entries
+carry their own tags.
+
+Every entry has a soft TTL (`ttl`, fresh) and a hard TTL (ttl +
+CACHE_STALE_SECONDS, the Redis expiry). cache_fetch_async serves an entry
+between the two while refreshing it in the background, and coalesces
+misses: one load per key per process (single-flight), and across
+processes a short Redis lock ("lock:<key>") whose losers wait for the
+winner's value instead of hitting the database too.
+
+L1 is per process. Invalidations are broadcast on CACHE_INVALIDATION_CHANNEL
+and applied to every other worker's L1 by its invalidation listener thread;
+while Redis is down, stale L1 entries just expire after _L1_TTL.
+"""
+
+import asyncio
 import json
 import logging
+import threading
 import time
+import uuid
+import weakref
 from collections import OrderedDict
-from functools import wraps
+from collections.abc import Awaitable, Callable, Iterable
+from functools import partial, wraps
 from threading import Lock
 from typing import Any
 
 import redis
+import redis.asyncio as aioredis
 
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -18,13 +47,21 @@ logger = logging.getLogger(__name__)
 
 _L1_MAX_SIZE = 100
 _L1_TTL = 60  # seconds
+_TAG_TTL = 86400  # seconds; refreshed on every write, outlives any entry
+
+# A tag, or a tuple of tags an entry must all carry
+TagGroup = str | tuple[str, ...]
+
+
+def _normalize_groups(groups: Iterable[TagGroup]) -> list[tuple[str, ...]]:
+    return [(g,) if isinstance(g, str) else tuple(g) for g in groups]
 
 
 class _L1Cache:
     """Thread-safe in-memory LRU cache with TTL."""
 
     def __init__(self, max_size: int = _L1_MAX_SIZE, ttl: int = _L1_TTL):
-        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._data: OrderedDict[str, tuple[float, Any, frozenset[str]]] = OrderedDict()
         self._max_size = max_size
         self._ttl = ttl
         self._lock = Lock()
@@ -34,20 +71,31 @@ class _L1Cache:
             item = self._data.get(key)
             if item is None:
                 return None
-            ts, value = item
+            ts, value, _ = item
             if time.time() - ts > self._ttl:
                 del self._data[key]
                 return None
             self._data.move_to_end(key)
             return value
 
-    def set(self, key: str, value: Any):
+    def set(self, key: str, value: Any, tags: Iterable[str] = ()):
         with self._lock:
-            self._data[key] = (time.time(), value)
+            self._data[key] = (time.time(), value, frozenset(tags))
             self._data.move_to_end(key)
             while len(self._data) > self._max_size:
                 self._data.popitem(last=False)
 
+    def invalidate(self, groups: list[tuple[str, ...]], keys: Iterable[str] = ()):
+        """Drop entries matching any tag group, plus the given keys.
+
+        `keys` covers entries promoted from L2, which don't know their tags.
+        """
+        keys = set(keys)
+        with self._lock:
+            for key, (_, _, tags) in list(self._data.items()):
+                if key in keys or any(tags.issuperset(group) for group in groups):
+                    del self._data[key]
+
     def clear(self):
         with self._lock:
             self._data.clear()
@@ -57,98 +105,467 @@ _l1 = _L1Cache()
 
 # ── L2: Redis cache ──────────────────────────────────────
 
+_REDIS_POOL_OPTIONS = {
+    "decode_responses": True,
+    "max_connections": 20,
+    "socket_connect_timeout": 1,
+    "socket_timeout": 1,
+    "retry_on_timeout": False,
+}
+
 _redis_pool: redis.ConnectionPool | None = None
 _redis_client: redis.Redis | None = None
-_redis_unavailable: bool = False  # avoid repeated connection attempts
+
+# Shared by the sync and async clients (same server). While open, L2 is
+# skipped; it is probed again with exponential backoff.
+_redis_breaker = CircuitBreaker("redis_cache")
+_REDIS_ERRORS = (redis.RedisError, OSError)
+# from_url rejects a malformed REDIS_URL with ValueError; treat it as "L2 down"
+_REDIS_SETUP_ERRORS = (*_REDIS_ERRORS, ValueError)
+
+# redis.asyncio connections belong to the event loop that opened them, so
+# each loop (normally just uvicorn's) gets its own pooled client.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 def get_redis() -> redis.Redis | None:
-    """Get Redis client with connection pooling. Returns None if unavailable."""
-    global _redis_pool, _redis_client, _redis_unavailable
-    if _redis_unavailable:
+    """Get Redis client with connection pooling.
+
+    Returns None while the circuit is open, or when REDIS_URL is empty (L2
+    disabled, e.g. the Render deploy).
+    """
+    global _redis_pool, _redis_client
+    if not settings.REDIS_URL or not _redis_breaker.allow_request():
         return None
     if _redis_client is not None:
         return _redis_client
     try:
         if _redis_pool is None:
-            _redis_pool = redis.ConnectionPool.from_url(
-                settings.REDIS_URL,
-                decode_responses=True,
-                max_connections=20,
-                socket_connect_timeout=1,
-                socket_timeout=1,
-                retry_on_timeout=False,
-            )
-        _redis_client = redis.Redis(connection_pool=_redis_pool)
-        _redis_client.ping()
-        return _redis_client
-    except Exception:
+            _redis_pool = redis.ConnectionPool.from_url(settings.REDIS_URL, **_REDIS_POOL_OPTIONS)
+        client = redis.Redis(connection_pool=_redis_pool)
+        client.ping()
+    except _REDIS_SETUP_ERRORS:
         logger.debug("Redis not available, L2 cache disabled")
-        _redis_unavailable = True
-        _redis_client = None
+        _redis_breaker.record_failure()
         return None
+    _redis_breaker.record_success()
+    _redis_client = client
+    return client
 
 
-# ── Public API ────────────────────────────────────────────
+async def get_async_redis() -> aioredis.Redis | None:
+    """Async counterpart of get_redis for the running event loop."""
+    if not settings.REDIS_URL or not _redis_breaker.allow_request():
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None:
+        return client
+    try:
+        client = aioredis.Redis(
+            connection_pool=aioredis.ConnectionPool.from_url(settings.REDIS_URL, **_REDIS_POOL_OPTIONS)
+        )
+        await client.ping()
+    except _REDIS_SETUP_ERRORS:
+        logger.debug("Redis not available, L2 cache disabled")
+        _redis_breaker.record_failure()
+        return None
+    _redis_breaker.record_success()
+    _async_clients[loop] = client
+    return client
 
-def cache_get(key: str) -> Any | None:
-    """Get from L1 first, then L2 (Redis). Returns None on miss."""
-    # L1 check
-    hit = _l1.get(key)
-    if hit is not None:
-        return hit
 
-    # L2 check
+async def close_async_redis():
+    """Close the running loop's async client (app shutdown)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _l2_call(op):
+    """Run op(client) on L2 and report the outcome to the breaker.
+
+    Returns None when L2 is unavailable or the call fails.
+    """
     r = get_redis()
     if r is None:
         return None
     try:
-        data = r.get(key)
-        if data is not None:
-            value = json.loads(data)
-            _l1.set(key, value)  # promote to L1
-            return value
-    except Exception:
-        pass
-    return None
+        result = op(r)
+    except _REDIS_ERRORS as e:
+        logger.debug(f"Redis call failed: {e}")
+        _redis_breaker.record_failure()
+        return None
+    _redis_breaker.record_success()
+    return result
 
 
-def cache_set(key: str, value: Any, ttl: int | None = None):
-    """Write to both L1 and L2."""
+async def _l2_call_async(op):
+    """Async _l2_call; `op` returns an awaitable."""
+    r = await get_async_redis()
+    if r is None:
+        return None
+    try:
+        result = await op(r)
+    except _REDIS_ERRORS as e:
+        logger.debug(f"Redis call failed: {e}")
+        _redis_breaker.record_failure()
+        return None
+    _redis_breaker.record_success()
+    return result
+
+
+def _decode(data: str | None) -> Any | None:
+    if data is None:
+        return None
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+def _new_entry(value: Any, ttl: int) -> dict:
+    now = time.time()
+    return {
+        "value": value,
+        "fresh_until": now + ttl,
+        "stale_until": now + ttl + settings.CACHE_STALE_SECONDS,
+    }
+
+
+def _live(entry: Any) -> dict | None:
+    """The entry if it is well-formed and within its hard TTL."""
+    if not isinstance(entry, dict) or "stale_until" not in entry:
+        return None
+    return entry if time.time() < entry["stale_until"] else None
+
+
+def _read_entry(key: str) -> dict | None:
+    entry = _live(_l1.get(key))
+    if entry is None:
+        entry = _live(_decode(_l2_call(lambda r: r.get(key))))
+        if entry is not None:
+            _l1.set(key, entry)  # promote to L1
+    return entry
+
+
+async def _read_entry_async(key: str) -> dict | None:
+    entry = _live(_l1.get(key))
+    if entry is None:
+        entry = _live(_decode(await _l2_call_async(lambda r: r.get(key))))
+        if entry is not None:
+            _l1.set(key, entry)  # promote to L1
+    return entry
+
+
+def _fresh_value(entry: dict | None) -> Any | None:
+    if entry is None or time.time() >= entry["fresh_until"]:
+        return None
+    return entry["value"]
+
+
+# ── Public API ────────────────────────────────────────────
+
+def cache_get(key: str) -> Any | None:
+    """Get a fresh value from L1 first, then L2 (Redis). Returns None on miss."""
+    return _fresh_value(_read_entry(key))
+
+
+def cache_set(key: str, value: Any, ttl: int | None = None, tags: Iterable[str] = ()):
+    """Write to both L1 and L2, registering the key under `tags`.
+
+    `ttl` is the soft TTL; L2 keeps the entry CACHE_STALE_SECONDS longer.
+    """
     if ttl is None:
         ttl = settings.CACHE_TTL_SECONDS
+    tags = tuple(tags)
+    entry = _new_entry(value, ttl)
 
     # L1
-    _l1.set(key, value)
+    _l1.set(key, entry, tags)
 
     # L2
-    r = get_redis()
-    if r is None:
-        return
-    try:
-        r.setex(key, ttl, json.dumps(value, default=str))
-    except Exception:
-        pass
+    payload = json.dumps(entry, default=str)
 
+    def write(r):
+        pipe = r.pipeline(transaction=False)
+        pipe.setex(key, ttl + settings.CACHE_STALE_SECONDS, payload)
+        for tag in tags:
+            pipe.sadd(f"tag:{tag}", key)
+            pipe.expire(f"tag:{tag}", _TAG_TTL)
+        pipe.execute()
 
-def cache_delete(pattern: str):
-    """Delete cached keys matching a pattern from both layers."""
-    _l1.clear()  # simple clear for L1 (no pattern match needed)
+    _l2_call(write)
 
-    r = get_redis()
-    if r is None:
+
+def cache_invalidate(*groups: TagGroup):
+    """Drop entries by tag from both layers, in every worker.
+
+    Each group is a tag or a tuple of tags an entry must all carry; entries
+    matching any group are dropped, e.g.
+    cache_invalidate(("predictions", "grade:특란"), "market:2025-01-06").
+    """
+    groups = _normalize_groups(groups)
+    if not groups:
         return
-    try:
-        keys = r.keys(pattern)
+
+    def invalidate(r):
+        # One transaction resolves every group; keys are dropped in a second
+        # round trip. Tag sets keep members of deleted keys until they expire.
+        pipe = r.pipeline()
+        for group in groups:
+            pipe.sinter([f"tag:{tag}" for tag in group])
+        keys = set().union(*pipe.execute())
         if keys:
             r.delete(*keys)
-    except Exception:
-        pass
+        # After the L2 delete, so peers refilling their L1 can't re-read stale values
+        r.publish(settings.CACHE_INVALIDATION_CHANNEL, _invalidation_message(groups, keys))
+        return keys
+
+    keys = _l2_call(invalidate) or ()
+    _l1.invalidate(groups, keys)
+
+
+async def cache_get_async(key: str) -> Any | None:
+    """Async cache_get: L1, then L2 without blocking the event loop."""
+    return _fresh_value(await _read_entry_async(key))
+
+
+async def cache_set_async(key: str, value: Any, ttl: int | None = None, tags: Iterable[str] = ()):
+    """Async cache_set: write to L1 and L2, registering the key under `tags`."""
+    if ttl is None:
+        ttl = settings.CACHE_TTL_SECONDS
+    tags = tuple(tags)
+    entry = _new_entry(value, ttl)
+
+    _l1.set(key, entry, tags)
+
+    payload = json.dumps(entry, default=str)
+
+    async def write(r):
+        pipe = r.pipeline(transaction=False)
+        pipe.setex(key, ttl + settings.CACHE_STALE_SECONDS, payload)
+        for tag in tags:
+            pipe.sadd(f"tag:{tag}", key)
+            pipe.expire(f"tag:{tag}", _TAG_TTL)
+        await pipe.execute()
+
+    await _l2_call_async(write)
+
+
+async def cache_invalidate_async(*groups: TagGroup):
+    """Async cache_invalidate."""
+    groups = _normalize_groups(groups)
+    if not groups:
+        return
+
+    async def invalidate(r):
+        pipe = r.pipeline()
+        for group in groups:
+            pipe.sinter([f"tag:{tag}" for tag in group])
+        keys = set().union(*await pipe.execute())
+        if keys:
+            await r.delete(*keys)
+        await r.publish(settings.CACHE_INVALIDATION_CHANNEL, _invalidation_message(groups, keys))
+        return keys
+
+    keys = await _l2_call_async(invalidate) or ()
+    _l1.invalidate(groups, keys)
+
+
+# ── Stampede protection ──────────────────────────────────
+
+_LOCK_POLL_INTERVAL = 0.05  # seconds between L2 checks while another process loads
+# Delete the lock only if we still own it (it may have expired and been retaken)
+_LOCK_RELEASE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+# In-flight loads per event loop (tasks can't be awaited from another loop)
+_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Task]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def cache_fetch_async(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: int | None = None,
+    tags: Iterable[str] = (),
+) -> Any:
+    """Return the value for `key`, calling `await loader()` to (re)build it.
+
+    Fresh hit: returned as is. Stale hit (past `ttl`, within the hard TTL):
+    returned as is while a background task refreshes it. Miss: the caller
+    waits for a single shared load. `loader` may run after the request that
+    supplied it has finished, so it must open its own DB session. A None
+    result is returned but not cached.
+    """
+    entry = await _read_entry_async(key)
+    if entry is not None:
+        if time.time() >= entry["fresh_until"]:
+            _start_load(key, loader, ttl, tags)
+        return entry["value"]
+    return await asyncio.shield(_start_load(key, loader, ttl, tags))
+
+
+def _start_load(key, loader, ttl, tags) -> asyncio.Task:
+    """The in-flight load for `key` on this loop, starting one if needed."""
+    loop = asyncio.get_running_loop()
+    tasks = _inflight.setdefault(loop, {})
+    task = tasks.get(key)
+    if task is None:
+        task = loop.create_task(_load(key, loader, ttl, tags))
+        tasks[key] = task
+        task.add_done_callback(partial(_load_done, tasks, key))
+    return task
+
+
+def _load_done(tasks: dict, key: str, task: asyncio.Task):
+    tasks.pop(key, None)
+    if not task.cancelled() and task.exception() is not None:
+        # Retrieved here so background refreshes don't log "never retrieved"
+        logger.debug(f"Cache load failed for {key}: {task.exception()!r}")
+
+
+async def _load(key, loader, ttl, tags) -> Any:
+    if ttl is None:
+        ttl = settings.CACHE_TTL_SECONDS
+    lock_key, token = f"lock:{key}", uuid.uuid4().hex
+
+    async def acquire(r):
+        return bool(await r.set(lock_key, token, nx=True, px=int(settings.CACHE_LOCK_SECONDS * 1000)))
+
+    locked = await _l2_call_async(acquire)  # None: L2 unavailable, just load
+    if locked is False:
+        value = await _wait_for_peer(key)
+        if value is not None:
+            return value
+        # The lock holder is slow or gone; load anyway rather than fail
+    try:
+        value = await loader()
+        if value is not None:
+            await cache_set_async(key, value, ttl, tags)
+        return value
+    finally:
+        if locked:
+            await _l2_call_async(lambda r: r.eval(_LOCK_RELEASE, 1, lock_key, token))
+
+
+async def _wait_for_peer(key: str) -> Any | None:
+    """Poll L2 for a fresh value written by the lock holder."""
+    deadline = time.monotonic() + settings.CACHE_LOCK_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(_LOCK_POLL_INTERVAL)
+        entry = _live(_decode(await _l2_call_async(lambda r: r.get(key))))
+        value = _fresh_value(entry)
+        if value is not None:
+            _l1.set(key, entry)
+            return value
+    return None
+
+
+# ── Cross-worker L1 invalidation ─────────────────────────
+
+# Tags this process's messages so its own listener skips them
+_INSTANCE_ID = uuid.uuid4().hex
+
+
+def _invalidation_message(groups: list[tuple[str, ...]], keys: Iterable[str]) -> str:
+    return json.dumps({"origin": _INSTANCE_ID, "groups": groups, "keys": sorted(keys)}, ensure_ascii=False)
+
+
+def _apply_invalidation(data: str) -> bool:
+    """Apply a message from another process to L1. Returns True if applied."""
+    try:
+        message = json.loads(data)
+    except (TypeError, ValueError):
+        logger.debug(f"Ignoring malformed invalidation message: {data!r}")
+        return False
+    if message.get("origin") == _INSTANCE_ID:
+        return False
+    _l1.invalidate(_normalize_groups(message.get("groups", [])), message.get("keys", []))
+    return True
+
+
+class _InvalidationListener(threading.Thread):
+    """Applies other workers' invalidations to this process's L1.
+
+    Uses its own pub/sub connection and reconnects with exponential backoff
+    (the circuit breaker settings). L1 is cleared on every (re)subscribe,
+    since messages published while unsubscribed are never delivered.
+    """
+
+    def __init__(self):
+        super().__init__(name="cache-invalidation", daemon=True)
+        self._stopped = threading.Event()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopped.set()
+        self.join(timeout)
+
+    def run(self):
+        backoff = settings.CIRCUIT_BREAKER_BACKOFF_SECONDS
+        while not self._stopped.is_set():
+            client = pubsub = None
+            try:
+                client = redis.Redis.from_url(
+                    settings.REDIS_URL,
+                    decode_responses=True,
+                    socket_connect_timeout=1,
+                    health_check_interval=30,
+                )
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                _l1.clear()
+                backoff = settings.CIRCUIT_BREAKER_BACKOFF_SECONDS
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        _apply_invalidation(message["data"])
+            except ValueError as e:
+                # Malformed REDIS_URL: retrying can't help, entries expire by TTL
+                logger.warning(f"Cache invalidation listener disabled: {e}")
+                return
+            except _REDIS_ERRORS as e:
+                logger.debug(f"Cache invalidation listener disconnected: {e}")
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, settings.CIRCUIT_BREAKER_MAX_BACKOFF_SECONDS)
+            finally:
+                if pubsub is not None:
+                    pubsub.close()
+                if client is not None:
+                    client.close()
+
+
+_listener: _InvalidationListener | None = None
+
+
+def start_invalidation_listener():
+    """Start this process's listener (app startup).
+
+    No-op if already running, or if REDIS_URL is empty: without Redis there
+    are no peer invalidations, and L1 entries fall back to their TTL.
+    """
+    global _listener
+    if not settings.REDIS_URL:
+        return
+    if _listener is None or not _listener.is_alive():
+        _listener = _InvalidationListener()
+        _listener.start()
+
+
+def stop_invalidation_listener():
+    """Stop the listener (app shutdown)."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
 
 
 def warm_cache(db):
     """Pre-warm cache with frequently accessed data on startup."""
-    from app.services.price_service import get_current_prices
+    from app.services.price_service import CURRENT_PRICES_TAGS, get_current_prices
     from app.models.price import EggPrice
     from datetime import date, timedelta
     import random
@@ -203,16 +620,19 @@ def warm_cache(db):
     try:
         result = get_current_prices(db)
         if result:
-            cache_set("prices:current", result, ttl=180)
+            cache_set("prices:current", result, ttl=180, tags=CURRENT_PRICES_TAGS)
             logger.info("Cache warmed: prices:current")
     except Exception as e:
         logger.debug(f"Cache warm failed for prices:current: {e}")
 
 
-def cached(prefix: str, ttl: int | None = None):
-    """Decorator to cache function results (L1 + L2).
+def cached(prefix: str, ttl: int | None = None, tags: Iterable[str] = ()):
+    """Decorator to cache function results (L1 + L2) via cache_fetch_async.
 
-    The cache key is built from the prefix and function arguments.
+    The cache key is built from the prefix and function arguments. Tags may
+    reference keyword arguments, e.g. tags=("predictions", "grade:{grade}").
+    Stale results are refreshed in the background with the same arguments,
+    so don't pass request-scoped sessions.
     Only works with JSON-serializable return values.
     """
     def decorator(func):
@@ -226,17 +646,12 @@ def cached(prefix: str, ttl: int | None = None):
                 key_parts.append(str(v))
             cache_key = ":".join(key_parts)
 
-            # Try cache
-            hit = cache_get(cache_key)
-            if hit is not None:
-                return hit
-
-            # Call function
-            result = await func(*args, **kwargs)
-
-            # Store in cache
-            cache_set(cache_key, result, ttl)
-            return result
+            return await cache_fetch_async(
+                cache_key,
+                partial(func, *args, **kwargs),
+                ttl,
+                [tag.format(**kwargs) for tag in tags],
+            )
 
         return wrapper
     return decorator
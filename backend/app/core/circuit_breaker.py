@@ -0,0 +1,109 @@
+"""Circuit breaker for optional backing services (Redis cache, Celery broker).
+
+    closed ──(failure_threshold consecutive failures)──▶ open
+    open ──(backoff elapsed)──▶ half_open: one probe call is let through
+    half_open ──probe succeeds──▶ closed (backoff reset)
+    half_open ──probe fails──▶ open, backoff doubled up to max_backoff
+
+While open, callers skip the service (e.g. serve without L2) instead of
+waiting on timeouts, and the service is retried automatically once it
+recovers, rather than being written off until the process restarts.
+
+State changes are exported to Prometheus as eggprice_circuit_breaker_state
+(0 closed, 1 half_open, 2 open) and eggprice_circuit_breaker_transitions_total.
+"""
+
+import logging
+import time
+from threading import Lock
+
+from app.core.config import settings
+from app.core.metrics import circuit_breaker_state_gauge, circuit_breaker_transitions
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Thread-safe breaker; callers pair allow_request() with record_*()."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int | None = None,
+        backoff: float | None = None,
+        max_backoff: float | None = None,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        self.base_backoff = backoff if backoff is not None else settings.CIRCUIT_BREAKER_BACKOFF_SECONDS
+        self.max_backoff = max_backoff if max_backoff is not None else settings.CIRCUIT_BREAKER_MAX_BACKOFF_SECONDS
+        self._clock = clock
+        self._lock = Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._backoff = self.base_backoff
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+        circuit_breaker_state_gauge.labels(name).set(_STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """True if the caller may use the service now.
+
+        In half_open only one caller gets True (the probe); a probe that
+        never reports back is replaced after max_backoff.
+        """
+        with self._lock:
+            now = self._clock()
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if now - self._opened_at < self._backoff:
+                    return False
+                self._transition(HALF_OPEN)
+            elif self._probe_started is not None and now - self._probe_started < self.max_backoff:
+                return False
+            self._probe_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_started = None
+            if self._state != CLOSED:
+                self._backoff = self.base_backoff
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_started = None
+            if self._state == HALF_OPEN:
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+                self._open()
+            elif self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self._opened_at = self._clock()
+        self._transition(OPEN)
+        logger.warning(f"Circuit '{self.name}' open, retrying in {self._backoff:.0f}s")
+
+    def _transition(self, state: str):
+        if state == self._state:
+            return
+        circuit_breaker_transitions.labels(self.name, self._state, state).inc()
+        circuit_breaker_state_gauge.labels(self.name).set(_STATE_VALUES[state])
+        if state == CLOSED:
+            logger.info(f"Circuit '{self.name}' closed")
+        self._state = state
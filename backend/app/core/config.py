@@ -21,6 +21,12 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     CACHE_TTL_SECONDS: int = 300  # 5 minutes
+    CACHE_STALE_SECONDS: int = 300  # served past the soft TTL while a background refresh runs
+    CACHE_LOCK_SECONDS: float = 5.0  # cross-process refresh lock; losers wait this long for the value
+    CACHE_INVALIDATION_CHANNEL: str = "eggprice:cache:invalidate"  # pub/sub channel for cross-worker L1 deletes
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 3  # consecutive Redis/broker failures before opening
+    CIRCUIT_BREAKER_BACKOFF_SECONDS: float = 1.0  # first half-open probe delay, doubled per failed probe
+    CIRCUIT_BREAKER_MAX_BACKOFF_SECONDS: float = 60.0
 
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
@@ -56,6 +62,14 @@ class Settings(BaseSettings):
 
     CORS_ORIGINS: str = "http://localhost:3000,https://eggprice-ai.vercel.app,https://eggprice.kr,https://www.eggprice.kr"
     MODEL_VERSION: str = "v2.0"
+    MODEL_HEAD: str = "point"  # training: "point" (MC Dropout CIs) or "quantile" (5/50/95% pinball)
+    PREDICTION_INTERVAL: str = "auto"  # "auto" (per model metadata) or "mc" (always MC Dropout)
+    MODEL_REGISTRY_MAX_SIZE: int = 10  # warm (grade, version) models kept in memory
+    INFERENCE_RUNTIME: str = "torch"  # "torch" (eager) or "onnx" (onnxruntime, no torch import)
+    MODEL_QUANTIZE_INT8: bool = False  # serve dynamic int8 models that passed the accuracy guard
+    MODEL_QUANTIZE_MAE_TOLERANCE: float = 0.02  # max relative val MAE increase for int8 (2%)
+    ML_EXECUTOR_WORKERS: int = 1  # threads running on-demand inference (/predictions/refresh)
+    ML_EXECUTOR_MAX_PENDING: int = 1  # queued ML jobs beyond which requests get 503
 
     # Security
     ALLOWED_HOSTS: str = "localhost,127.0.0.1"
@@ -75,6 +89,10 @@ class Settings(BaseSettings):
     # Retraining thresholds
     MAPE_RETRAIN_THRESHOLD: float = 7.0
     RETRAIN_INTERVAL_DAYS: int = 30
+    TRAINING_WORKERS: int = 1  # parallel processes for train_all_grades
+    # Latest days withheld from a retrain candidate so the A/B backtest has
+    # out-of-sample origins (origins with a realised 30-day target: this - 31)
+    BACKTEST_HOLDOUT_DAYS: int = 90
 
     model_config = {"env_file": ".env", "extra": "ignore"}
 
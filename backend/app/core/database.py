@@ -1,5 +1,8 @@
+import asyncio
+
 from sqlalchemy import create_engine, text
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from app.core.config import settings
 
@@ -21,6 +24,27 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL to its async driver (asyncpg / aiosqlite)."""
+    scheme, sep, rest = url.partition("://")
+    backend = scheme.split("+", 1)[0]
+    if backend in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if backend == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+# Async stack for the API read paths. Same database and pool sizing as the
+# sync engine, which Celery tasks, the scheduler and ML code keep using.
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **engine_kwargs,
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -33,6 +57,39 @@ def get_db():
         db.close()
 
 
+def get_sessionmaker() -> sessionmaker[Session]:
+    """Session factory for work that outlives the request (e.g. ML jobs on
+    another thread), which must open and close its own session.
+    """
+    return SessionLocal
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Session factory for endpoints that run independent queries concurrently.
+
+    An AsyncSession runs one statement at a time, so each concurrent query
+    needs a session (and pooled connection) of its own.
+    """
+    return AsyncSessionLocal
+
+
+async def gather_scalars(sessions: async_sessionmaker[AsyncSession], *stmts) -> list[list]:
+    """Run independent SELECTs concurrently, one session each.
+
+    Returns each statement's scalar results as a list, in argument order.
+    """
+    async def run(stmt):
+        async with sessions() as db:
+            return list(await db.scalars(stmt))
+
+    return await asyncio.gather(*(run(stmt) for stmt in stmts))
+
+
 def init_timescaledb():
     """Enable TimescaleDB extension and convert egg_prices to hypertable.
 
@@ -0,0 +1,76 @@
+"""Executors for blocking work triggered from async endpoints.
+
+Endpoints that only do sync Session queries are plain `def` routes, which
+FastAPI already runs on its AnyIO threadpool. Async endpoints that mix
+awaits with sync DB calls hand those calls to `run_db`.
+
+ML work (feature building + inference) goes to a separate small thread
+pool so a long refresh can neither stall the event loop nor exhaust the
+threadpool serving ordinary reads. Threads rather than processes: torch
+and numpy release the GIL in their kernels, and workers share the
+in-process model registry instead of each loading every model.
+
+The ML pool is bounded: at most ML_EXECUTOR_WORKERS jobs run and
+ML_EXECUTOR_MAX_PENDING more wait; beyond that `run_ml` raises
+ExecutorBusy so the caller can answer 503 instead of queueing forever.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorBusy(RuntimeError):
+    """The ML executor already has its maximum number of jobs in flight."""
+
+
+_ml_executor: ThreadPoolExecutor | None = None
+_ml_executor_lock = threading.Lock()
+_ml_slots = threading.BoundedSemaphore(settings.ML_EXECUTOR_WORKERS + settings.ML_EXECUTOR_MAX_PENDING)
+
+
+def _get_ml_executor() -> ThreadPoolExecutor:
+    """Created on first use (and again after shutdown_executors)."""
+    global _ml_executor
+    with _ml_executor_lock:
+        if _ml_executor is None:
+            _ml_executor = ThreadPoolExecutor(
+                max_workers=settings.ML_EXECUTOR_WORKERS,
+                thread_name_prefix="ml-worker",
+            )
+        return _ml_executor
+
+
+async def run_ml(func, *args, **kwargs):
+    """Run CPU-heavy ML work on the bounded ML pool and await its result."""
+    if not _ml_slots.acquire(blocking=False):
+        raise ExecutorBusy("ML executor is saturated")
+    try:
+        future = _get_ml_executor().submit(partial(func, *args, **kwargs))
+    except BaseException:
+        _ml_slots.release()
+        raise
+    future.add_done_callback(lambda _: _ml_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking (sync Session) call on the shared threadpool."""
+    return await run_in_threadpool(func, *args, **kwargs)
+
+
+def shutdown_executors():
+    """Let in-flight ML jobs finish and drop queued ones (app shutdown)."""
+    global _ml_executor
+    with _ml_executor_lock:
+        executor, _ml_executor = _ml_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
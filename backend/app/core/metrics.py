@@ -1,6 +1,6 @@
 """Prometheus metrics setup and custom gauges."""
 
-from prometheus_client import Gauge
+from prometheus_client import Counter, Gauge
 from prometheus_fastapi_instrumentator import Instrumentator
 
 model_mape_gauge = Gauge(
@@ -9,6 +9,18 @@ model_mape_gauge = Gauge(
     ["grade"],
 )
 
+circuit_breaker_state_gauge = Gauge(
+    "eggprice_circuit_breaker_state",
+    "Circuit breaker state (0=closed, 1=half_open, 2=open)",
+    ["name"],
+)
+
+circuit_breaker_transitions = Counter(
+    "eggprice_circuit_breaker_transitions_total",
+    "Circuit breaker state transitions",
+    ["name", "from_state", "to_state"],
+)
+
 
 def setup_metrics(app):
     """Instrument the FastAPI app with Prometheus metrics."""
@@ -11,6 +11,7 @@ from datetime import date
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import settings
 from app.core.database import SessionLocal
 
@@ -19,22 +20,24 @@ logger = logging.getLogger(__name__)
 scheduler = BackgroundScheduler()
 
 
-_celery_status: bool | None = None  # cached result
+# Jobs run locally while the broker circuit is open and go back to Celery
+# once a half-open probe reaches it again.
+_celery_breaker = CircuitBreaker("celery_broker", failure_threshold=1)
 
 
 def _celery_available() -> bool:
-    """Check if Celery broker (Redis) is reachable. Result is cached."""
-    global _celery_status
-    if _celery_status is not None:
-        return _celery_status
+    """Check if Celery broker (Redis) is reachable, via the circuit breaker."""
+    if not _celery_breaker.allow_request():
+        return False
     try:
         import redis
         r = redis.from_url(settings.CELERY_BROKER_URL, socket_connect_timeout=1)
         r.ping()
-        _celery_status = True
     except Exception:
-        _celery_status = False
-    return _celery_status
+        _celery_breaker.record_failure()
+        return False
+    _celery_breaker.record_success()
+    return True
 
 
 def _run_async(coro):
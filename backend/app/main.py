@@ -8,15 +8,17 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.core.cache import close_async_redis, start_invalidation_listener, stop_invalidation_listener
 from app.core.config import settings
 from app.core.database import Base, engine, init_timescaledb
+from app.core.executors import shutdown_executors
 from app.core.migrate import run_migrations
 from app.core.rate_limit import limiter
 from app.core.scheduler import start_scheduler, shutdown_scheduler
 from app.api import prices, predictions, alerts, market_data, auth, email_report, oauth
 
 # Import all models so Base.metadata knows about them
-from app.models import price, prediction, alert, user  # noqa: F401
+from app.models import price, prediction, alert, user, feature  # noqa: F401
 from app.models import market_data as market_data_models  # noqa: F401
 
 
@@ -65,9 +67,13 @@ async def lifespan(app: FastAPI):
         db.close()
     except Exception:
         pass  # non-fatal: first request will populate cache
+    start_invalidation_listener()
 
     yield
+    stop_invalidation_listener()
     shutdown_scheduler()
+    shutdown_executors()
+    await close_async_redis()
 
 
 app = FastAPI(
@@ -0,0 +1,145 @@
+"""Pickle-free, mmap-able model bundle.
+
+One file per (grade, version) in the safetensors layout:
+
+    8-byte little-endian header length N
+    N bytes of JSON: {"__metadata__": {"manifest": "<json>"},
+                      "<name>": {"dtype": "F32", "shape": [...], "data_offsets": [start, end]}, ...}
+    raw little-endian tensor data
+
+Tensors are the model state dict plus the scaler's min/scale arrays
+("scaler.feature.min", ...). The manifest records grade, version, feature
+columns and horizons, so a bundle is self-describing and can be checked
+against the running code before use.
+
+Loading maps the file copy-on-write: weights are views into the page cache
+(shared by every worker that maps the same file) rather than unpickled
+copies, and nothing in the file can execute code.
+"""
+
+import json
+import struct
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+from app.ml.preprocessing import FEATURE_COLUMNS, HORIZONS, MinMaxScaler, PriceScaler
+
+BUNDLE_FORMAT_VERSION = 1
+
+_DTYPES = {"F64": np.float64, "F32": np.float32, "I64": np.int64}
+_DTYPE_NAMES = {np.dtype(v): k for k, v in _DTYPES.items()}
+_SCALER_PREFIX = "scaler."
+
+
+def write_bundle(
+    f: BinaryIO,
+    state_dict: dict,
+    scaler: PriceScaler,
+    grade: str,
+    model_version: str,
+    quantiles: tuple[float, ...] | None = None,
+    architecture: dict | None = None,
+):
+    """Serialize weights, scaler arrays and manifest to a binary file object.
+
+    `quantiles` marks a quantile-head model; serving reads it back from the
+    manifest to pick quantile intervals over MC Dropout. `architecture`
+    holds non-default EggPriceLSTM sizes/dropout of a tuned model.
+    """
+    arrays = {
+        "scaler.feature.min": scaler.feature_scaler.min_,
+        "scaler.feature.scale": scaler.feature_scaler.scale_,
+        "scaler.target.min": scaler.target_scaler.min_,
+        "scaler.target.scale": scaler.target_scaler.scale_,
+    }
+    arrays.update({name: t.detach().cpu().numpy() for name, t in state_dict.items()})
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    # Widest dtypes first so every tensor stays aligned to its itemsize
+    order = sorted(arrays, key=lambda name: -arrays[name].dtype.itemsize)
+
+    manifest = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "grade": grade,
+        "model_version": model_version,
+        "features": FEATURE_COLUMNS,
+        "horizons": HORIZONS,
+        "head": "quantile" if quantiles else "point",
+        "quantiles": list(quantiles) if quantiles else None,
+        "architecture": architecture or {},
+        "tensors": [name for name in order if not name.startswith(_SCALER_PREFIX)],
+    }
+    header = {"__metadata__": {"manifest": json.dumps(manifest, ensure_ascii=False)}}
+    offset = 0
+    for name in order:
+        a = arrays[name]
+        header[name] = {
+            "dtype": _DTYPE_NAMES[a.dtype],
+            "shape": list(a.shape),
+            "data_offsets": [offset, offset + a.nbytes],
+        }
+        offset += a.nbytes
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    header_bytes += b" " * (-len(header_bytes) % 8)
+    f.write(struct.pack("<Q", len(header_bytes)))
+    f.write(header_bytes)
+    for name in order:
+        f.write(arrays[name].tobytes())
+
+
+class ModelBundle:
+    """Memory-mapped view of a bundle file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_len))
+        self.manifest = json.loads(header.pop("__metadata__")["manifest"])
+        if self.manifest["format_version"] != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported bundle format: {self.manifest['format_version']}")
+
+        # Copy-on-write: arrays are writable (torch needs that) but edits
+        # never reach the file and untouched pages stay shared.
+        data = np.memmap(self.path, dtype=np.uint8, mode="c", offset=8 + header_len)
+        self.arrays = {}
+        for name, info in header.items():
+            start, end = info["data_offsets"]
+            self.arrays[name] = data[start:end].view(_DTYPES[info["dtype"]]).reshape(info["shape"])
+
+    def check_compatible(self):
+        """Raise ValueError if the bundle was built for other features/horizons."""
+        if self.manifest["features"] != FEATURE_COLUMNS:
+            raise ValueError(f"Bundle {self.path.name} was trained on different features")
+        if self.manifest["horizons"] != HORIZONS:
+            raise ValueError(f"Bundle {self.path.name} predicts different horizons")
+
+    @property
+    def quantiles(self) -> tuple[float, ...] | None:
+        q = self.manifest.get("quantiles")
+        return tuple(q) if q else None
+
+    @property
+    def architecture(self) -> dict:
+        """EggPriceLSTM keyword arguments (empty for default-sized models)."""
+        return self.manifest.get("architecture") or {}
+
+    def state_dict(self) -> dict:
+        """Model weights as torch tensors sharing the mapped memory."""
+        import torch
+
+        return {name: torch.from_numpy(self.arrays[name]) for name in self.manifest["tensors"]}
+
+    def scaler(self) -> PriceScaler:
+        """Rebuild a fitted PriceScaler from the stored min/scale arrays."""
+        scaler = PriceScaler()
+        scaler.feature_scaler = MinMaxScaler.from_arrays(
+            self.arrays["scaler.feature.min"], self.arrays["scaler.feature.scale"]
+        )
+        scaler.target_scaler = MinMaxScaler.from_arrays(
+            self.arrays["scaler.target.min"], self.arrays["scaler.target.scale"]
+        )
+        return scaler
+
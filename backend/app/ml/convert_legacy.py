@@ -0,0 +1,78 @@
+"""One-time conversion of legacy model artifacts.
+
+Scalers pickled before the NumPy MinMaxScaler hold scikit-learn objects, so
+unpickling them needs scikit-learn installed. This rewrites each such
+scaler_*.pkl with the NumPy scaler and, where the matching .pt exists,
+writes the pickle-free .safetensors bundle the registry prefers.
+
+Run once per models directory (needs scikit-learn and torch):
+    python -m app.ml.convert_legacy
+    python -m app.ml.convert_legacy --models-dir /path/to/trained_models
+"""
+
+import argparse
+import logging
+import pickle
+from functools import partial
+from pathlib import Path
+
+import torch
+
+from app.ml.bundle import write_bundle
+from app.ml.registry import MODELS_DIR, bundle_path
+from app.ml.train import _atomic_write
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def convert_scaler(path: Path) -> bool:
+    """Rewrite a legacy sklearn-backed scaler pickle. Returns True if changed."""
+    if b"sklearn" not in path.read_bytes():
+        return False
+    with open(path, "rb") as f:
+        scaler = pickle.load(f)  # PriceScaler.__setstate__ converts to NumPy
+    _atomic_write(path, lambda f: pickle.dump(scaler, f))
+    return True
+
+
+def convert_models_dir(models_dir: Path = MODELS_DIR) -> dict[str, list[str]]:
+    """Convert every legacy scaler and write missing bundles in `models_dir`."""
+    converted = {"scalers": [], "bundles": []}
+    for scaler_path in sorted(models_dir.glob("scaler_*.pkl")):
+        if convert_scaler(scaler_path):
+            converted["scalers"].append(scaler_path.name)
+            logger.info(f"Converted scaler {scaler_path.name}")
+
+        grade, version = scaler_path.stem.removeprefix("scaler_").split("_", 1)
+        model_path = models_dir / f"egg_price_lstm_{grade}_{version}.pt"
+        target = bundle_path(grade, version, models_dir)
+        if not model_path.exists() or target.exists():
+            continue
+
+        state_dict = torch.load(model_path, map_location="cpu", weights_only=True)
+        with open(scaler_path, "rb") as f:
+            scaler = pickle.load(f)
+        write = partial(
+            write_bundle, state_dict=state_dict, scaler=scaler, grade=grade, model_version=version
+        )
+        _atomic_write(target, write)
+        converted["bundles"].append(target.name)
+        logger.info(f"Wrote bundle {target.name}")
+
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert legacy model artifacts")
+    parser.add_argument("--models-dir", type=Path, default=MODELS_DIR)
+    args = parser.parse_args()
+
+    result = convert_models_dir(args.models_dir)
+    logger.info(
+        f"Converted {len(result['scalers'])} scalers, wrote {len(result['bundles'])} bundles"
+    )
+
+
+if __name__ == "__main__":
+    main()
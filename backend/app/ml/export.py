@@ -0,0 +1,80 @@
+"""Export trained EggPriceLSTM weights to ONNX for torch-free serving.
+
+nn.Dropout is a no-op in an exported inference graph, so MC Dropout can't
+rely on it. The exported graph instead takes the two dropout masks as
+explicit inputs (already scaled by 1/(1-p)); the caller samples them per
+pass. All-ones masks give the deterministic eval-mode prediction.
+
+    inputs:  x (B, 30, 15), mask1 (B, 30, hidden_1), mask2 (B, hidden_2)
+    output:  preds (B, 3), or (B, 3, num_quantiles) for a quantile head
+"""
+
+import inspect
+import io
+
+import torch
+from torch import nn
+
+from app.ml.model import EggPriceLSTM
+from app.ml.preprocessing import FEATURE_COLUMNS, SEQUENCE_LENGTH
+
+ONNX_OPSET = 17
+
+
+class _MaskedDropoutGraph(nn.Module):
+    """EggPriceLSTM forward pass with dropout replaced by mask inputs."""
+
+    def __init__(self, model: EggPriceLSTM):
+        super().__init__()
+        self.model = model
+
+    def forward(self, x: torch.Tensor, mask1: torch.Tensor, mask2: torch.Tensor) -> torch.Tensor:
+        m = self.model
+        out, _ = m.lstm1(x)
+        out = out * mask1
+        out, _ = m.lstm2(out)
+        out = out[:, -1, :] * mask2
+        out = m.relu1(m.fc1(out))
+        out = m.relu2(m.fc2(out))
+        out = m.output(out)
+        if m.quantiles:
+            out = out.view(-1, m.num_horizons, len(m.quantiles))
+        return out
+
+
+def _export_options() -> dict:
+    """Select the TorchScript exporter on torch >= 2.5, whose default is the
+    dynamo one; older releases (requirements.txt documents 2.2) have no
+    `dynamo` argument at all.
+    """
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        return {"dynamo": False}
+    return {}
+
+
+def export_onnx(
+    state_dict: dict,
+    quantiles: tuple[float, ...] | None = None,
+    architecture: dict | None = None,
+) -> bytes:
+    """Serialize an EggPriceLSTM state dict to an ONNX graph with mask inputs."""
+    model = EggPriceLSTM(quantiles=quantiles, **(architecture or {}))
+    model.load_state_dict(state_dict)
+    graph = _MaskedDropoutGraph(model).eval()
+
+    x = torch.zeros(1, SEQUENCE_LENGTH, len(FEATURE_COLUMNS))
+    mask1 = torch.ones(1, SEQUENCE_LENGTH, model.lstm1.hidden_size)
+    mask2 = torch.ones(1, model.lstm2.hidden_size)
+
+    buf = io.BytesIO()
+    torch.onnx.export(
+        graph,
+        (x, mask1, mask2),
+        buf,
+        input_names=["x", "mask1", "mask2"],
+        output_names=["preds"],
+        dynamic_axes={"x": {0: "batch"}, "mask1": {0: "batch"}, "mask2": {0: "batch"}, "preds": {0: "batch"}},
+        opset_version=ONNX_OPSET,
+        **_export_options(),
+    )
+    return buf.getvalue()
@@ -0,0 +1,156 @@
+"""Incrementally maintained feature store (egg_price_features table).
+
+Holds one row of the 15 FEATURE_COLUMNS per (grade, date) so inference can
+read just the last SEQUENCE_LENGTH rows instead of rebuilding every rolling
+feature from the full price history.
+
+When data is ingested only rows from the earliest changed date (or the day
+after the last stored row, if earlier) onward are recomputed, using
+FEATURE_CONTEXT_DAYS of earlier history so the 7/14-day rolling windows and
+forward-filled market columns see the same inputs as a full rebuild.
+"""
+
+import logging
+from datetime import date, timedelta
+
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.ml.preprocessing import (
+    FEATURE_COLUMNS,
+    SEQUENCE_LENGTH,
+    build_features_from_db_for_grades,
+)
+from app.models.feature import EggPriceFeature
+from app.models.price import EggPrice
+
+logger = logging.getLogger(__name__)
+
+# History read before the first recomputed row. Must cover the longest
+# rolling window (14 days) plus gaps in weekly sources that get forward-filled.
+FEATURE_CONTEXT_DAYS = 60
+
+
+def refresh_features(db: Session, grade: str, since: date | None = None) -> int:
+    """Recompute stored features for `grade` from `since` onward.
+
+    With `since=None` the grade's features are rebuilt from scratch.
+    Rows are upserted on (grade, date), so concurrent refreshes of the same
+    grade (e.g. the collector and a prediction run catching up) don't
+    collide on uq_feature_grade_date. Returns the number of rows written.
+    """
+    start = None if since is None else since - timedelta(days=FEATURE_CONTEXT_DAYS)
+    df = build_features_from_db_for_grades(db, [grade], start_date=start).get(grade)
+
+    if df is not None and since is not None:
+        df = df[df["date"] >= pd.Timestamp(since)]
+    rows = [] if df is None else [
+        {"grade": grade, "date": d.date(), **{col: float(v) for col, v in zip(FEATURE_COLUMNS, values)}}
+        for d, values in zip(df["date"], df[FEATURE_COLUMNS].to_numpy())
+    ]
+    if rows:
+        db.execute(_upsert_statement(db), rows)
+
+    # Drop rows for days that no longer have a retail price
+    existing = db.query(EggPriceFeature.date).filter(EggPriceFeature.grade == grade)
+    if since is not None:
+        existing = existing.filter(EggPriceFeature.date >= since)
+    stale = {d for (d,) in existing} - {r["date"] for r in rows}
+    if stale:
+        db.query(EggPriceFeature).filter(
+            EggPriceFeature.grade == grade, EggPriceFeature.date.in_(stale)
+        ).delete(synchronize_session=False)
+
+    db.commit()
+    return len(rows)
+
+
+def _upsert_statement(db: Session):
+    """INSERT ... ON CONFLICT (grade, date) DO UPDATE for the session's dialect."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    stmt = insert(EggPriceFeature)
+    return stmt.on_conflict_do_update(
+        index_elements=["grade", "date"],
+        set_={col: stmt.excluded[col] for col in FEATURE_COLUMNS},
+    )
+
+
+def _latest_stored(db: Session, grades: list[str]) -> dict[str, date]:
+    """Date of the newest stored feature row per grade."""
+    return dict(
+        db.query(EggPriceFeature.grade, func.max(EggPriceFeature.date))
+        .filter(EggPriceFeature.grade.in_(grades))
+        .group_by(EggPriceFeature.grade)
+        .all()
+    )
+
+
+def update_feature_store(db: Session, grades: list[str], since: date | None = None) -> dict[str, int]:
+    """Refresh the feature store for several grades after new data lands.
+
+    `since` is the earliest date whose inputs changed, including backfilled
+    or corrected past prices. A grade whose stored rows end before it is
+    recomputed from the day after its last row instead, so days missed by
+    an earlier run aren't left as a gap in the input window.
+    """
+    if since is None:
+        return {grade: refresh_features(db, grade) for grade in grades}
+
+    latest_stored = _latest_stored(db, grades)
+    written = {}
+    for grade in grades:
+        stored = latest_stored.get(grade)
+        start = None if stored is None else min(since, stored + timedelta(days=1))
+        written[grade] = refresh_features(db, grade, start)
+    return written
+
+
+def get_recent_features(
+    db: Session,
+    grades: list[str],
+    n: int = SEQUENCE_LENGTH,
+) -> dict[str, pd.DataFrame]:
+    """Return the last `n` feature rows per grade, oldest first.
+
+    Grades whose stored features lag behind the latest egg price are
+    brought up to date first, so callers always see current inputs.
+    Grades without price data are omitted from the result.
+    """
+    latest_price = dict(
+        db.query(EggPrice.grade, func.max(EggPrice.date))
+        .filter(EggPrice.grade.in_(grades), EggPrice.retail_price.isnot(None))
+        .group_by(EggPrice.grade)
+        .all()
+    )
+    latest_stored = _latest_stored(db, grades)
+
+    results = {}
+    for grade, last_price_date in latest_price.items():
+        stored = latest_stored.get(grade)
+        if stored is None:
+            logger.info(f"Feature store empty for {grade}, building")
+            refresh_features(db, grade)
+        elif stored < last_price_date:
+            refresh_features(db, grade, since=stored + timedelta(days=1))
+
+        rows = (
+            db.query(EggPriceFeature)
+            .filter(EggPriceFeature.grade == grade)
+            .order_by(EggPriceFeature.date.desc())
+            .limit(n)
+            .all()
+        )
+        rows.reverse()
+        df = pd.DataFrame(
+            [[r.date] + [getattr(r, col) for col in FEATURE_COLUMNS] for r in rows],
+            columns=["date"] + FEATURE_COLUMNS,
+        )
+        df["date"] = pd.to_datetime(df["date"])
+        results[grade] = df
+
+    return results
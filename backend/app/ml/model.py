@@ -1,5 +1,9 @@
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
+
+# Quantile head outputs: 5th / 50th / 95th percentile → median + 90% interval
+QUANTILES = (0.05, 0.5, 0.95)
 
 
 class EggPriceLSTM(nn.Module):
@@ -12,6 +16,12 @@ class EggPriceLSTM(nn.Module):
         → Dense(32, ReLU)
         → Dense(16, ReLU)
         → Output (3 values: 7d, 14d, 30d predictions)
+
+    With `quantiles`, the output layer instead predicts one value per
+    (horizon, quantile) and forward returns (batch, 3, len(quantiles)).
+
+    Layer sizes and dropout are tunable (see app.ml.tune); `architecture`
+    records them so a bundle can rebuild the same network.
     """
 
     def __init__(
@@ -23,8 +33,18 @@ class EggPriceLSTM(nn.Module):
         dense_size_2: int = 16,
         dropout: float = 0.2,
         num_horizons: int = 3,
+        quantiles: tuple[float, ...] | None = None,
     ):
         super().__init__()
+        self.num_horizons = num_horizons
+        self.quantiles = tuple(quantiles) if quantiles else None
+        self.architecture = {
+            "hidden_size_1": hidden_size_1,
+            "hidden_size_2": hidden_size_2,
+            "dense_size_1": dense_size_1,
+            "dense_size_2": dense_size_2,
+            "dropout": dropout,
+        }
 
         self.lstm1 = nn.LSTM(
             input_size=input_size,
@@ -44,27 +64,58 @@ class EggPriceLSTM(nn.Module):
         self.relu1 = nn.ReLU()
         self.fc2 = nn.Linear(dense_size_1, dense_size_2)
         self.relu2 = nn.ReLU()
-        self.output = nn.Linear(dense_size_2, num_horizons)
+        num_outputs = num_horizons * (len(self.quantiles) if self.quantiles else 1)
+        self.output = nn.Linear(dense_size_2, num_outputs)
 
-    def forward(self, x: torch.Tensor) -> torch.Tensor:
+    def forward(self, x: torch.Tensor, stochastic: bool | None = None) -> torch.Tensor:
         """
         Args:
             x: (batch, seq_len=30, input_size=15)
+            stochastic: apply dropout (True) or not (False) regardless of
+                module mode, so a shared model can serve MC dropout and
+                deterministic calls concurrently. None follows each
+                Dropout module's training flag.
 
         Returns:
-            predictions: (batch, 3) — [7d, 14d, 30d] predictions
+            predictions: (batch, 3) — [7d, 14d, 30d] predictions, or
+            (batch, 3, num_quantiles) for a quantile head
         """
         # LSTM layer 1
         out, _ = self.lstm1(x)
-        out = self.dropout1(out)
+        out = self._dropout(self.dropout1, out, stochastic)
 
         # LSTM layer 2 — use full sequence from layer 1
         out, _ = self.lstm2(out)
-        out = self.dropout2(out[:, -1, :])  # take last time step
+        out = self._dropout(self.dropout2, out[:, -1, :], stochastic)  # take last time step
 
         # Dense layers
         out = self.relu1(self.fc1(out))
         out = self.relu2(self.fc2(out))
         out = self.output(out)
 
+        if self.quantiles:
+            out = out.view(-1, self.num_horizons, len(self.quantiles))
         return out
+
+    @staticmethod
+    def _dropout(module: nn.Dropout, x: torch.Tensor, stochastic: bool | None) -> torch.Tensor:
+        training = module.training if stochastic is None else stochastic
+        return F.dropout(x, module.p, training=training)
+
+    def point(self, preds: torch.Tensor) -> torch.Tensor:
+        """(batch, 3) point forecast from forward() output (median for quantile heads)."""
+        if not self.quantiles:
+            return preds
+        return preds[..., self.quantiles.index(0.5)]
+
+
+def pinball_loss(preds: torch.Tensor, target: torch.Tensor, quantiles: tuple[float, ...]) -> torch.Tensor:
+    """Mean quantile (pinball) loss.
+
+    Args:
+        preds: (batch, horizons, num_quantiles)
+        target: (batch, horizons)
+    """
+    q = preds.new_tensor(quantiles)
+    err = target.unsqueeze(-1) - preds
+    return torch.maximum(q * err, (q - 1) * err).mean()
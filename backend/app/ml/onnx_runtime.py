@@ -0,0 +1,78 @@
+"""Lean ONNX Runtime inference for exported EggPriceLSTM graphs.
+
+Depends only on numpy and onnxruntime, so an API or worker process serving
+predictions never has to import torch.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from app.ml.preprocessing import PriceScaler
+
+DROPOUT_P = 0.2
+
+
+class OnnxLSTM:
+    """ONNX Runtime session for a graph produced by app.ml.export."""
+
+    def __init__(
+        self,
+        path: Path,
+        dropout: float = DROPOUT_P,
+        quantiles: tuple[float, ...] | None = None,
+    ):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(path), opts, providers=["CPUExecutionProvider"])
+        self.dropout = dropout
+        self.quantiles = quantiles
+
+        shapes = {i.name: i.shape for i in self.session.get_inputs()}
+        self.hidden_1 = shapes["mask1"][2]
+        self.hidden_2 = shapes["mask2"][1]
+
+    def run(self, x: np.ndarray, mask1: np.ndarray, mask2: np.ndarray) -> np.ndarray:
+        """Raw forward pass: (B, 30, 15) inputs → (B, 3) scaled predictions
+        ((B, 3, num_quantiles) for a quantile head)."""
+        (preds,) = self.session.run(
+            None,
+            {
+                "x": x.astype(np.float32, copy=False),
+                "mask1": mask1.astype(np.float32, copy=False),
+                "mask2": mask2.astype(np.float32, copy=False),
+            },
+        )
+        return preds
+
+    def sample_masks(self, passes: int, seq_len: int, rng: np.random.Generator | None = None):
+        """Draw inverted-dropout masks matching nn.Dropout in train mode."""
+        rng = rng or np.random.default_rng()
+        keep = 1.0 - self.dropout
+        mask1 = (rng.random((passes, seq_len, self.hidden_1)) < keep).astype(np.float32) / keep
+        mask2 = (rng.random((passes, self.hidden_2)) < keep).astype(np.float32) / keep
+        return mask1, mask2
+
+    def mc_dropout_predict(
+        self,
+        input_seq: np.ndarray,
+        scaler: PriceScaler,
+        passes: int,
+        rng: np.random.Generator | None = None,
+    ) -> np.ndarray:
+        """Batched MC Dropout; returns (passes, num_horizons) original-scale predictions."""
+        x = np.broadcast_to(input_seq, (passes, *input_seq.shape[1:]))
+        mask1, mask2 = self.sample_masks(passes, input_seq.shape[1], rng)
+        preds = self.run(np.ascontiguousarray(x), mask1, mask2)
+        if self.quantiles:
+            preds = preds[..., self.quantiles.index(0.5)]
+        return scaler.inverse_transform_targets(preds)
+
+    def quantile_predict(self, input_seq: np.ndarray, scaler: PriceScaler) -> np.ndarray:
+        """Deterministic pass of a quantile head; returns (num_horizons, num_quantiles)."""
+        ones1 = np.ones((1, input_seq.shape[1], self.hidden_1), dtype=np.float32)
+        ones2 = np.ones((1, self.hidden_2), dtype=np.float32)
+        preds = self.run(input_seq, ones1, ones2)[0]  # (3, Q)
+        return scaler.inverse_transform_targets(preds.T).T
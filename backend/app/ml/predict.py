@@ -1,25 +1,41 @@
-"""Inference wrapper with MC Dropout for 90% confidence intervals."""
+"""Inference wrapper with MC Dropout for 90% confidence intervals.
+
+Quantile-head models (bundle manifest head="quantile") instead read the
+interval straight from their 5th/95th percentile outputs in one
+deterministic pass; PREDICTION_INTERVAL="mc" forces MC Dropout (on the
+median output) for them too.
+
+torch is imported lazily: with INFERENCE_RUNTIME="onnx" the registry serves
+OnnxLSTM sessions and the serving process never loads it.
+"""
+
+from __future__ import annotations
 
 import logging
-import pickle
 from datetime import date, timedelta
-from pathlib import Path
+from typing import TYPE_CHECKING
 
 import numpy as np
-import torch
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.ml.model import EggPriceLSTM
+from app.ml.feature_store import get_recent_features
+from app.ml.onnx_runtime import OnnxLSTM
 from app.ml.preprocessing import (
+    HORIZONS,
     SEQUENCE_LENGTH,
     PriceScaler,
-    build_features_from_db,
 )
+from app.ml.registry import model_registry
+
+if TYPE_CHECKING:
+    import torch
+
+    from app.ml.model import EggPriceLSTM
 
 logger = logging.getLogger(__name__)
 
-MODELS_DIR = Path(__file__).resolve().parent.parent.parent / "trained_models"
 MC_DROPOUT_PASSES = 50
 # 90% confidence interval → z = 1.645
 CI_Z_SCORE = 1.645
@@ -27,34 +43,125 @@ CI_Z_SCORE = 1.645
 
 def _enable_mc_dropout(model: EggPriceLSTM):
     """Enable dropout layers during inference for MC Dropout."""
+    import torch
+
     for module in model.modules():
         if isinstance(module, torch.nn.Dropout):
             module.train()
 
 
-def load_model(grade: str, model_version: str | None = None) -> tuple[EggPriceLSTM, PriceScaler]:
-    """Load trained model and scaler from disk."""
-    if model_version is None:
-        model_version = settings.MODEL_VERSION
+def mc_dropout_predict(
+    model: EggPriceLSTM,
+    input_tensor: torch.Tensor,
+    scaler: PriceScaler,
+    passes: int = MC_DROPOUT_PASSES,
+) -> np.ndarray:
+    """Run all MC Dropout passes as a single batched forward pass.
+
+    The (1, seq_len, num_features) input is tiled to (passes, seq_len,
+    num_features); each row draws its own dropout mask, so the batch is
+    equivalent to `passes` independent stochastic passes. Dropout is
+    forced on per call rather than by switching module mode, so the
+    shared registry model stays usable from other threads.
+
+    Returns:
+        (passes, num_horizons) predictions on the original price scale
+    """
+    import torch
+
+    batch = input_tensor.expand(passes, -1, -1)
+    with torch.no_grad():
+        preds = model.point(model(batch, stochastic=True)).cpu().numpy()  # (passes, 3)
+
+    return scaler.inverse_transform_targets(preds)
+
 
-    model_path = MODELS_DIR / f"egg_price_lstm_{grade}_{model_version}.pt"
-    scaler_path = MODELS_DIR / f"scaler_{grade}_{model_version}.pkl"
+def quantile_predict(
+    model: EggPriceLSTM,
+    input_tensor: torch.Tensor,
+    scaler: PriceScaler,
+) -> np.ndarray:
+    """Deterministic pass of a quantile head.
 
-    if not model_path.exists():
-        raise FileNotFoundError(f"Model file not found: {model_path}")
-    if not scaler_path.exists():
-        raise FileNotFoundError(f"Scaler file not found: {scaler_path}")
+    Returns:
+        (num_horizons, num_quantiles) predictions on the original price scale
+    """
+    import torch
+
+    with torch.no_grad():
+        preds = model(input_tensor, stochastic=False)[0].cpu().numpy()  # (3, Q)
+
+    return scaler.inverse_transform_targets(preds.T).T
 
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-    model = EggPriceLSTM()
-    model.load_state_dict(torch.load(model_path, map_location=device, weights_only=True))
-    model.to(device)
+def model_device(model: EggPriceLSTM) -> torch.device:
+    """Device of a torch model; int8-quantized models have no parameters and run on CPU."""
+    import torch
 
-    with open(scaler_path, "rb") as f:
-        scaler = pickle.load(f)
+    param = next(model.parameters(), None)
+    return param.device if param is not None else torch.device("cpu")
+
+
+def _forecast(
+    model: EggPriceLSTM | OnnxLSTM,
+    input_seq: np.ndarray,
+    scaler: PriceScaler,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Point forecast and 90% interval for one (seq_len, num_features) window.
+
+    Dispatches on the model's runtime (torch / ONNX) and head (quantile
+    outputs or MC Dropout). Returns (center, lower, upper), one value per
+    horizon, on the original price scale.
+    """
+    use_quantiles = bool(model.quantiles) and settings.PREDICTION_INTERVAL != "mc"
+
+    if isinstance(model, OnnxLSTM):
+        x = input_seq[np.newaxis].astype(np.float32)
+        if use_quantiles:
+            return _quantile_interval(model.quantile_predict(x, scaler), model.quantiles)
+        return _mc_interval(model.mc_dropout_predict(x, scaler, MC_DROPOUT_PASSES))
+
+    import torch
+
+    device = model_device(model)
+    input_tensor = torch.from_numpy(np.ascontiguousarray(input_seq, dtype=np.float32))
+    input_tensor = input_tensor.unsqueeze(0).to(device)
+    if use_quantiles:
+        return _quantile_interval(quantile_predict(model, input_tensor, scaler), model.quantiles)
+    return _mc_interval(mc_dropout_predict(model, input_tensor, scaler))
+
+
+def _mc_interval(preds_original: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(passes, 3) MC samples → mean ± z·std."""
+    mean_preds = preds_original.mean(axis=0)
+    std_preds = preds_original.std(axis=0)
+    # 90% CI = mean ± 1.645 * std
+    return mean_preds, mean_preds - CI_Z_SCORE * std_preds, mean_preds + CI_Z_SCORE * std_preds
 
-    return model, scaler
+
+def _quantile_interval(
+    preds_original: np.ndarray,
+    quantiles: tuple[float, ...],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(3, Q) quantile outputs → median with the outermost quantiles as bounds."""
+    # Independently trained quantiles can cross; sorting restores monotonicity
+    q = np.sort(preds_original, axis=1)
+    return q[:, quantiles.index(0.5)], q[:, 0], q[:, -1]
+
+
+def load_model(
+    grade: str,
+    model_version: str | None = None,
+    runtime: str | None = None,
+) -> tuple[EggPriceLSTM | OnnxLSTM, PriceScaler]:
+    """Load trained model and scaler, served warm from the model registry.
+
+    `runtime` defaults to settings.INFERENCE_RUNTIME.
+    """
+    if model_version is None:
+        model_version = settings.MODEL_VERSION
+
+    return model_registry.get(grade, model_version, runtime)
 
 
 def predict_prices(
@@ -72,10 +179,11 @@ def predict_prices(
         model_version = settings.MODEL_VERSION
 
     model, scaler = load_model(grade, model_version)
-    device = next(model.parameters()).device
 
-    # Build features from all DB sources for this grade
-    df = build_features_from_db(db, grade)
+    # Last SEQUENCE_LENGTH feature rows from the incremental feature store
+    df = get_recent_features(db, [grade]).get(grade)
+    if df is None:
+        raise ValueError(f"No price data for grade '{grade}'")
 
     if len(df) < SEQUENCE_LENGTH:
         raise ValueError(
@@ -85,55 +193,121 @@ def predict_prices(
     features = scaler.transform_features(df)
     # Take the last SEQUENCE_LENGTH steps as input
     input_seq = features[-SEQUENCE_LENGTH:]
-    input_tensor = torch.FloatTensor(input_seq).unsqueeze(0).to(device)
 
-    # MC Dropout: run multiple forward passes with dropout enabled
-    model.eval()
-    _enable_mc_dropout(model)
+    # MC Dropout (one batched forward pass) or quantile head outputs
+    interval = _forecast(model, input_seq, scaler)
 
-    all_preds = []
-    with torch.no_grad():
-        for _ in range(MC_DROPOUT_PASSES):
-            pred = model(input_tensor)  # (1, 3)
-            all_preds.append(pred.cpu().numpy())
+    # Latest date with an actual retail price (df is built from those rows)
+    base = df["date"].iloc[-1].date()
 
-    all_preds = np.array(all_preds).squeeze()  # (MC_PASSES, 3)
+    return _summarize_predictions(grade, base, *interval, model_version)
 
-    # Inverse transform to original scale
-    preds_original = np.array([
-        scaler.inverse_transform_targets(p.reshape(1, -1)).flatten()
-        for p in all_preds
-    ])
 
-    mean_preds = preds_original.mean(axis=0)
-    std_preds = preds_original.std(axis=0)
+def predict_all_grades(
+    db: Session,
+    grades: list[str],
+    model_version: str | None = None,
+) -> list[dict]:
+    """Multi-grade inference for the nightly prediction run.
+
+    Loads every grade's model from the registry and reads all input
+    windows from the feature store in one query before running any model.
+    Failures are isolated per grade, as in run_predictions: a grade whose
+    model is missing or incompatible, whose window is too short, or whose
+    features can't be read is logged and skipped, and the other grades'
+    predictions are still returned.
+
+    Returns the same dicts as `predict_prices`, concatenated over grades.
+    """
+    if model_version is None:
+        model_version = settings.MODEL_VERSION
+
+    models = {}
+    for grade in grades:
+        try:
+            models[grade] = load_model(grade, model_version)
+        except FileNotFoundError:
+            logger.warning(f"No trained model found for grade={grade}")
+        except ValueError as e:
+            logger.warning(f"Cannot load model for grade={grade}: {e}")
+    if not models:
+        return []
+
+    frames = _read_windows(db, list(models))
+
+    # Build every input window before running any model
+    inputs = {}
+    for grade, (model, scaler) in models.items():
+        df = frames.get(grade)
+        if df is None or len(df) < SEQUENCE_LENGTH:
+            got = 0 if df is None else len(df)
+            logger.warning(
+                f"Cannot predict for grade={grade}: need {SEQUENCE_LENGTH} rows, got {got}"
+            )
+            continue
+        try:
+            features = scaler.transform_features(df)
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Cannot predict for grade={grade}: {e}")
+            continue
+        inputs[grade] = (features[-SEQUENCE_LENGTH:], df["date"].iloc[-1].date())
+
+    # One forward pass per grade: each grade has its own weights, and
+    # torch.func.vmap has no batching rule for nn.LSTM to stack them.
+    results = []
+    for grade, (input_seq, base) in inputs.items():
+        model, scaler = models[grade]
+        try:
+            interval = _forecast(model, input_seq, scaler)
+        except (RuntimeError, ValueError) as e:
+            logger.warning(f"Cannot predict for grade={grade}: {e}")
+            continue
+        results.extend(_summarize_predictions(grade, base, *interval, model_version))
+
+    return results
+
 
-    # Get the latest date from actual data
-    from app.models.price import EggPrice
-    latest = (
-        db.query(EggPrice)
-        .filter(EggPrice.grade == grade, EggPrice.retail_price.isnot(None))
-        .order_by(EggPrice.date.desc())
-        .first()
-    )
-    base = latest.date if latest else date.today()
-
-    horizons = [7, 14, 30]
+def _read_windows(db: Session, grades: list[str]) -> dict:
+    """get_recent_features for all grades; on a DB error, retry grade by grade
+    so one grade's failing refresh doesn't cost the others their window.
+    """
+    try:
+        return get_recent_features(db, grades)
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.warning(f"Feature read failed for {grades}, retrying per grade: {e}")
+
+    frames = {}
+    for grade in grades:
+        try:
+            frames.update(get_recent_features(db, [grade]))
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"Cannot read features for grade={grade}: {e}")
+    return frames
+
+
+def _summarize_predictions(
+    grade: str,
+    base: date,
+    center: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    model_version: str,
+) -> list[dict]:
+    """Turn per-horizon point forecasts and 90% bounds into prediction rows."""
     results = []
 
-    for i, h in enumerate(horizons):
+    for i, h in enumerate(HORIZONS):
         target = base + timedelta(days=h)
-        # 90% CI = mean ± 1.645 * std
-        lower = float(mean_preds[i] - CI_Z_SCORE * std_preds[i])
-        upper = float(mean_preds[i] + CI_Z_SCORE * std_preds[i])
 
         results.append({
             "base_date": base,
             "target_date": target,
             "grade": grade,
-            "predicted_price": round(float(mean_preds[i]), 1),
-            "confidence_lower": round(max(lower, 0), 1),
-            "confidence_upper": round(upper, 1),
+            "predicted_price": round(float(center[i]), 1),
+            "confidence_lower": round(max(float(lower[i]), 0), 1),
+            "confidence_upper": round(float(upper[i]), 1),
             "horizon_days": h,
             "model_version": model_version,
         })
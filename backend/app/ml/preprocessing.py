@@ -5,11 +5,14 @@
 
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 SEQUENCE_LENGTH = 30
 
+# Prediction horizons in days (7d, 14d, 30d)
+HORIZONS = [7, 14, 30]
+
 # 15 input features
 FEATURE_COLUMNS = [
     "price",                # 1. 소비자가
@@ -96,6 +99,28 @@ def build_features(df: pd.DataFrame) -> pd.DataFrame:
 
 def build_features_from_db(db_session, grade: str) -> pd.DataFrame:
     """Load all data sources from DB and build a merged feature DataFrame."""
+    frames = build_features_from_db_for_grades(db_session, [grade])
+    if grade not in frames:
+        raise ValueError(f"No price data for grade '{grade}'")
+    return frames[grade]
+
+
+def build_features_from_db_for_grades(
+    db_session,
+    grades: list[str],
+    start_date=None,
+) -> dict[str, pd.DataFrame]:
+    """Build feature DataFrames for several grades from a single SQL statement.
+
+    Egg prices are LEFT JOINed on date to every market table, so the merged
+    dataset for all grades comes back in one round-trip as plain rows (no
+    ORM objects) and is loaded straight into pandas columns. Works on SQLite
+    and PostgreSQL/TimescaleDB alike. Grades without price data are omitted
+    from the result. `start_date` limits the history read (rolling features
+    of the first rows then only see data from that date).
+    """
+    from sqlalchemy import and_, select
+
     from app.models.price import EggPrice
     from app.models.market_data import (
         TradingVolume,
@@ -105,68 +130,69 @@ def build_features_from_db(db_session, grade: str) -> pd.DataFrame:
         WeatherData,
     )
 
-    # Load egg prices
-    prices = (
-        db_session.query(EggPrice)
-        .filter(EggPrice.grade == grade, EggPrice.retail_price.isnot(None))
-        .order_by(EggPrice.date)
-        .all()
+    stmt = (
+        select(
+            EggPrice.grade.label("grade"),
+            EggPrice.date.label("date"),
+            EggPrice.retail_price.label("retail_price"),
+            EggPrice.wholesale_price.label("wholesale_price"),
+            TradingVolume.volume_kg.label("volume"),
+            FeedPrice.price.label("corn_price"),
+            ExchangeRate.usd_krw.label("exchange_rate"),
+            AvianFluStatus.is_outbreak.label("avian_flu"),
+            WeatherData.avg_temperature.label("temperature"),
+        )
+        .outerjoin(TradingVolume, TradingVolume.date == EggPrice.date)
+        # Feed prices (use 옥수수 as corn_price)
+        .outerjoin(FeedPrice, and_(FeedPrice.date == EggPrice.date, FeedPrice.feed_type == "옥수수"))
+        .outerjoin(ExchangeRate, ExchangeRate.date == EggPrice.date)
+        .outerjoin(AvianFluStatus, AvianFluStatus.date == EggPrice.date)
+        .outerjoin(WeatherData, WeatherData.date == EggPrice.date)
+        .where(EggPrice.grade.in_(grades), EggPrice.retail_price.isnot(None))
+        .order_by(EggPrice.grade, EggPrice.date)
     )
-    if not prices:
-        raise ValueError(f"No price data for grade '{grade}'")
+    if start_date is not None:
+        stmt = stmt.where(EggPrice.date >= start_date)
 
-    df = pd.DataFrame([{
-        "date": p.date,
-        "retail_price": p.retail_price,
-        "wholesale_price": p.wholesale_price,
-    } for p in prices])
-
-    # Load and merge supplementary data
-    min_date = df["date"].min()
-
-    # Trading volume
-    volumes = db_session.query(TradingVolume).filter(TradingVolume.date >= min_date).all()
-    if volumes:
-        vol_df = pd.DataFrame([{"date": v.date, "volume": v.volume_kg} for v in volumes])
-        df = df.merge(vol_df, on="date", how="left")
-
-    # Feed prices (use 옥수수 as corn_price)
-    feeds = (
-        db_session.query(FeedPrice)
-        .filter(FeedPrice.date >= min_date, FeedPrice.feed_type == "옥수수")
-        .all()
-    )
-    if feeds:
-        feed_df = pd.DataFrame([{"date": f.date, "corn_price": f.price} for f in feeds])
-        df = df.merge(feed_df, on="date", how="left")
-
-    # Exchange rates
-    rates = db_session.query(ExchangeRate).filter(ExchangeRate.date >= min_date).all()
-    if rates:
-        rate_df = pd.DataFrame([{"date": r.date, "exchange_rate": r.usd_krw} for r in rates])
-        df = df.merge(rate_df, on="date", how="left")
-
-    # Avian flu
-    flu_records = db_session.query(AvianFluStatus).filter(AvianFluStatus.date >= min_date).all()
-    if flu_records:
-        flu_df = pd.DataFrame([{
-            "date": f.date,
-            "avian_flu": 1.0 if f.is_outbreak else 0.0,
-        } for f in flu_records])
-        df = df.merge(flu_df, on="date", how="left")
-
-    # Weather
-    weather = db_session.query(WeatherData).filter(WeatherData.date >= min_date).all()
-    if weather:
-        wx_df = pd.DataFrame([{"date": w.date, "temperature": w.avg_temperature} for w in weather])
-        df = df.merge(wx_df, on="date", how="left")
-
-    # Forward-fill merged columns before feature engineering
-    for col in ["volume", "corn_price", "exchange_rate", "avian_flu", "temperature", "wholesale_price"]:
-        if col in df.columns:
-            df[col] = df[col].ffill().fillna(0.0)
-
-    return build_features(df)
+    result = db_session.execute(stmt)
+    all_df = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+    if all_df.empty:
+        return {}
+
+    # Outbreak flag → 1.0/0.0, keeping NULL (no record that day) for ffill
+    all_df["avian_flu"] = all_df["avian_flu"].astype(float)
+
+    results = {}
+    for grade, df in all_df.groupby("grade", sort=False):
+        df = df.drop(columns="grade").reset_index(drop=True)
+
+        # Forward-fill merged columns before feature engineering
+        for col in ["volume", "corn_price", "exchange_rate", "avian_flu", "temperature", "wholesale_price"]:
+            df[col] = df[col].astype(float).ffill().fillna(0.0)
+
+        results[grade] = build_features(df)
+
+    return results
+
+
+def build_horizon_targets(
+    price: np.ndarray,
+    horizons: list[int] = HORIZONS,
+) -> np.ndarray:
+    """Build the multi-horizon target matrix from shifted views of `price`.
+
+    targets[i, j] = price[i + horizons[j]], or NaN past the end of the series.
+
+    Returns:
+        (N, len(horizons)) float array
+    """
+    price = np.asarray(price, dtype=float)
+    n = len(price)
+    targets = np.full((n, len(horizons)), np.nan)
+    for j, h in enumerate(horizons):
+        if h < n:
+            targets[: n - h, j] = price[h:]
+    return targets
 
 
 def create_sequences(
@@ -176,6 +202,9 @@ def create_sequences(
 ) -> tuple[np.ndarray, np.ndarray | None]:
     """Create sliding window sequences for LSTM input.
 
+    X is a read-only strided view over `features` (no per-window copy);
+    call `np.ascontiguousarray(X)` if a materialised array is needed.
+
     Args:
         features: (N, num_features) array
         targets: (N, num_targets) array or None for inference
@@ -185,18 +214,142 @@ def create_sequences(
         X: (num_sequences, seq_length, num_features)
         y: (num_sequences, num_targets) or None
     """
-    X = []
-    y = [] if targets is not None else None
+    features = np.asarray(features, dtype=np.float32)
+    num_seqs = max(len(features) - seq_length, 0)
+
+    if num_seqs == 0:
+        X = np.empty((0, seq_length, features.shape[1]), dtype=np.float32)
+    else:
+        # (N - seq_length + 1, num_features, seq_length) → (…, seq_length, num_features)
+        windows = sliding_window_view(features, seq_length, axis=0).transpose(0, 2, 1)
+        X = windows[:num_seqs]
+
+    y = None
+    if targets is not None:
+        y = np.asarray(targets, dtype=np.float32)[seq_length : seq_length + num_seqs]
+    return X, y
 
-    for i in range(len(features) - seq_length):
-        X.append(features[i : i + seq_length])
-        if targets is not None:
-            y.append(targets[i + seq_length])
 
-    X = np.array(X, dtype=np.float32)
-    if y is not None:
-        y = np.array(y, dtype=np.float32)
-    return X, y
+class SequenceDataset:
+    """Lazy map-style dataset of sliding windows for `torch.utils.data.DataLoader`.
+
+    Windows are sliced from `features` on demand instead of materialising the
+    full (num_sequences, seq_length, num_features) array. Item i matches
+    `create_sequences(features, targets)[0][start + i]` and its target.
+    """
+
+    def __init__(
+        self,
+        features: np.ndarray,
+        targets: np.ndarray,
+        seq_length: int = SEQUENCE_LENGTH,
+        start: int = 0,
+        stop: int | None = None,
+    ):
+        self.features = np.asarray(features, dtype=np.float32)
+        self.targets = np.asarray(targets, dtype=np.float32)
+        self.seq_length = seq_length
+        num_seqs = max(len(self.features) - seq_length, 0)
+        self.start = start
+        self.stop = num_seqs if stop is None else min(stop, num_seqs)
+
+    def __len__(self) -> int:
+        return max(self.stop - self.start, 0)
+
+    def __getitem__(self, idx: int) -> tuple[np.ndarray, np.ndarray]:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        i = self.start + idx
+        return self.features[i : i + self.seq_length], self.targets[i + self.seq_length]
+
+
+class MinMaxScaler:
+    """NumPy-only drop-in for sklearn.preprocessing.MinMaxScaler (range 0–1).
+
+    Exposes the same fitted attributes (min_, scale_, data_min_, data_max_,
+    data_range_, n_features_in_) and the fit/transform/inverse_transform
+    API used here, without importing scikit-learn at serving time.
+    """
+
+    def __init__(self, feature_range: tuple[float, float] = (0, 1)):
+        self.feature_range = feature_range
+
+    @staticmethod
+    def _as_float(X) -> np.ndarray:
+        X = np.asarray(X)
+        dtype = X.dtype if X.dtype in (np.float32, np.float64) else np.float64
+        return np.array(X, dtype=dtype, ndmin=2)
+
+    def fit(self, X) -> "MinMaxScaler":
+        X = self._as_float(X)
+        self.data_min_ = np.nanmin(X, axis=0).astype(np.float64)
+        self.data_max_ = np.nanmax(X, axis=0).astype(np.float64)
+        self.data_range_ = self.data_max_ - self.data_min_
+        self._set_scale()
+        self.n_features_in_ = X.shape[1]
+        self.n_samples_seen_ = X.shape[0]
+        return self
+
+    def _set_scale(self):
+        lo, hi = self.feature_range
+        # Constant columns map to `lo`, as in sklearn
+        safe_range = np.where(self.data_range_ == 0.0, 1.0, self.data_range_)
+        self.scale_ = (hi - lo) / safe_range
+        self.min_ = lo - self.data_min_ * self.scale_
+
+    def _check(self, X: np.ndarray, check_features: bool = True):
+        if not hasattr(self, "scale_"):
+            raise ValueError("This MinMaxScaler instance is not fitted yet.")
+        # sklearn validates the feature count on transform only
+        if check_features and X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but MinMaxScaler is expecting "
+                f"{self.n_features_in_} features as input."
+            )
+
+    def transform(self, X) -> np.ndarray:
+        X = self._as_float(X)
+        self._check(X)
+        X *= self.scale_
+        X += self.min_
+        return X
+
+    def fit_transform(self, X) -> np.ndarray:
+        return self.fit(X).transform(X)
+
+    def inverse_transform(self, X) -> np.ndarray:
+        X = self._as_float(X)
+        self._check(X, check_features=False)
+        X -= self.min_
+        X /= self.scale_
+        return X
+
+    @classmethod
+    def from_arrays(cls, min_: np.ndarray, scale: np.ndarray) -> "MinMaxScaler":
+        """Rebuild a fitted scaler from its min_/scale_ arrays."""
+        s = cls()
+        s.min_ = np.array(min_, dtype=np.float64)
+        s.scale_ = np.array(scale, dtype=np.float64)
+        s.data_range_ = 1.0 / s.scale_
+        s.data_min_ = -s.min_ / s.scale_
+        s.data_max_ = s.data_min_ + s.data_range_
+        s.n_features_in_ = len(s.min_)
+        s.n_samples_seen_ = 0
+        return s
+
+    @classmethod
+    def from_fitted(cls, other) -> "MinMaxScaler":
+        """Copy the fitted state of an sklearn MinMaxScaler (or this class)."""
+        s = cls(tuple(getattr(other, "feature_range", (0, 1))))
+        for attr in ("min_", "scale_", "data_min_", "data_max_", "data_range_"):
+            if hasattr(other, attr):
+                setattr(s, attr, np.array(getattr(other, attr), dtype=np.float64))
+        if hasattr(other, "scale_"):
+            s.n_features_in_ = len(s.scale_)
+            s.n_samples_seen_ = getattr(other, "n_samples_seen_", 0)
+        return s
 
 
 class PriceScaler:
@@ -206,6 +359,14 @@ class PriceScaler:
         self.feature_scaler = MinMaxScaler()
         self.target_scaler = MinMaxScaler()
 
+    def __setstate__(self, state: dict):
+        # Pickles from before the NumPy scaler hold sklearn MinMaxScalers;
+        # convert them on load so callers only ever see this module's class.
+        for name in ("feature_scaler", "target_scaler"):
+            if not isinstance(state.get(name), MinMaxScaler):
+                state[name] = MinMaxScaler.from_fitted(state[name])
+        self.__dict__.update(state)
+
     def fit_transform(self, df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
         """Fit scalers and return scaled features + targets.
 
@@ -217,15 +378,7 @@ class PriceScaler:
         scaled_features = self.feature_scaler.fit_transform(features)
 
         # Build multi-horizon targets (future price at 7, 14, 30 days)
-        price = df["price"].values
-        targets = np.full((len(price), 3), np.nan)
-        for i in range(len(price)):
-            if i + 7 < len(price):
-                targets[i, 0] = price[i + 7]
-            if i + 14 < len(price):
-                targets[i, 1] = price[i + 14]
-            if i + 30 < len(price):
-                targets[i, 2] = price[i + 30]
+        targets = build_horizon_targets(df["price"].values)
 
         # Only keep rows where all targets exist
         valid_mask = ~np.isnan(targets).any(axis=1)
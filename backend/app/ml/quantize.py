@@ -0,0 +1,82 @@
+"""Opt-in dynamic int8 quantization with an accuracy guard.
+
+Dynamic quantization stores LSTM/Linear weights as int8 and quantizes
+activations on the fly, which shrinks the model and speeds up CPU
+inference. It can cost accuracy, so training only approves it for a
+model when the validation MAE stays within MODEL_QUANTIZE_MAE_TOLERANCE
+of the float32 model. Approval is recorded in a small JSON marker next to
+the weights; the registry quantizes at load time only if the marker exists.
+"""
+
+import copy
+import logging
+import warnings
+from collections.abc import Callable, Iterable
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from app.ml.model import EggPriceLSTM
+from app.ml.preprocessing import PriceScaler
+
+logger = logging.getLogger(__name__)
+
+QUANTIZED_MODULES = {nn.LSTM, nn.Linear}
+
+
+def quantize_int8(model: EggPriceLSTM) -> EggPriceLSTM:
+    """Return a dynamically int8-quantized CPU copy of `model`."""
+    model = copy.deepcopy(model).cpu().eval()
+    with warnings.catch_warnings():
+        # torch.ao.quantization is deprecated in favour of torchao, which
+        # is not a dependency here; the eager API still works.
+        warnings.simplefilter("ignore")
+        return torch.ao.quantization.quantize_dynamic(model, QUANTIZED_MODULES, dtype=torch.qint8)
+
+
+def _predict(model: nn.Module, batches: Iterable) -> tuple[np.ndarray, np.ndarray]:
+    preds, true = [], []
+    model.eval()
+    with torch.no_grad():
+        for X_batch, y_batch in batches:
+            preds.append(model.point(model(X_batch.cpu())).numpy())
+            true.append(y_batch.cpu().numpy())
+    return np.concatenate(preds), np.concatenate(true)
+
+
+def check_int8_accuracy(
+    state_dict: dict,
+    batches: Callable[[], Iterable],
+    scaler: PriceScaler,
+    compute_metrics: Callable[[np.ndarray, np.ndarray, PriceScaler], dict],
+    tolerance: float,
+    quantiles: tuple[float, ...] | None = None,
+    architecture: dict | None = None,
+) -> dict:
+    """Compare float32 vs int8 metrics on the validation window.
+
+    Args:
+        batches: callable yielding (X, y) validation batches (scaled)
+        tolerance: maximum allowed relative MAE increase, e.g. 0.02 = 2%
+        quantiles: quantile head of the model (MAE is taken on the median)
+        architecture: EggPriceLSTM sizes/dropout of a tuned model
+
+    Returns:
+        dict with "accepted", "tolerance", "fp32" and "int8" metrics
+    """
+    model = EggPriceLSTM(quantiles=quantiles, **(architecture or {}))
+    model.load_state_dict(state_dict)
+
+    preds, true = _predict(model, batches())
+    fp32 = compute_metrics(true, preds, scaler)
+    preds, true = _predict(quantize_int8(model), batches())
+    int8 = compute_metrics(true, preds, scaler)
+
+    accepted = int8["mae"] <= fp32["mae"] * (1 + tolerance)
+    if not accepted:
+        logger.warning(
+            f"int8 model rejected: MAE {int8['mae']} vs {fp32['mae']} "
+            f"(tolerance {tolerance:.1%})"
+        )
+    return {"accepted": bool(accepted), "tolerance": tolerance, "fp32": fp32, "int8": int8}
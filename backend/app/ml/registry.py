@@ -0,0 +1,234 @@
+"""In-process registry of loaded models and scalers.
+
+Keeps warm (model, PriceScaler) pairs keyed by (grade, version) so
+repeated predictions and evaluations don't rebuild the model, re-run
+torch.load and unpickle the scaler on every call.
+
+Weights and scaler come from the pickle-free .safetensors bundle when one
+exists, falling back to the legacy .pt state dict + pickled scaler.
+
+The model is an eager EggPriceLSTM or, with INFERENCE_RUNTIME="onnx", an
+OnnxLSTM session. torch is only imported when an eager model is loaded,
+including when a version has no .onnx graph and torch is installed.
+"""
+
+import importlib.util
+import logging
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from app.core.config import settings
+from app.ml.preprocessing import PriceScaler
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = Path(__file__).resolve().parent.parent.parent / "trained_models"
+
+
+def model_paths(
+    grade: str,
+    model_version: str,
+    models_dir: Path = MODELS_DIR,
+    runtime: str = "torch",
+) -> tuple[Path, Path]:
+    """Return (model_path, scaler_path) for a grade/version and runtime."""
+    suffix = "onnx" if runtime == "onnx" else "pt"
+    return (
+        models_dir / f"egg_price_lstm_{grade}_{model_version}.{suffix}",
+        models_dir / f"scaler_{grade}_{model_version}.pkl",
+    )
+
+
+def bundle_path(grade: str, model_version: str, models_dir: Path = MODELS_DIR) -> Path:
+    """Pickle-free bundle holding weights, scaler arrays and manifest."""
+    return models_dir / f"egg_price_lstm_{grade}_{model_version}.safetensors"
+
+
+def int8_marker_path(grade: str, model_version: str, models_dir: Path = MODELS_DIR) -> Path:
+    """JSON marker written by training when int8 quantization passed its accuracy guard."""
+    return models_dir / f"egg_price_lstm_{grade}_{model_version}.int8.json"
+
+
+def _torch_available() -> bool:
+    return importlib.util.find_spec("torch") is not None
+
+
+def _file_signature(path: Path) -> tuple[int, int]:
+    """(mtime_ns, size) — changes whenever the file is rewritten."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def load_from_disk(
+    model_path: Path,
+    scaler_path: Path,
+    quantize: bool = False,
+) -> tuple[Any, PriceScaler]:
+    """Load a model and its scaler.
+
+    The model is a bundle, legacy state dict or ONNX graph; the scaler is
+    read from a bundle or unpickled. With `quantize`, a torch model is
+    dynamically quantized to int8 (CPU).
+    """
+    bundle = None
+    if ".safetensors" in (model_path.suffix, scaler_path.suffix):
+        from app.ml.bundle import ModelBundle
+        bundle = ModelBundle(model_path if model_path.suffix == ".safetensors" else scaler_path)
+        bundle.check_compatible()
+
+    quantiles = bundle.quantiles if bundle is not None else None
+    architecture = bundle.architecture if bundle is not None else {}
+
+    if model_path.suffix == ".onnx":
+        from app.ml.onnx_runtime import DROPOUT_P, OnnxLSTM
+        model = OnnxLSTM(model_path, architecture.get("dropout", DROPOUT_P), quantiles)
+    else:
+        import torch
+
+        from app.ml.model import EggPriceLSTM
+
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        model = EggPriceLSTM(quantiles=quantiles, **architecture)
+        if model_path.suffix == ".safetensors":
+            # Parameters alias the mapped file pages instead of copies
+            model.load_state_dict(bundle.state_dict(), assign=True)
+        else:
+            model.load_state_dict(torch.load(model_path, map_location=device, weights_only=True))
+        model.to(device).eval()
+        if quantize:
+            from app.ml.quantize import quantize_int8
+            model = quantize_int8(model)
+
+    if scaler_path.suffix == ".safetensors":
+        scaler = bundle.scaler()
+    else:
+        with open(scaler_path, "rb") as f:
+            scaler = pickle.load(f)
+
+    return model, scaler
+
+
+class ModelRegistry:
+    """Thread-safe LRU cache of loaded models, invalidated on file change."""
+
+    def __init__(self, models_dir: Path = MODELS_DIR, max_size: int | None = None):
+        self.models_dir = models_dir
+        self._max_size = max_size if max_size is not None else settings.MODEL_REGISTRY_MAX_SIZE
+        # (grade, version, runtime, quantize) → (file signatures, model, scaler).
+        # Runtime is part of the key so torch evaluation and ONNX serving of
+        # the same version don't evict each other.
+        self._entries: OrderedDict[tuple[str, str, str, bool], tuple[tuple, Any, PriceScaler]] = OrderedDict()
+        self._lock = Lock()
+        # One lock per key being loaded: concurrent misses on the same model
+        # load it once, while other keys stay servable during the load.
+        self._load_locks: dict[tuple[str, str, str, bool], Lock] = {}
+        self._onnx_fallbacks: set[tuple[str, str]] = set()
+
+    def get(
+        self,
+        grade: str,
+        model_version: str,
+        runtime: str | None = None,
+    ) -> tuple[Any, PriceScaler]:
+        """Return a warm (model, scaler), loading from disk on miss or change.
+
+        `runtime` ("torch" or "onnx") defaults to settings.INFERENCE_RUNTIME.
+        With settings.MODEL_QUANTIZE_INT8, torch models whose int8 marker
+        exists are served quantized; others fall back to float32. A version
+        without an ONNX graph is served with torch when torch is installed.
+        """
+        if runtime is None:
+            runtime = settings.INFERENCE_RUNTIME
+        model_path, scaler_path = self.artifact_paths(grade, model_version, runtime)
+        if runtime == "onnx" and not model_path.exists() and _torch_available():
+            # No graph (legacy conversion, or export failed at training time)
+            torch_path, torch_scaler = self.artifact_paths(grade, model_version, "torch")
+            if torch_path.exists():
+                if (grade, model_version) not in self._onnx_fallbacks:
+                    self._onnx_fallbacks.add((grade, model_version))
+                    logger.warning(f"No ONNX graph for {grade}/{model_version}, serving it with torch")
+                runtime, model_path, scaler_path = "torch", torch_path, torch_scaler
+
+        if not model_path.exists():
+            self.invalidate(grade, model_version)
+            raise FileNotFoundError(f"Model file not found: {model_path}")
+        if not scaler_path.exists():
+            self.invalidate(grade, model_version)
+            raise FileNotFoundError(f"Scaler file not found: {scaler_path}")
+
+        quantize = False
+        if runtime == "torch" and settings.MODEL_QUANTIZE_INT8:
+            quantize = int8_marker_path(grade, model_version, self.models_dir).exists()
+        key = (grade, model_version, runtime, quantize)
+        signature = (_file_signature(model_path), _file_signature(scaler_path))
+
+        with self._lock:
+            hit = self._lookup(key, signature)
+            if hit is not None:
+                return hit
+            load_lock = self._load_locks.setdefault(key, Lock())
+
+        with load_lock:
+            with self._lock:
+                # Another thread may have loaded it while we waited
+                hit = self._lookup(key, signature)
+                if hit is not None:
+                    return hit
+                if key in self._entries:
+                    logger.info(f"Model files changed for {key}, reloading")
+            try:
+                model, scaler = load_from_disk(model_path, scaler_path, quantize)
+                with self._lock:
+                    self._entries[key] = (signature, model, scaler)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self._max_size:
+                        self._entries.popitem(last=False)
+            finally:
+                with self._lock:
+                    if self._load_locks.get(key) is load_lock:
+                        del self._load_locks[key]
+            return model, scaler
+
+    def _lookup(self, key: tuple, signature: tuple) -> tuple[Any, PriceScaler] | None:
+        """Cached (model, scaler) if still current; caller holds self._lock."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != signature:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1], entry[2]
+
+    def artifact_paths(self, grade: str, model_version: str, runtime: str = "torch") -> tuple[Path, Path]:
+        """(model_path, scaler_path) that get() would load; both may be the bundle."""
+        model_path, scaler_path = model_paths(grade, model_version, self.models_dir, runtime)
+        bundle = bundle_path(grade, model_version, self.models_dir)
+        if bundle.exists():
+            scaler_path = bundle
+            if runtime == "torch":
+                model_path = bundle
+        return model_path, scaler_path
+
+    def invalidate(self, grade: str | None = None, model_version: str | None = None):
+        """Drop cached entries. No arguments clears everything."""
+        with self._lock:
+            for key in list(self._entries):
+                if grade is not None and key[0] != grade:
+                    continue
+                if model_version is not None and key[1] != model_version:
+                    continue
+                del self._entries[key]
+
+    def __contains__(self, key: tuple) -> bool:
+        """True if any entry matches `key`, a prefix such as (grade, version)."""
+        with self._lock:
+            return any(entry[: len(key)] == tuple(key) for entry in self._entries)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+model_registry = ModelRegistry()
@@ -3,6 +3,8 @@
 Usage:
     python -m app.ml.train
     python -m app.ml.train --grade 대란 --version v2.0
+    python -m app.ml.train --all --workers 4
+    python -m app.ml.train --grade 대란 --head quantile
 
 Performance targets:
     MAE ≤ 100원, RMSE ≤ 150원, MAPE ≤ 5%, Directional Accuracy ≥ 70%
@@ -11,25 +13,34 @@ Performance targets:
 import argparse
 import json
 import logging
-import pickle
+import multiprocessing as mp
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
+from functools import partial
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data import DataLoader
 
 from app.core.config import settings
 from app.core.database import SessionLocal
-from app.ml.model import EggPriceLSTM
+from app.ml.bundle import write_bundle
+from app.ml.export import export_onnx
+from app.ml.model import QUANTILES, EggPriceLSTM, pinball_loss
 from app.ml.preprocessing import (
     SEQUENCE_LENGTH,
     PriceScaler,
+    SequenceDataset,
     build_features_from_db,
     create_sequences,
 )
+from app.ml.quantize import check_int8_accuracy
+from app.ml.registry import bundle_path, int8_marker_path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -39,9 +50,13 @@ BATCH_SIZE = 32
 EPOCHS = 100
 LEARNING_RATE = 0.001
 EARLY_STOPPING_PATIENCE = 10
+CHECKPOINT_EVERY = 0  # epochs between crash-safety checkpoints (0 = end only)
 
 ALL_GRADES = ["왕란", "특란", "대란", "중란", "소란"]
 
+# EggPriceLSTM keyword arguments a hyperparameter config may override
+ARCHITECTURE_KEYS = ("hidden_size_1", "hidden_size_2", "dense_size_1", "dense_size_2", "dropout")
+
 
 def compute_metrics(
     y_true: np.ndarray,
@@ -91,14 +106,144 @@ def compute_metrics(
     }
 
 
-def train_model(grade: str = "특란", model_version: str | None = None) -> dict:
+def _atomic_write(path: Path, write):
+    """Write via a temp file in the same directory, then rename over `path`.
+
+    Readers such as load_model never observe a half-written file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _save_artifacts(
+    grade: str,
+    model_version: str,
+    state_dict: dict,
+    scaler: PriceScaler,
+    quantiles: tuple[float, ...] | None = None,
+    architecture: dict | None = None,
+):
+    """Atomically persist the model bundle (weights + scaler + manifest).
+
+    An ONNX graph for torch-free serving is written alongside; export
+    failures are logged and don't fail training. Any int8 approval marker
+    is removed first: it vetted the previous weights, and only
+    _approve_int8 may re-issue it for these.
+    """
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    int8_marker_path(grade, model_version, MODELS_DIR).unlink(missing_ok=True)
+    path = bundle_path(grade, model_version, MODELS_DIR)
+    onnx_path = MODELS_DIR / f"egg_price_lstm_{grade}_{model_version}.onnx"
+    _atomic_write(
+        path, lambda f: write_bundle(f, state_dict, scaler, grade, model_version, quantiles, architecture)
+    )
+    try:
+        onnx_bytes = export_onnx(state_dict, quantiles, architecture)
+        _atomic_write(onnx_path, lambda f: f.write(onnx_bytes))
+    except Exception as e:
+        logger.warning(f"ONNX export failed for {grade}/{model_version}: {e}")
+
+
+def _approve_int8(
+    grade: str,
+    model_version: str,
+    state_dict: dict,
+    val_batches,
+    scaler: PriceScaler,
+    quantiles: tuple[float, ...] | None = None,
+    architecture: dict | None = None,
+) -> dict:
+    """Run the int8 accuracy guard and write or clear the approval marker."""
+    result = check_int8_accuracy(
+        state_dict, val_batches, scaler, compute_metrics,
+        settings.MODEL_QUANTIZE_MAE_TOLERANCE, quantiles, architecture,
+    )
+    marker = int8_marker_path(grade, model_version, MODELS_DIR)
+    if result["accepted"]:
+        payload = json.dumps(result, ensure_ascii=False, indent=2).encode("utf-8")
+        _atomic_write(marker, lambda f: f.write(payload))
+        logger.info(f"  → int8 model approved (MAE {result['int8']['mae']} vs {result['fp32']['mae']})")
+    else:
+        marker.unlink(missing_ok=True)
+    return result
+
+
+def iterate_batches(
+    X: torch.Tensor,
+    y: torch.Tensor,
+    batch_size: int,
+    shuffle: bool = False,
+):
+    """Yield (X_batch, y_batch) slices of in-memory tensors.
+
+    Shuffling draws one index permutation per call (i.e. per epoch); there
+    is no per-sample indexing or collation as with DataLoader.
+    """
+    n = len(X)
+    if shuffle:
+        perm = torch.randperm(n, device=X.device)
+        for start in range(0, n, batch_size):
+            idx = perm[start : start + batch_size]
+            yield X[idx], y[idx]
+    else:
+        for start in range(0, n, batch_size):
+            yield X[start : start + batch_size], y[start : start + batch_size]
+
+
+def train_model(
+    grade: str = "특란",
+    model_version: str | None = None,
+    batch_size: int | None = None,
+    lazy: bool = False,
+    checkpoint_every: int | None = None,
+    head: str | None = None,
+    hyperparams: dict | None = None,
+    holdout_days: int = 0,
+) -> dict:
     """Train the LSTM model for a specific egg grade.
 
+    Args:
+        batch_size: defaults to BATCH_SIZE; the learning rate is scaled
+            linearly with batch_size / BATCH_SIZE
+        lazy: slice windows on demand through a DataLoader instead of
+            materialising them as tensors (lower memory, slower epochs)
+        checkpoint_every: also persist the best weights every N epochs
+            (defaults to CHECKPOINT_EVERY; 0 = only once at the end)
+        head: "point" (MSE loss, MC Dropout intervals at serving time) or
+            "quantile" (5th/50th/95th percentiles, pinball loss); defaults
+            to settings.MODEL_HEAD and is recorded in the bundle manifest
+        hyperparams: a config from app.ml.tune — EggPriceLSTM sizes and
+            dropout plus batch_size, learning_rate and patience, overriding
+            the module defaults (the learning rate is then used as given)
+        holdout_days: leave out the latest N days of data, so a backtest
+            can score the model on origins it never saw (see data_end)
+
     Returns:
         dict with training results including final metrics
     """
     if model_version is None:
         model_version = settings.MODEL_VERSION
+    hyperparams = hyperparams or {}
+    architecture = {k: hyperparams[k] for k in ARCHITECTURE_KEYS if k in hyperparams}
+    if batch_size is None:
+        batch_size = hyperparams.get("batch_size", BATCH_SIZE)
+    learning_rate = hyperparams.get("learning_rate", LEARNING_RATE * batch_size / BATCH_SIZE)
+    patience = hyperparams.get("patience", EARLY_STOPPING_PATIENCE)
+    if checkpoint_every is None:
+        checkpoint_every = CHECKPOINT_EVERY
+    if head is None:
+        head = settings.MODEL_HEAD
+    if head not in ("point", "quantile"):
+        raise ValueError(f"Unknown model head '{head}'")
+    quantiles = QUANTILES if head == "quantile" else None
 
     logger.info(f"Training model {model_version} for grade={grade}")
 
@@ -108,6 +253,9 @@ def train_model(grade: str = "특란", model_version: str | None = None) -> dict
     finally:
         db.close()
 
+    if holdout_days:
+        df = df[df["date"] <= df["date"].iloc[-1] - pd.Timedelta(days=holdout_days)]
+
     logger.info(f"Loaded {len(df)} records with 15 features")
 
     if len(df) < SEQUENCE_LENGTH + 30:
@@ -118,25 +266,40 @@ def train_model(grade: str = "특란", model_version: str | None = None) -> dict
     scaler = PriceScaler()
     features, targets = scaler.fit_transform(df)
 
-    X, y = create_sequences(features, targets, SEQUENCE_LENGTH)
-    logger.info(f"Created {len(X)} training sequences")
-
-    # Train/validation split (80/20, time-ordered)
-    split = int(len(X) * 0.8)
-    X_train, X_val = X[:split], X[split:]
-    y_train, y_val = y[:split], y[split:]
-
-    train_dataset = TensorDataset(torch.FloatTensor(X_train), torch.FloatTensor(y_train))
-    val_dataset = TensorDataset(torch.FloatTensor(X_val), torch.FloatTensor(y_val))
-    train_loader = DataLoader(train_dataset, batch_size=BATCH_SIZE, shuffle=True)
-    val_loader = DataLoader(val_dataset, batch_size=BATCH_SIZE)
+    num_sequences = max(len(features) - SEQUENCE_LENGTH, 0)
+    logger.info(f"Created {num_sequences} training sequences")
 
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model = EggPriceLSTM().to(device)
-    criterion = nn.MSELoss()
-    optimizer = torch.optim.Adam(model.parameters(), lr=LEARNING_RATE)
+
+    # Train/validation split (80/20, time-ordered)
+    split = int(num_sequences * 0.8)
+    n_train, n_val = split, num_sequences - split
+
+    if lazy:
+        # Windows are sliced on demand from the (N, 15) feature array — the
+        # full (num_sequences, 30, 15) array is never materialised.
+        train_dataset = SequenceDataset(features, targets, SEQUENCE_LENGTH, stop=split)
+        val_dataset = SequenceDataset(features, targets, SEQUENCE_LENGTH, start=split)
+        train_batches = partial(DataLoader, train_dataset, batch_size=batch_size, shuffle=True)
+        val_batches = partial(DataLoader, val_dataset, batch_size=batch_size)
+    else:
+        # Fast path: contiguous in-memory tensors, sliced directly per batch
+        X, y = create_sequences(features, targets, SEQUENCE_LENGTH)
+        X = torch.from_numpy(np.ascontiguousarray(X)).to(device)
+        y = torch.from_numpy(np.ascontiguousarray(y)).to(device)
+        train_batches = partial(iterate_batches, X[:split], y[:split], batch_size, shuffle=True)
+        val_batches = partial(iterate_batches, X[split:], y[split:], batch_size)
+
+    model = EggPriceLSTM(quantiles=quantiles, **architecture).to(device)
+    if quantiles:
+        criterion = partial(pinball_loss, quantiles=quantiles)
+    else:
+        criterion = nn.MSELoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
 
     best_val_loss = float("inf")
+    best_state = None
+    best_dirty = False
     patience_counter = 0
     training_history = []
 
@@ -144,7 +307,7 @@ def train_model(grade: str = "특란", model_version: str | None = None) -> dict
         # Training
         model.train()
         train_loss = 0.0
-        for X_batch, y_batch in train_loader:
+        for X_batch, y_batch in train_batches():
             X_batch, y_batch = X_batch.to(device), y_batch.to(device)
             optimizer.zero_grad()
             preds = model(X_batch)
@@ -152,7 +315,7 @@ def train_model(grade: str = "특란", model_version: str | None = None) -> dict
             loss.backward()
             optimizer.step()
             train_loss += loss.item() * len(X_batch)
-        train_loss /= len(train_dataset)
+        train_loss /= n_train
 
         # Validation
         model.eval()
@@ -160,14 +323,14 @@ def train_model(grade: str = "특란", model_version: str | None = None) -> dict
         all_val_preds = []
         all_val_true = []
         with torch.no_grad():
-            for X_batch, y_batch in val_loader:
+            for X_batch, y_batch in val_batches():
                 X_batch, y_batch = X_batch.to(device), y_batch.to(device)
                 preds = model(X_batch)
                 loss = criterion(preds, y_batch)
                 val_loss += loss.item() * len(X_batch)
-                all_val_preds.append(preds.cpu().numpy())
+                all_val_preds.append(model.point(preds).cpu().numpy())
                 all_val_true.append(y_batch.cpu().numpy())
-        val_loss /= len(val_dataset)
+        val_loss /= n_val
 
         training_history.append({"epoch": epoch + 1, "train_loss": train_loss, "val_loss": val_loss})
 
@@ -175,25 +338,34 @@ def train_model(grade: str = "특란", model_version: str | None = None) -> dict
             f"Epoch {epoch+1}/{EPOCHS} — train_loss: {train_loss:.6f}, val_loss: {val_loss:.6f}"
         )
 
-        # Early stopping
+        # Early stopping — best weights are kept in memory, not written per epoch
         if val_loss < best_val_loss:
             best_val_loss = val_loss
             patience_counter = 0
-
-            # Save best model
-            MODELS_DIR.mkdir(parents=True, exist_ok=True)
-            model_path = MODELS_DIR / f"egg_price_lstm_{grade}_{model_version}.pt"
-            torch.save(model.state_dict(), model_path)
-            scaler_path = MODELS_DIR / f"scaler_{grade}_{model_version}.pkl"
-            with open(scaler_path, "wb") as f:
-                pickle.dump(scaler, f)
-            logger.info(f"  → Saved best model (val_loss={val_loss:.6f})")
+            best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+            best_dirty = True
         else:
             patience_counter += 1
-            if patience_counter >= EARLY_STOPPING_PATIENCE:
+            if patience_counter >= patience:
                 logger.info(f"Early stopping at epoch {epoch+1}")
                 break
 
+        # Optional periodic checkpoint for crash safety
+        if checkpoint_every and best_dirty and (epoch + 1) % checkpoint_every == 0:
+            _save_artifacts(grade, model_version, best_state, scaler, quantiles, architecture)
+            best_dirty = False
+            logger.info(f"  → Checkpointed best model (val_loss={best_val_loss:.6f})")
+
+    if best_dirty:
+        _save_artifacts(grade, model_version, best_state, scaler, quantiles, architecture)
+        logger.info(f"  → Saved best model (val_loss={best_val_loss:.6f})")
+
+    quantization = None
+    if settings.MODEL_QUANTIZE_INT8:
+        quantization = _approve_int8(
+            grade, model_version, best_state, val_batches, scaler, quantiles, architecture
+        )
+
     # Compute final metrics on validation set
     val_preds = np.concatenate(all_val_preds)
     val_true = np.concatenate(all_val_true)
@@ -204,12 +376,20 @@ def train_model(grade: str = "특란", model_version: str | None = None) -> dict
         "grade": grade,
         "model_version": model_version,
         "train_date": date.today().isoformat(),
-        "total_samples": len(X),
-        "train_samples": len(X_train),
-        "val_samples": len(X_val),
+        # Last day of data the model saw; later backtest origins are out-of-sample
+        "data_end": df["date"].iloc[-1].date().isoformat(),
+        "total_samples": num_sequences,
+        "train_samples": n_train,
+        "val_samples": n_val,
+        "batch_size": batch_size,
+        "learning_rate": learning_rate,
+        "head": head,
+        "quantiles": list(quantiles) if quantiles else None,
+        "architecture": model.architecture,
         "best_val_loss": float(best_val_loss),
         "epochs_trained": len(training_history),
         "metrics": metrics,
+        "quantization": quantization,
         "targets": {
             "mae": "≤ 100",
             "rmse": "≤ 150",
@@ -238,13 +418,60 @@ def train_model(grade: str = "특란", model_version: str | None = None) -> dict
     return report
 
 
-def train_all_grades(model_version: str | None = None) -> list[dict]:
-    """Train models for all egg grades."""
+def _init_training_worker(num_threads: int):
+    """Pool initializer: cap intra-op threads so workers don't oversubscribe."""
+    torch.set_num_threads(num_threads)
+
+
+def train_all_grades(
+    model_version: str | None = None,
+    workers: int | None = None,
+    batch_size: int | None = None,
+    head: str | None = None,
+) -> list[dict]:
+    """Train models for all egg grades.
+
+    With `workers > 1` grades are trained concurrently in a process pool,
+    each worker limited to cpu_count // workers torch threads. Reports are
+    returned in ALL_GRADES order either way.
+    """
+    if workers is None:
+        workers = settings.TRAINING_WORKERS
+    workers = max(1, min(workers, len(ALL_GRADES)))
+
+    if workers > 1 and mp.current_process().daemon:
+        # e.g. a Celery prefork child — daemonic processes can't spawn a pool
+        logger.warning("Running inside a daemon process, training grades sequentially")
+        workers = 1
+
+    if workers == 1:
+        reports = []
+        for grade in ALL_GRADES:
+            try:
+                report = train_model(grade, model_version, batch_size, head=head)
+                reports.append(report)
+            except ValueError as e:
+                logger.warning(f"Skipping grade {grade}: {e}")
+        return reports
+
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    logger.info(f"Training {len(ALL_GRADES)} grades on {workers} workers × {num_threads} threads")
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_training_worker,
+        initargs=(num_threads,),
+    ) as pool:
+        futures = {
+            grade: pool.submit(train_model, grade, model_version, batch_size, head=head)
+            for grade in ALL_GRADES
+        }
+
     reports = []
-    for grade in ALL_GRADES:
+    for grade, future in futures.items():
         try:
-            report = train_model(grade, model_version)
-            reports.append(report)
+            reports.append(future.result())
         except ValueError as e:
             logger.warning(f"Skipping grade {grade}: {e}")
     return reports
@@ -255,9 +482,19 @@ if __name__ == "__main__":
     parser.add_argument("--grade", default="특란", help="Egg grade to train")
     parser.add_argument("--version", default=None, help="Model version string")
     parser.add_argument("--all", action="store_true", help="Train all grades")
+    parser.add_argument("--batch-size", type=int, default=None, help="Training batch size (LR scales linearly)")
+    parser.add_argument("--lazy", action="store_true", help="Slice windows on demand (lower memory)")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Parallel training processes for --all (default: TRAINING_WORKERS)",
+    )
+    parser.add_argument(
+        "--head", choices=["point", "quantile"], default=None,
+        help="Output head (default: MODEL_HEAD)",
+    )
     args = parser.parse_args()
 
     if args.all:
-        train_all_grades(args.version)
+        train_all_grades(args.version, args.workers, args.batch_size, args.head)
     else:
-        train_model(args.grade, args.version)
+        train_model(args.grade, args.version, args.batch_size, args.lazy, head=args.head)
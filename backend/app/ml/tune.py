@@ -0,0 +1,326 @@
+"""Parallel hyperparameter search for EggPriceLSTM.
+
+Usage:
+    python -m app.ml.tune --grade 대란 --trials 20 --workers 4
+    python -m app.ml.tune --grade 대란 --head quantile --search-only
+
+Trials sample layer sizes, dropout, batch size, learning rate and early
+stopping patience from SEARCH_SPACE (trial 0 is always the current
+defaults) and run concurrently on a spawn process pool.
+
+The grade's feature sequences are built once, saved as .npy files and
+memory-mapped by every trial, so workers share the page cache instead of
+each rebuilding and holding its own copy. Trials publish their running-best
+validation loss after each epoch; a trial whose best loss is worse than the
+median of its peers at the same epoch is pruned (see should_prune).
+
+The winning config is written to hyperparameters_{grade}_{version}.json
+next to the training report, and the final model is trained with it.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import statistics
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch import nn
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.ml import train
+from app.ml.model import QUANTILES, EggPriceLSTM, pinball_loss
+from app.ml.preprocessing import (
+    SEQUENCE_LENGTH,
+    PriceScaler,
+    build_features_from_db,
+    create_sequences,
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SPACE = {
+    "hidden_size_1": [32, 64, 128],
+    "hidden_size_2": [16, 32, 64],
+    "dense_size_1": [16, 32, 64],
+    "dense_size_2": [8, 16, 32],
+    "dropout": [0.1, 0.2, 0.3],
+    "batch_size": [16, 32, 64],
+    "learning_rate": [3e-4, 1e-3, 3e-3],
+    "patience": [5, 10, 15],
+}
+DEFAULT_TRIALS = 20
+PRUNE_WARMUP_EPOCHS = 5  # never prune before this many epochs
+PRUNE_MIN_PEERS = 3  # peers needed at an epoch before the median is trusted
+
+
+def default_config() -> dict:
+    """The hand-picked configuration train_model uses without tuning."""
+    return {
+        "hidden_size_1": 64,
+        "hidden_size_2": 32,
+        "dense_size_1": 32,
+        "dense_size_2": 16,
+        "dropout": 0.2,
+        "batch_size": train.BATCH_SIZE,
+        "learning_rate": train.LEARNING_RATE,
+        "patience": train.EARLY_STOPPING_PATIENCE,
+    }
+
+
+def sample_configs(n_trials: int, seed: int = 0) -> list[dict]:
+    """Random search: the default config followed by distinct random draws."""
+    rng = np.random.default_rng(seed)
+    configs = [default_config()]
+    seen = {tuple(configs[0].values())}
+    space_size = int(np.prod([len(v) for v in SEARCH_SPACE.values()]))
+    while len(configs) < min(n_trials, space_size):
+        config = {k: values[rng.integers(len(values))] for k, values in SEARCH_SPACE.items()}
+        config = {k: v.item() if isinstance(v, np.generic) else v for k, v in config.items()}
+        if tuple(config.values()) not in seen:
+            seen.add(tuple(config.values()))
+            configs.append(config)
+    return configs
+
+
+def should_prune(curves, trial_id: int, epoch: int) -> bool:
+    """Median rule over running-best validation losses.
+
+    `curves` maps trial id → (running-best losses per epoch, finished). A
+    peer counts at `epoch` if it got that far; a finished peer that stopped
+    earlier contributes its final best loss.
+    """
+    if epoch + 1 < PRUNE_WARMUP_EPOCHS:
+        return False
+    own, _ = curves[trial_id]
+    peers = [
+        losses[min(epoch, len(losses) - 1)]
+        for tid, (losses, finished) in curves.items()
+        if tid != trial_id and losses and (len(losses) > epoch or finished)
+    ]
+    if len(peers) < PRUNE_MIN_PEERS:
+        return False
+    return own[epoch] > statistics.median(peers)
+
+
+def prepare_search_data(grade: str, data_dir: Path) -> int:
+    """Build the grade's scaled sequences once and save them for mmap.
+
+    Writes X.npy (num_sequences, 30, 15) and y.npy (num_sequences, 3) using
+    the same scaling and 80/20 time-ordered split as train_model. Returns
+    the number of training sequences (the split index).
+    """
+    db = SessionLocal()
+    try:
+        df = build_features_from_db(db, grade)
+    finally:
+        db.close()
+
+    if len(df) < SEQUENCE_LENGTH + 30:
+        raise ValueError(
+            f"Not enough data. Need at least {SEQUENCE_LENGTH + 30} rows, got {len(df)}"
+        )
+
+    features, targets = PriceScaler().fit_transform(df)
+    X, y = create_sequences(features, targets, SEQUENCE_LENGTH)
+    np.save(data_dir / "X.npy", np.ascontiguousarray(X, dtype=np.float32))
+    np.save(data_dir / "y.npy", np.ascontiguousarray(y, dtype=np.float32))
+    return int(len(X) * 0.8)
+
+
+def run_trial(
+    trial_id: int,
+    config: dict,
+    data_dir: str,
+    split: int,
+    curves,
+    head: str = "point",
+    epochs: int | None = None,
+) -> dict:
+    """Train one configuration on the shared sequences; returns its outcome."""
+    if epochs is None:
+        epochs = train.EPOCHS
+    quantiles = QUANTILES if head == "quantile" else None
+
+    # Copy-on-write maps: every trial reads the same pages, nobody copies them
+    X = torch.from_numpy(np.load(Path(data_dir) / "X.npy", mmap_mode="c"))
+    y = torch.from_numpy(np.load(Path(data_dir) / "y.npy", mmap_mode="c"))
+    train_batches = partial(train.iterate_batches, X[:split], y[:split], config["batch_size"], shuffle=True)
+    val_batches = partial(train.iterate_batches, X[split:], y[split:], config["batch_size"])
+    n_val = len(X) - split
+
+    model = EggPriceLSTM(quantiles=quantiles, **{k: config[k] for k in train.ARCHITECTURE_KEYS})
+    criterion = partial(pinball_loss, quantiles=quantiles) if quantiles else nn.MSELoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=config["learning_rate"])
+
+    best_val_loss = float("inf")
+    running_best = []
+    patience_counter = 0
+    pruned = False
+
+    for epoch in range(epochs):
+        model.train()
+        for X_batch, y_batch in train_batches():
+            optimizer.zero_grad()
+            loss = criterion(model(X_batch), y_batch)
+            loss.backward()
+            optimizer.step()
+
+        model.eval()
+        val_loss = 0.0
+        with torch.no_grad():
+            for X_batch, y_batch in val_batches():
+                val_loss += criterion(model(X_batch), y_batch).item() * len(X_batch)
+        val_loss /= n_val
+
+        if val_loss < best_val_loss:
+            best_val_loss = val_loss
+            patience_counter = 0
+        else:
+            patience_counter += 1
+
+        running_best.append(best_val_loss)
+        curves[trial_id] = (running_best, False)  # reassign: proxies don't see in-place edits
+
+        if should_prune(curves, trial_id, epoch):
+            pruned = True
+            logger.info(f"Trial {trial_id} pruned at epoch {epoch + 1} (best {best_val_loss:.6f})")
+            break
+        if patience_counter >= config["patience"]:
+            break
+
+    curves[trial_id] = (running_best, True)
+    return {
+        "trial": trial_id,
+        "config": config,
+        "best_val_loss": float(best_val_loss),
+        "epochs_trained": len(running_best),
+        "pruned": pruned,
+    }
+
+
+def search(
+    grade: str,
+    n_trials: int = DEFAULT_TRIALS,
+    workers: int | None = None,
+    head: str | None = None,
+    seed: int = 0,
+    epochs: int | None = None,
+) -> dict:
+    """Run the search for one grade; returns every trial and the best one.
+
+    With `workers > 1` trials run on a spawn process pool (cpu_count //
+    workers torch threads each) and share pruning curves through a
+    multiprocessing Manager. `epochs` caps each trial (default: train.EPOCHS).
+    """
+    if workers is None:
+        workers = settings.TRAINING_WORKERS
+    if head is None:
+        head = settings.MODEL_HEAD
+    if head not in ("point", "quantile"):
+        raise ValueError(f"Unknown model head '{head}'")
+    if epochs is None:
+        epochs = train.EPOCHS
+    configs = sample_configs(n_trials, seed)
+    workers = max(1, min(workers, len(configs)))
+
+    if workers > 1 and mp.current_process().daemon:
+        logger.warning("Running inside a daemon process, running trials sequentially")
+        workers = 1
+
+    with tempfile.TemporaryDirectory(prefix="eggprice-tune-") as data_dir:
+        split = prepare_search_data(grade, Path(data_dir))
+        logger.info(f"Searching {len(configs)} configs for {grade} on {workers} workers")
+
+        if workers == 1:
+            curves = {}
+            trials = [
+                run_trial(i, config, data_dir, split, curves, head, epochs)
+                for i, config in enumerate(configs)
+            ]
+        else:
+            num_threads = max(1, (os.cpu_count() or 1) // workers)
+            ctx = mp.get_context("spawn")
+            with ctx.Manager() as manager:
+                curves = manager.dict()
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=ctx,
+                    initializer=train._init_training_worker,
+                    initargs=(num_threads,),
+                ) as pool:
+                    futures = [
+                        pool.submit(run_trial, i, config, data_dir, split, curves, head, epochs)
+                        for i, config in enumerate(configs)
+                    ]
+                trials = [future.result() for future in futures]
+
+    completed = [t for t in trials if not t["pruned"]] or trials
+    best = min(completed, key=lambda t: t["best_val_loss"])
+    logger.info(
+        f"Best config for {grade}: trial {best['trial']} "
+        f"(val_loss={best['best_val_loss']:.6f}, {sum(t['pruned'] for t in trials)} pruned)"
+    )
+    return {"grade": grade, "head": head, "trials": trials, "best": best}
+
+
+def tune_and_train(
+    grade: str,
+    model_version: str | None = None,
+    n_trials: int = DEFAULT_TRIALS,
+    workers: int | None = None,
+    head: str | None = None,
+    train_final: bool = True,
+    epochs: int | None = None,
+) -> dict:
+    """Search, write the winning config next to the report, then train with it.
+
+    Returns the search result, plus the final training report under
+    "report" when `train_final` is set.
+    """
+    if model_version is None:
+        model_version = settings.MODEL_VERSION
+    result = search(grade, n_trials, workers, head, epochs=epochs)
+
+    train.MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    path = train.MODELS_DIR / f"hyperparameters_{grade}_{model_version}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"model_version": model_version, **result}, f, ensure_ascii=False, indent=2)
+    logger.info(f"Winning config saved to {path}")
+
+    if train_final:
+        result["report"] = train.train_model(
+            grade, model_version, head=result["head"], hyperparams=result["best"]["config"]
+        )
+    return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Hyperparameter search for EggPrice LSTM")
+    parser.add_argument("--grade", default="특란", help="Egg grade to tune")
+    parser.add_argument("--version", default=None, help="Model version string")
+    parser.add_argument("--trials", type=int, default=DEFAULT_TRIALS, help="Configurations to try")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Parallel trial processes (default: TRAINING_WORKERS)",
+    )
+    parser.add_argument(
+        "--head", choices=["point", "quantile"], default=None,
+        help="Output head (default: MODEL_HEAD)",
+    )
+    parser.add_argument("--epochs", type=int, default=None, help="Max epochs per trial (default: EPOCHS)")
+    parser.add_argument("--search-only", action="store_true", help="Don't train the final model")
+    args = parser.parse_args()
+
+    tune_and_train(
+        args.grade, args.version, args.trials, args.workers, args.head,
+        train_final=not args.search_only, epochs=args.epochs,
+    )
@@ -0,0 +1,35 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Float, Index, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class EggPriceFeature(Base):
+    """Materialised model input: one row of the 15 FEATURE_COLUMNS per (grade, date)."""
+    __tablename__ = "egg_price_features"
+    __table_args__ = (
+        UniqueConstraint("grade", "date", name="uq_feature_grade_date"),
+        Index("ix_feature_grade_date", "grade", "date"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    grade: Mapped[str] = mapped_column(String(10), nullable=False)
+    date: Mapped[date] = mapped_column(Date, nullable=False)
+    price: Mapped[float] = mapped_column(Float, nullable=False)
+    wholesale_price: Mapped[float] = mapped_column(Float, nullable=False)
+    volume: Mapped[float] = mapped_column(Float, nullable=False)
+    corn_price: Mapped[float] = mapped_column(Float, nullable=False)
+    exchange_rate: Mapped[float] = mapped_column(Float, nullable=False)
+    avian_flu: Mapped[float] = mapped_column(Float, nullable=False)
+    temperature: Mapped[float] = mapped_column(Float, nullable=False)
+    day_of_week_sin: Mapped[float] = mapped_column(Float, nullable=False)
+    day_of_week_cos: Mapped[float] = mapped_column(Float, nullable=False)
+    month_sin: Mapped[float] = mapped_column(Float, nullable=False)
+    month_cos: Mapped[float] = mapped_column(Float, nullable=False)
+    price_ma7: Mapped[float] = mapped_column(Float, nullable=False)
+    price_ma14: Mapped[float] = mapped_column(Float, nullable=False)
+    price_volatility_7: Mapped[float] = mapped_column(Float, nullable=False)
+    price_momentum: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
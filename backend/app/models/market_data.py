@@ -1,6 +1,15 @@
 from datetime import date, datetime
 
-from sqlalchemy import Boolean, Date, DateTime, Float, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -77,3 +86,40 @@ class ModelPerformance(Base):
     directional_accuracy: Mapped[float] = mapped_column(Float, nullable=False)
     is_production: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class BacktestResult(Base):
+    """Per-horizon walk-forward backtest metrics for a model version."""
+    __tablename__ = "backtest_results"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    model_version: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    grade: Mapped[str] = mapped_column(String(10), nullable=False)
+    horizon_days: Mapped[int] = mapped_column(Integer, nullable=False)
+    eval_date: Mapped[date] = mapped_column(Date, nullable=False)
+    origins: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_origin: Mapped[date] = mapped_column(Date, nullable=False)
+    last_origin: Mapped[date] = mapped_column(Date, nullable=False)
+    mae: Mapped[float] = mapped_column(Float, nullable=False)
+    rmse: Mapped[float] = mapped_column(Float, nullable=False)
+    mape: Mapped[float] = mapped_column(Float, nullable=False)
+    directional_accuracy: Mapped[float] = mapped_column(Float, nullable=False)
+    coverage: Mapped[float] = mapped_column(Float, nullable=False)  # % inside the 90% interval
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class EvaluationCache(Base):
+    """Memoized evaluation results, valid while model file and data are unchanged."""
+    __tablename__ = "evaluation_cache"
+    __table_args__ = (
+        UniqueConstraint("kind", "grade", "artifact_hash", "data_watermark", name="uq_eval_cache_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(30), nullable=False)  # e.g. "recent:30", "backtest:730"
+    grade: Mapped[str] = mapped_column(String(10), nullable=False)
+    model_version: Mapped[str] = mapped_column(String(50), nullable=False)
+    artifact_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # sha256 of model files
+    data_watermark: Mapped[date] = mapped_column(Date, nullable=False)  # latest date across sources
+    result: Mapped[str] = mapped_column(Text, nullable=False)  # JSON
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
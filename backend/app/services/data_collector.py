@@ -22,7 +22,9 @@ from app.services.feed_client import fetch_feed_prices
 from app.services.exchange_client import fetch_exchange_rate
 from app.services.avian_flu_client import fetch_avian_flu_status
 from app.services.weather_client import fetch_weather_data
-from app.services.price_service import fetch_and_store_prices
+from app.core.cache import cache_invalidate
+from app.services.price_service import GRADES, fetch_and_store_prices, market_tags
+from app.ml.feature_store import update_feature_store
 
 logger = logging.getLogger(__name__)
 
@@ -35,9 +37,12 @@ async def collect_all_daily_data(db: Session, target_date: date | None = None):
     logger.info(f"Starting full data collection for {target_date}")
     results = {"date": target_date, "sources": {}}
 
-    # 1. Egg prices (KAMIS) — daily
+    # 1. Egg prices (KAMIS) — daily. Features are refreshed in step 7, from
+    # the earliest price KAMIS returned (it may backfill earlier days).
+    features_since = target_date
     try:
-        stored = await fetch_and_store_prices(db, target_date)
+        stored = await fetch_and_store_prices(db, target_date, update_features=False)
+        features_since = min([target_date, *(s.date for s in stored)])
         results["sources"]["egg_prices"] = len(stored)
         logger.info(f"  egg_prices: {len(stored)} records")
     except Exception as e:
@@ -105,6 +110,19 @@ async def collect_all_daily_data(db: Session, target_date: date | None = None):
         logger.error(f"  weather failed: {e}")
 
     db.commit()
+    # Prices invalidate their own keys; this covers the market indicators
+    cache_invalidate(*market_tags(target_date))
+
+    # 7. Feature store — recompute only rows whose rolling windows saw new data
+    try:
+        written = update_feature_store(db, GRADES, since=features_since)
+        results["sources"]["features"] = sum(written.values())
+        logger.info(f"  features: {written}")
+    except Exception as e:
+        db.rollback()
+        results["sources"]["features"] = f"error: {e}"
+        logger.error(f"  features failed: {e}")
+
     logger.info(f"Data collection complete for {target_date}: {results['sources']}")
     return results
 
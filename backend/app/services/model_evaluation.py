@@ -5,33 +5,121 @@ Auto-promotes if candidate outperforms on key metrics.
 Triggers retraining when MAPE > threshold or on monthly schedule.
 """
 
+import hashlib
 import json
 import logging
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, timedelta
 from pathlib import Path
 
 import numpy as np
 import torch
 from torch.utils.data import DataLoader, TensorDataset
-from sqlalchemy import desc
+from sqlalchemy import desc, func, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.cache import cache_invalidate
 from app.core.config import settings
 from app.core.database import SessionLocal
 from app.core.metrics import model_mape_gauge
-from app.models.market_data import ModelPerformance
+from app.models.market_data import (
+    AvianFluStatus,
+    BacktestResult,
+    EvaluationCache,
+    ExchangeRate,
+    FeedPrice,
+    ModelPerformance,
+    TradingVolume,
+    WeatherData,
+)
+from app.models.price import EggPrice
+from app.ml.backtest import BACKTEST_ORIGINS, walk_forward_backtest
 from app.ml.model import EggPriceLSTM
-from app.ml.predict import load_model
+from app.ml.predict import load_model, model_device
+from app.ml.registry import model_registry
 from app.ml.preprocessing import (
     SEQUENCE_LENGTH,
     PriceScaler,
     build_features_from_db,
+    build_horizon_targets,
     create_sequences,
 )
-from app.ml.train import compute_metrics, train_model, MODELS_DIR, ALL_GRADES
+from app.ml.train import (
+    ALL_GRADES,
+    MODELS_DIR,
+    _init_training_worker,
+    compute_metrics,
+    train_model,
+)
 
 logger = logging.getLogger(__name__)
 
+# Tables feeding build_features_from_db besides egg_prices
+_FEATURE_SOURCES = (TradingVolume, FeedPrice, ExchangeRate, AvianFluStatus, WeatherData)
+
+
+def artifact_hash(grade: str, model_version: str) -> str | None:
+    """sha256 over the model files evaluation would load, or None if missing."""
+    paths = dict.fromkeys(model_registry.artifact_paths(grade, model_version))
+    if not all(p.exists() for p in paths):
+        return None
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_watermark(db: Session, grade: str) -> date | None:
+    """Latest ingested date across the grade's prices and every feature source."""
+    latest = [
+        select(func.max(EggPrice.date)).where(EggPrice.grade == grade).scalar_subquery(),
+        *(select(func.max(t.date)).scalar_subquery() for t in _FEATURE_SOURCES),
+    ]
+    dates = [d for d in db.execute(select(*latest)).one() if d is not None]
+    return max(dates) if dates else None
+
+
+def _cached_evaluation(
+    db: Session,
+    kind: str,
+    grade: str,
+    model_version: str,
+    compute,
+    decode=lambda r: r,
+) -> dict | None:
+    """Return `compute()`, memoized in EvaluationCache.
+
+    The key is (kind, grade, artifact hash, data watermark): retraining the
+    model or ingesting any newer data produces a new key. None results
+    (missing model or data) are never cached.
+    """
+    digest = artifact_hash(grade, model_version)
+    watermark = data_watermark(db, grade)
+    if digest is None or watermark is None:
+        return compute()
+
+    key = {"kind": kind, "grade": grade, "artifact_hash": digest, "data_watermark": watermark}
+    row = db.query(EvaluationCache).filter_by(**key).first()
+    if row is not None:
+        logger.info(f"Evaluation cache hit: {kind} {model_version}/{grade} @ {watermark}")
+        return decode(json.loads(row.result))
+
+    result = compute()
+    if result is not None:
+        db.add(EvaluationCache(
+            **key, model_version=model_version, result=json.dumps(result, default=str),
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # a concurrent evaluation stored the same key first
+    return result
+
 
 def evaluate_model_on_recent_data(
     db: Session,
@@ -42,15 +130,24 @@ def evaluate_model_on_recent_data(
     """Evaluate a trained model on the most recent data.
 
     Loads the last `eval_days` worth of data, creates sequences,
-    runs inference, and computes metrics.
+    runs inference, and computes metrics. Results are memoized per model
+    artifact and data watermark (see _cached_evaluation).
     """
+    return _cached_evaluation(
+        db, f"recent:{eval_days}", grade, model_version,
+        lambda: _evaluate_recent(db, grade, model_version, eval_days),
+    )
+
+
+def _evaluate_recent(db: Session, grade: str, model_version: str, eval_days: int) -> dict | None:
     try:
-        model, scaler = load_model(grade, model_version)
+        # Batched evaluation needs a torch module, whatever the serving runtime
+        model, scaler = load_model(grade, model_version, runtime="torch")
     except FileNotFoundError:
         logger.warning(f"Model {model_version} for {grade} not found")
         return None
 
-    device = next(model.parameters()).device
+    device = model_device(model)
     df = build_features_from_db(db, grade)
 
     if len(df) < SEQUENCE_LENGTH + eval_days:
@@ -62,15 +159,7 @@ def evaluate_model_on_recent_data(
     features = scaler.transform_features(eval_df)
 
     # Build targets from price column
-    price = eval_df["price"].values
-    targets = np.full((len(price), 3), np.nan)
-    for i in range(len(price)):
-        if i + 7 < len(price):
-            targets[i, 0] = price[i + 7]
-        if i + 14 < len(price):
-            targets[i, 1] = price[i + 14]
-        if i + 30 < len(price):
-            targets[i, 2] = price[i + 30]
+    targets = build_horizon_targets(eval_df["price"].values)
 
     valid_mask = ~np.isnan(targets).any(axis=1)
     features_valid = features[valid_mask]
@@ -86,16 +175,16 @@ def evaluate_model_on_recent_data(
     if len(X) == 0:
         return None
 
-    dataset = TensorDataset(torch.FloatTensor(X), torch.FloatTensor(y))
+    # X is a read-only strided view; copy it out as train_model does
+    dataset = TensorDataset(torch.from_numpy(np.ascontiguousarray(X)), torch.from_numpy(y))
     loader = DataLoader(dataset, batch_size=32)
 
-    model.eval()
     all_preds = []
     all_true = []
     with torch.no_grad():
         for X_batch, y_batch in loader:
             X_batch = X_batch.to(device)
-            preds = model(X_batch)
+            preds = model.point(model(X_batch, stochastic=False))
             all_preds.append(preds.cpu().numpy())
             all_true.append(y_batch.numpy())
 
@@ -106,6 +195,143 @@ def evaluate_model_on_recent_data(
     return metrics
 
 
+def backtest_model(
+    db: Session,
+    grade: str,
+    model_version: str,
+    max_origins: int | None = None,
+    after: date | None = None,
+) -> dict | None:
+    """Walk-forward backtest of a model version over the grade's history.
+
+    With `after`, only origins dated after it are scored (see
+    training_cutoff). Returns the walk_forward_backtest result (memoized
+    per model artifact and data watermark), or None if the model or enough
+    data is missing.
+    """
+    if max_origins is None:
+        max_origins = BACKTEST_ORIGINS
+    kind = f"backtest:{max_origins}" + (f":{after.isoformat()}" if after else "")
+    return _cached_evaluation(
+        db, kind, grade, model_version,
+        lambda: _run_backtest(db, grade, model_version, max_origins, after),
+        decode=_decode_backtest,
+    )
+
+
+def _run_backtest(
+    db: Session,
+    grade: str,
+    model_version: str,
+    max_origins: int,
+    after: date | None = None,
+) -> dict | None:
+    try:
+        model, scaler = load_model(grade, model_version, runtime="torch")
+        df = build_features_from_db(db, grade)
+    except (FileNotFoundError, ValueError) as e:
+        logger.warning(f"Cannot backtest {model_version} for {grade}: {e}")
+        return None
+
+    return walk_forward_backtest(model, scaler, df, max_origins, after=after)
+
+
+def training_cutoff(grade: str, model_version: str) -> date | None:
+    """Last day of data a model version was trained on, from its training report.
+
+    Reports written before data_end was recorded fall back to train_date,
+    an upper bound. None if there is no report.
+    """
+    report_path = MODELS_DIR / f"training_report_{grade}_{model_version}.json"
+    if not report_path.exists():
+        return None
+    with open(report_path, encoding="utf-8") as f:
+        report = json.load(f)
+    return date.fromisoformat(report.get("data_end") or report["train_date"])
+
+
+def _decode_backtest(result: dict) -> dict:
+    """Restore int horizon keys and origin dates after a JSON round trip."""
+    result["horizons"] = {int(h): m for h, m in result["horizons"].items()}
+    for key in ("first_origin", "last_origin"):
+        result[key] = date.fromisoformat(result[key])
+    return result
+
+
+def _backtest_worker(grade: str, model_version: str, max_origins: int | None) -> dict | None:
+    """Process-pool entry point: each worker opens its own session."""
+    db = SessionLocal()
+    try:
+        return backtest_model(db, grade, model_version, max_origins)
+    finally:
+        db.close()
+
+
+def backtest_all_grades(
+    model_version: str | None = None,
+    workers: int | None = None,
+    max_origins: int | None = None,
+) -> dict[str, dict]:
+    """Backtest every grade, concurrently on a process pool when `workers > 1`.
+
+    Pool sizing follows train_all_grades (TRAINING_WORKERS, torch threads
+    split across workers). Grades without a model or data are omitted.
+    """
+    if model_version is None:
+        model_version = settings.MODEL_VERSION
+    if workers is None:
+        workers = settings.TRAINING_WORKERS
+    workers = max(1, min(workers, len(ALL_GRADES)))
+    if workers > 1 and mp.current_process().daemon:
+        workers = 1
+
+    if workers == 1:
+        results = {g: _backtest_worker(g, model_version, max_origins) for g in ALL_GRADES}
+    else:
+        num_threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_training_worker,
+            initargs=(num_threads,),
+        ) as pool:
+            futures = {
+                g: pool.submit(_backtest_worker, g, model_version, max_origins) for g in ALL_GRADES
+            }
+        results = {g: f.result() for g, f in futures.items()}
+
+    return {g: r for g, r in results.items() if r is not None}
+
+
+def store_backtest_results(db: Session, model_version: str, results: dict[str, dict]) -> int:
+    """Bulk-insert one BacktestResult row per (grade, horizon). Returns rows written."""
+    today = date.today()
+    rows = [
+        {
+            "model_version": model_version,
+            "grade": grade,
+            "horizon_days": h,
+            "eval_date": today,
+            "origins": result["origins"],
+            "first_origin": result["first_origin"],
+            "last_origin": result["last_origin"],
+            **metrics,
+        }
+        for grade, result in results.items()
+        for h, metrics in result["horizons"].items()
+    ]
+    if rows:
+        db.execute(insert(BacktestResult), rows)
+        db.commit()
+    return len(rows)
+
+
+def _headline_metrics(backtest: dict) -> dict:
+    """The four metrics compare_models ranks on, from a backtest's overall row."""
+    overall = backtest["overall"]
+    return {k: overall[k] for k in ("mae", "rmse", "mape", "directional_accuracy")}
+
+
 def store_performance(
     db: Session,
     model_version: str,
@@ -131,10 +357,16 @@ def store_performance(
     # Update Prometheus gauge
     if is_production:
         model_mape_gauge.labels(grade=grade).set(metrics["mape"])
+    _invalidate_performance_cache(grade)
 
     return perf
 
 
+def _invalidate_performance_cache(grade: str):
+    """Drop /models/performance and /models/current responses for a grade."""
+    cache_invalidate(("models", f"grade:{grade}"))
+
+
 def get_production_metrics(db: Session, grade: str) -> ModelPerformance | None:
     """Get the latest production model performance for a grade."""
     return (
@@ -152,10 +384,36 @@ def compare_models(
 ) -> dict:
     """A/B test: compare candidate model against production model.
 
+    Both models are scored by walk-forward backtest over the same origins,
+    all dated after both training cutoffs, when there are any; otherwise
+    the candidate falls back to the last-30-day evaluation and production
+    to its stored metrics.
+
+    Backtest metrics go to BacktestResult only; the ModelPerformance row
+    stored for the candidate always holds its 30-day metrics, like every
+    other row in that table.
+
     Returns comparison result with recommendation.
     """
     prod_metrics_record = get_production_metrics(db, grade)
-    candidate_metrics = evaluate_model_on_recent_data(db, grade, candidate_version)
+
+    # Out-of-sample origins only: after the later of the two training cutoffs.
+    # Without a known candidate cutoff every origin may be in-sample.
+    after = training_cutoff(grade, candidate_version)
+    if after is not None and prod_metrics_record:
+        prod_cutoff = training_cutoff(grade, prod_metrics_record.model_version)
+        if prod_cutoff is not None:
+            after = max(after, prod_cutoff)
+    candidate_backtest = None
+    if after is not None:
+        candidate_backtest = backtest_model(db, grade, candidate_version, after=after)
+
+    recent_metrics = evaluate_model_on_recent_data(db, grade, candidate_version)
+    if candidate_backtest is not None:
+        store_backtest_results(db, candidate_version, {grade: candidate_backtest})
+        candidate_metrics = _headline_metrics(candidate_backtest)
+    else:
+        candidate_metrics = recent_metrics
 
     if candidate_metrics is None:
         return {"status": "error", "reason": "Could not evaluate candidate model"}
@@ -164,17 +422,26 @@ def compare_models(
         "grade": grade,
         "candidate_version": candidate_version,
         "candidate_metrics": candidate_metrics,
+        "candidate_backtest": candidate_backtest,
         "production_metrics": None,
         "recommendation": "promote",  # default if no production model exists
     }
 
     if prod_metrics_record:
-        prod_metrics = {
-            "mae": prod_metrics_record.mae,
-            "rmse": prod_metrics_record.rmse,
-            "mape": prod_metrics_record.mape,
-            "directional_accuracy": prod_metrics_record.directional_accuracy,
-        }
+        prod_backtest = None
+        if candidate_backtest is not None:
+            prod_backtest = backtest_model(
+                db, grade, prod_metrics_record.model_version, candidate_backtest["origins"], after
+            )
+        if prod_backtest is not None:
+            prod_metrics = _headline_metrics(prod_backtest)
+        else:
+            prod_metrics = {
+                "mae": prod_metrics_record.mae,
+                "rmse": prod_metrics_record.rmse,
+                "mape": prod_metrics_record.mape,
+                "directional_accuracy": prod_metrics_record.directional_accuracy,
+            }
         result["production_version"] = prod_metrics_record.model_version
         result["production_metrics"] = prod_metrics
 
@@ -193,7 +460,8 @@ def compare_models(
         result["recommendation"] = "promote" if improvements >= 3 else "keep_current"
 
     # Store candidate evaluation
-    store_performance(db, candidate_version, grade, candidate_metrics, is_production=False)
+    if recent_metrics is not None:
+        store_performance(db, candidate_version, grade, recent_metrics, is_production=False)
 
     return result
 
@@ -220,6 +488,9 @@ def promote_model(db: Session, grade: str, version: str):
         candidate.is_production = True
 
     db.commit()
+    # Drop warm models for this grade so the next load sees the promoted files
+    model_registry.invalidate(grade)
+    _invalidate_performance_cache(grade)
     logger.info(f"Promoted model {version} to production for grade={grade}")
 
 
@@ -265,12 +536,17 @@ def check_and_retrain_if_needed(db: Session):
 
 
 def _retrain_and_evaluate(db: Session, grade: str):
-    """Train a new candidate model and run A/B comparison."""
+    """Train a new candidate model and run A/B comparison.
+
+    The candidate is first trained without the latest BACKTEST_HOLDOUT_DAYS
+    so compare_models can backtest both models on days neither saw. If it
+    wins, it is refit on all data before promotion.
+    """
     # Generate new version string
     candidate_version = f"v{date.today().strftime('%Y%m%d')}"
 
     try:
-        train_model(grade, candidate_version)
+        train_model(grade, candidate_version, holdout_days=settings.BACKTEST_HOLDOUT_DAYS)
     except ValueError as e:
         logger.warning(f"Cannot retrain {grade}: {e}")
         return
@@ -279,6 +555,7 @@ def _retrain_and_evaluate(db: Session, grade: str):
     logger.info(f"A/B test result for {grade}: {result['recommendation']}")
 
     if result["recommendation"] == "promote":
+        train_model(grade, candidate_version)
         promote_model(db, grade, candidate_version)
         logger.info(f"Promoted {candidate_version} for {grade}")
     else:
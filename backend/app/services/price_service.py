@@ -1,9 +1,12 @@
 import logging
 from datetime import date, timedelta
 
-from sqlalchemy import desc
+from sqlalchemy import desc, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import cache_invalidate
 from app.models.price import EggPrice
 from app.services.kamis_client import fetch_daily_prices
 
@@ -11,9 +14,31 @@ logger = logging.getLogger(__name__)
 
 GRADES = ["왕란", "특란", "대란", "중란", "소란"]
 
+# /prices/current covers every grade
+CURRENT_PRICES_TAGS = ("prices", *(f"grade:{g}" for g in GRADES))
 
-async def fetch_and_store_prices(db: Session, target_date: date | None = None) -> list[EggPrice]:
-    """Fetch prices from KAMIS and store in DB."""
+
+def market_tags(since: date) -> list[str]:
+    """Cache tags of market snapshots that include data dated `since`.
+
+    A snapshot for day d reads the latest rows on or before d, so new data
+    for `since` can change every snapshot from then through today.
+    """
+    days = max((date.today() - since).days, 0)
+    return [f"market:{since + timedelta(days=i)}" for i in range(days + 1)]
+
+
+async def fetch_and_store_prices(
+    db: Session,
+    target_date: date | None = None,
+    update_features: bool = True,
+) -> list[EggPrice]:
+    """Fetch prices from KAMIS and store in DB.
+
+    KAMIS can backfill or correct earlier days, so the feature store is
+    recomputed from the earliest stored date; pass `update_features=False`
+    when the caller refreshes it afterwards anyway.
+    """
     prices_data = await fetch_daily_prices(target_date)
     stored = []
 
@@ -41,35 +66,69 @@ async def fetch_and_store_prices(db: Session, target_date: date | None = None) -
     db.commit()
     for s in stored:
         db.refresh(s)
+    if stored:
+        cache_invalidate(
+            *(("prices", f"grade:{g}") for g in sorted({s.grade for s in stored})),
+            *market_tags(min(s.date for s in stored)),
+        )
+        if update_features:
+            _update_features(db, stored)
     return stored
 
 
+def _update_features(db: Session, stored: list[EggPrice]):
+    # Lazy import: keep pandas out of the API process until prices are written
+    from app.ml.feature_store import update_feature_store
+
+    try:
+        update_feature_store(db, sorted({s.grade for s in stored}), since=min(s.date for s in stored))
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Feature store refresh failed: {e}")
+
+
+# Sync (Session) and async (AsyncSession) variants share these statements
+# and the post-processing below; only the execution differs.
+_RECENT_DATES = select(EggPrice.date).distinct().order_by(desc(EggPrice.date)).limit(2)
+
+
+def _rows_on(dates: list[date]):
+    return select(EggPrice).where(EggPrice.date.in_(dates))
+
+
+def _history(grade: str, days: int):
+    since = date.today() - timedelta(days=days)
+    return (
+        select(EggPrice)
+        .where(EggPrice.grade == grade, EggPrice.date >= since)
+        .order_by(EggPrice.date)
+    )
+
+
 def get_current_prices(db: Session) -> list[dict]:
     """Get today's (or most recent) prices with daily change.
 
     Optimized: 2 queries instead of 5 (one per grade).
     """
     # 1) Find the 2 most recent distinct dates
-    recent_dates = (
-        db.query(EggPrice.date)
-        .distinct()
-        .order_by(desc(EggPrice.date))
-        .limit(2)
-        .all()
-    )
-    if not recent_dates:
+    dates = list(db.scalars(_RECENT_DATES))
+    if not dates:
         return []
 
-    dates = [r[0] for r in recent_dates]
-
     # 2) Single query for all grades on those dates
-    rows = (
-        db.query(EggPrice)
-        .filter(EggPrice.date.in_(dates))
-        .all()
-    )
+    return _with_daily_change(db.scalars(_rows_on(dates)).all())
 
-    # 3) Group by grade and compute changes
+
+async def get_current_prices_async(db: AsyncSession) -> list[dict]:
+    """Async variant of get_current_prices."""
+    dates = list(await db.scalars(_RECENT_DATES))
+    if not dates:
+        return []
+    return _with_daily_change((await db.scalars(_rows_on(dates))).all())
+
+
+def _with_daily_change(rows: list[EggPrice]) -> list[dict]:
+    """Group the two most recent dates' rows by grade and compute changes."""
     by_grade: dict[str, list] = {}
     for row in rows:
         by_grade.setdefault(row.grade, []).append(row)
@@ -105,10 +164,9 @@ def get_current_prices(db: Session) -> list[dict]:
 
 def get_price_history(db: Session, grade: str, days: int = 180) -> list[EggPrice]:
     """Get historical prices for a grade."""
-    since = date.today() - timedelta(days=days)
-    return (
-        db.query(EggPrice)
-        .filter(EggPrice.grade == grade, EggPrice.date >= since)
-        .order_by(EggPrice.date)
-        .all()
-    )
+    return list(db.scalars(_history(grade, days)))
+
+
+async def get_price_history_async(db: AsyncSession, grade: str, days: int = 180) -> list[EggPrice]:
+    """Async variant of get_price_history."""
+    return list(await db.scalars(_history(grade, days)))
@@ -34,11 +34,32 @@ def train_model_task(grade: str, model_version: str | None = None):
 
 
 @celery.task(name="app.tasks.training_tasks.train_all_task")
-def train_all_task(model_version: str | None = None):
-    """Train models for all grades."""
+def train_all_task(model_version: str | None = None, workers: int | None = None):
+    """Train models for all grades, optionally on a process pool."""
     from app.ml.train import train_all_grades
 
     logger.info("Celery: Training all grades")
-    reports = train_all_grades(model_version)
+    reports = train_all_grades(model_version, workers)
     logger.info(f"Celery: Trained {len(reports)} models")
     return [r["grade"] for r in reports]
+
+
+@celery.task(name="app.tasks.training_tasks.backtest_all_task")
+def backtest_all_task(model_version: str | None = None, workers: int | None = None):
+    """Walk-forward backtest every grade and persist per-horizon results."""
+    from app.core.config import settings
+    from app.services.model_evaluation import (
+        backtest_all_grades,
+        store_backtest_results,
+    )
+
+    model_version = model_version or settings.MODEL_VERSION
+    logger.info(f"Celery: Backtesting {model_version} for all grades")
+    results = backtest_all_grades(model_version, workers)
+    db = SessionLocal()
+    try:
+        rows = store_backtest_results(db, model_version, results)
+    finally:
+        db.close()
+    logger.info(f"Celery: Stored {rows} backtest rows")
+    return {grade: r["overall"] for grade, r in results.items()}
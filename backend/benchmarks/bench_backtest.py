@@ -0,0 +1,51 @@
+"""Benchmark: walk-forward backtest, one inference call per origin vs batched.
+
+Usage:
+    python -m benchmarks.bench_backtest
+    python -m benchmarks.bench_backtest --origins 730 --passes 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from app.ml.backtest import walk_forward_backtest
+from app.ml.model import QUANTILES, EggPriceLSTM
+from app.ml.predict import _forecast
+from app.ml.preprocessing import SEQUENCE_LENGTH, PriceScaler, build_features
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest benchmark")
+    parser.add_argument("--origins", type=int, default=730)
+    parser.add_argument("--passes", type=int, default=50)
+    args = parser.parse_args()
+
+    n = args.origins + SEQUENCE_LENGTH + 30
+    df = build_features(pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=n, freq="D"),
+        "retail_price": 6000 + np.cumsum(np.random.normal(0, 20, n)),
+    }))
+    scaler = PriceScaler()
+    scaler.fit_transform(df)
+    features = scaler.transform_features(df)
+    print(f"origins: {args.origins}, MC passes: {args.passes}, torch threads: {torch.get_num_threads()}")
+
+    for head, model in [("mc", EggPriceLSTM()), ("quantile", EggPriceLSTM(quantiles=QUANTILES))]:
+        start = time.perf_counter()
+        for end in range(SEQUENCE_LENGTH, SEQUENCE_LENGTH + args.origins):
+            _forecast(model, features[end - SEQUENCE_LENGTH : end], scaler)
+        loop_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        walk_forward_backtest(model, scaler, df, args.origins, args.passes)
+        batched_s = time.perf_counter() - start
+
+        print(f"{head:9} loop {loop_s:7.2f} s | batched {batched_s:7.2f} s | {loop_s / batched_s:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
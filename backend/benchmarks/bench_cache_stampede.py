@@ -0,0 +1,123 @@
+"""Load test: a burst of /prices/current requests hitting an expired cache key.
+
+Drives the ASGI app in-process with httpx. The price query is slowed down
+by QUERY_SECONDS to stand in for a loaded database, and every call to it is
+counted. Three scenarios, BURST concurrent requests each:
+
+    cold, no coalescing    the old get / load / set: every miss queries
+    cold, single-flight    cache_fetch_async: one query, the rest wait on it
+    stale, revalidate      an entry past its soft TTL: served at once while
+                           one background refresh runs
+
+Runs without Redis, so this measures the in-process half (single-flight);
+the cross-process lock only adds one SET NX round-trip per load.
+
+Usage:
+    python -m benchmarks.bench_cache_stampede
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import httpx
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api import prices
+from app.core.cache import _l1, cache_get_async, cache_set, cache_set_async
+from app.core.database import Base, get_async_sessionmaker
+from app.core.rate_limit import limiter
+from app.main import app
+from app.models.price import EggPrice
+from app.services.price_service import CURRENT_PRICES_TAGS
+
+GRADES = ["왕란", "특란", "대란", "중란", "소란"]
+BURST = 100
+QUERY_SECONDS = 0.05
+
+_queries = 0
+_real_query = prices.get_current_prices_async
+
+
+async def _slow_query(db):
+    global _queries
+    _queries += 1
+    await asyncio.sleep(QUERY_SECONDS)
+    return await _real_query(db)
+
+
+async def _naive_fetch(key, loader, ttl=None, tags=()):
+    hit = await cache_get_async(key)
+    if hit is not None:
+        return hit
+    value = await loader()
+    await cache_set_async(key, value, ttl, tags)
+    return value
+
+
+async def _burst() -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            start = time.perf_counter()
+            resp = await client.get("/api/v1/prices/current")
+            assert resp.status_code == 200
+            return time.perf_counter() - start
+
+        latencies = await asyncio.gather(*(one() for _ in range(BURST)))
+        await asyncio.sleep(QUERY_SECONDS * 2)  # let a background refresh land
+    return latencies
+
+
+def _scenario(label: str, stale: bool = False):
+    global _queries
+    _l1.clear()
+    if stale:
+        cache_set("prices:current", [], ttl=0, tags=CURRENT_PRICES_TAGS)
+    _queries = 0
+    ms = np.array(asyncio.run(_burst())) * 1000
+    print(
+        f"{label:<22} {_queries:>8} {np.percentile(ms, 50):>9.1f} "
+        f"{np.percentile(ms, 99):>9.1f} {ms.max():>9.1f}"
+    )
+
+
+def main():
+    db_path = os.path.join(tempfile.mkdtemp(prefix="eggprice-bench-"), "bench.db")
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    today = date.today()
+    db.add_all([
+        EggPrice(date=today - timedelta(days=d), grade=grade, retail_price=6000.0 + d,
+                 wholesale_price=5000.0, unit="30개")
+        for grade in GRADES for d in range(30)
+    ])
+    db.commit()
+    db.close()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    app.dependency_overrides[get_async_sessionmaker] = lambda: async_sessionmaker(
+        async_engine, expire_on_commit=False
+    )
+    limiter.enabled = False
+
+    print(f"{BURST} concurrent /prices/current requests, {QUERY_SECONDS * 1000:.0f} ms query")
+    print(f"{'scenario':<22} {'queries':>8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    with patch.object(prices, "get_current_prices_async", side_effect=_slow_query):
+        with patch.object(prices, "cache_fetch_async", side_effect=_naive_fetch):
+            _scenario("cold, no coalescing")
+        _scenario("cold, single-flight")
+        _scenario("stale, revalidate", stale=True)
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Load test: /prices/current latency while /predictions/refresh is running.
+
+Drives the ASGI app in-process with httpx (no network or server process).
+The refresh is simulated by a blocking call of REFRESH_SECONDS, standing in
+for feature building + inference. Ten clients poll /prices/current for the
+whole run, first with no refresh, then with the refresh run inline on the
+event loop (the old behaviour), then with it offloaded to the ML executor.
+
+Usage:
+    python -m benchmarks.bench_event_loop
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import httpx
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api import predictions
+from app.core.database import Base, get_async_sessionmaker, get_db
+from app.core.rate_limit import limiter
+from app.main import app
+from app.models.price import EggPrice
+
+GRADES = ["왕란", "특란", "대란", "중란", "소란"]
+CLIENTS = 10
+INTERVAL = 0.02  # seconds between requests per client
+REFRESH_SECONDS = 2.0
+
+
+def _blocking_refresh(db):
+    time.sleep(REFRESH_SECONDS)
+    return []
+
+
+async def _inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+async def _poll(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list[float]):
+    # Open-loop schedule: latency is measured from when a request *should*
+    # have been sent, so time spent unable to send (a blocked loop) counts.
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        resp = await client.get("/api/v1/prices/current")
+        latencies.append(time.perf_counter() - scheduled)
+        assert resp.status_code == 200
+        scheduled = max(scheduled + INTERVAL, time.perf_counter() - INTERVAL)
+
+
+async def _run(refresh: bool) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        latencies: list[float] = []
+        pollers = [asyncio.create_task(_poll(client, stop, latencies)) for _ in range(CLIENTS)]
+        await asyncio.sleep(0.2)
+        if refresh:
+            await client.post("/api/v1/predictions/refresh")
+        else:
+            await asyncio.sleep(REFRESH_SECONDS)
+        stop.set()
+        await asyncio.gather(*pollers)
+    return latencies
+
+
+def _report(label: str, latencies: list[float]):
+    ms = np.array(latencies) * 1000
+    print(
+        f"{label:<22} {len(ms):>6} {np.percentile(ms, 50):>9.1f} "
+        f"{np.percentile(ms, 99):>9.1f} {ms.max():>9.1f}"
+    )
+
+
+def main():
+    # A file, so the sync (refresh) and async (/prices/current) engines share it
+    db_path = os.path.join(tempfile.mkdtemp(prefix="eggprice-bench-"), "bench.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    db = Session()
+    today = date.today()
+    db.add_all([
+        EggPrice(date=today - timedelta(days=d), grade=grade, retail_price=6000.0 + d,
+                 wholesale_price=5000.0, unit="30개")
+        for grade in GRADES for d in range(30)
+    ])
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    app.dependency_overrides[get_db] = override_get_db
+    limiter.enabled = False  # ten clients far exceed the per-IP API limit
+    app.dependency_overrides[get_async_sessionmaker] = lambda: async_sessionmaker(
+        async_engine, expire_on_commit=False
+    )
+    print(f"{CLIENTS} clients polling /prices/current, {REFRESH_SECONDS:.0f}s refresh")
+    print(f"{'scenario':<22} {'reqs':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    with patch.object(predictions, "run_all_predictions", side_effect=_blocking_refresh):
+        _report("no refresh", asyncio.run(_run(refresh=False)))
+        with patch.object(predictions, "run_ml", side_effect=_inline):
+            _report("refresh on event loop", asyncio.run(_run(refresh=True)))
+        _report("refresh offloaded", asyncio.run(_run(refresh=True)))
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark: build_features_from_db, ORM + merges vs single-query loader.
+
+Seeds an in-memory SQLite DB with 1, 5 and 10 years of daily egg prices and
+market data, then times the previous six-query ORM path against the current
+single-statement columnar loader.
+
+Usage:
+    python -m benchmarks.bench_feature_loader
+"""
+
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.ml.preprocessing import FEATURE_COLUMNS, build_features, build_features_from_db
+from app.models import market_data, prediction, price  # noqa: F401
+from app.models.market_data import (
+    AvianFluStatus,
+    ExchangeRate,
+    FeedPrice,
+    TradingVolume,
+    WeatherData,
+)
+from app.models.price import EggPrice
+
+GRADE = "대란"
+
+
+def _legacy_build_features_from_db(db_session, grade: str) -> pd.DataFrame:
+    """Previous implementation: one ORM query per table plus pandas merges."""
+    prices = (
+        db_session.query(EggPrice)
+        .filter(EggPrice.grade == grade, EggPrice.retail_price.isnot(None))
+        .order_by(EggPrice.date)
+        .all()
+    )
+    df = pd.DataFrame([{
+        "date": p.date, "retail_price": p.retail_price, "wholesale_price": p.wholesale_price,
+    } for p in prices])
+    min_date = df["date"].min()
+
+    volumes = db_session.query(TradingVolume).filter(TradingVolume.date >= min_date).all()
+    if volumes:
+        df = df.merge(pd.DataFrame([{"date": v.date, "volume": v.volume_kg} for v in volumes]), on="date", how="left")
+    feeds = (
+        db_session.query(FeedPrice)
+        .filter(FeedPrice.date >= min_date, FeedPrice.feed_type == "옥수수")
+        .all()
+    )
+    if feeds:
+        df = df.merge(pd.DataFrame([{"date": f.date, "corn_price": f.price} for f in feeds]), on="date", how="left")
+    rates = db_session.query(ExchangeRate).filter(ExchangeRate.date >= min_date).all()
+    if rates:
+        df = df.merge(pd.DataFrame([{"date": r.date, "exchange_rate": r.usd_krw} for r in rates]), on="date", how="left")
+    flu_records = db_session.query(AvianFluStatus).filter(AvianFluStatus.date >= min_date).all()
+    if flu_records:
+        df = df.merge(pd.DataFrame([{
+            "date": f.date, "avian_flu": 1.0 if f.is_outbreak else 0.0,
+        } for f in flu_records]), on="date", how="left")
+    weather = db_session.query(WeatherData).filter(WeatherData.date >= min_date).all()
+    if weather:
+        df = df.merge(pd.DataFrame([{"date": w.date, "temperature": w.avg_temperature} for w in weather]), on="date", how="left")
+
+    for col in ["volume", "corn_price", "exchange_rate", "avian_flu", "temperature", "wholesale_price"]:
+        if col in df.columns:
+            df[col] = df[col].ffill().fillna(0.0)
+    return build_features(df)
+
+
+def _seed(db, days: int):
+    today = date.today()
+    rng = np.random.default_rng(0)
+    dates = [today - timedelta(days=days - 1 - i) for i in range(days)]
+    walk = 6000 + np.cumsum(rng.normal(0, 20, days))
+
+    db.execute(insert(EggPrice), [
+        {"date": d, "grade": GRADE, "retail_price": float(p), "wholesale_price": float(p * 0.8), "unit": "30개"}
+        for d, p in zip(dates, walk)
+    ])
+    db.execute(insert(TradingVolume), [{"date": d, "volume_kg": 50000.0} for d in dates])
+    db.execute(insert(FeedPrice), [
+        {"date": d, "feed_type": "옥수수", "price": 350.0, "unit": "원/kg"} for d in dates[::7]
+    ])
+    db.execute(insert(ExchangeRate), [{"date": d, "usd_krw": 1320.0} for d in dates])
+    db.execute(insert(AvianFluStatus), [
+        {"date": d, "is_outbreak": bool(i % 90 < 5), "case_count": 0} for i, d in enumerate(dates)
+    ])
+    db.execute(insert(WeatherData), [{"date": d, "avg_temperature": 15.0} for d in dates])
+    db.commit()
+
+
+def _time(fn, repeat: int = 5) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    print(f"{'years':>5} {'rows':>6} {'legacy ms':>10} {'single-query ms':>16} {'speedup':>8}")
+    for years in [1, 5, 10]:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        _seed(db, years * 365)
+
+        legacy = _legacy_build_features_from_db(db, GRADE)
+        current = build_features_from_db(db, GRADE)
+        np.testing.assert_allclose(legacy[FEATURE_COLUMNS].to_numpy(), current[FEATURE_COLUMNS].to_numpy())
+
+        legacy_ms = _time(lambda db=db: (db.expunge_all(), _legacy_build_features_from_db(db, GRADE)))
+        current_ms = _time(lambda db=db: (db.expunge_all(), build_features_from_db(db, GRADE)))
+        print(f"{years:>5} {len(current):>6} {legacy_ms:>10.1f} {current_ms:>16.1f} {legacy_ms / current_ms:>7.1f}x")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark: per-grade MC Dropout inference latency, loop vs batched.
+
+Usage:
+    python -m benchmarks.bench_mc_dropout
+    python -m benchmarks.bench_mc_dropout --repeat 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from app.ml.model import EggPriceLSTM
+from app.ml.predict import MC_DROPOUT_PASSES, _enable_mc_dropout, mc_dropout_predict
+from app.ml.preprocessing import SEQUENCE_LENGTH, PriceScaler, build_features
+
+
+def _make_scaler() -> PriceScaler:
+    n = 365
+    df = build_features(pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="D"),
+        "retail_price": 6000 + np.cumsum(np.random.normal(0, 20, n)),
+    }))
+    scaler = PriceScaler()
+    scaler.fit_transform(df)
+    return scaler
+
+
+def _loop_predict(model, input_tensor, scaler) -> np.ndarray:
+    """Previous implementation: one forward pass + inverse transform per pass."""
+    model.eval()
+    _enable_mc_dropout(model)
+    all_preds = []
+    with torch.no_grad():
+        for _ in range(MC_DROPOUT_PASSES):
+            all_preds.append(model(input_tensor).cpu().numpy())
+    all_preds = np.array(all_preds).squeeze()
+    return np.array([
+        scaler.inverse_transform_targets(p.reshape(1, -1)).flatten()
+        for p in all_preds
+    ])
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MC Dropout latency benchmark")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    model = EggPriceLSTM()
+    scaler = _make_scaler()
+    x = torch.randn(1, SEQUENCE_LENGTH, 15)
+
+    loop_ms = _time(lambda: _loop_predict(model, x, scaler), args.repeat)
+    batched_ms = _time(lambda: mc_dropout_predict(model, x, scaler), args.repeat)
+
+    print(f"MC Dropout passes: {MC_DROPOUT_PASSES}, torch threads: {torch.get_num_threads()}")
+    print(f"loop    : {loop_ms:8.2f} ms/grade")
+    print(f"batched : {batched_ms:8.2f} ms/grade")
+    print(f"speedup : {loop_ms / batched_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
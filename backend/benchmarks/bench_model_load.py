@@ -0,0 +1,70 @@
+"""Benchmark: cold model load, legacy .pt + pickled scaler vs mmap bundle.
+
+Usage:
+    python -m benchmarks.bench_model_load
+    python -m benchmarks.bench_model_load --repeat 200
+"""
+
+import argparse
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+
+from app.ml.bundle import write_bundle
+from app.ml.model import EggPriceLSTM
+from app.ml.preprocessing import PriceScaler, build_features
+from app.ml.registry import bundle_path, load_from_disk, model_paths
+
+
+def _write(models_dir: Path):
+    n = 365
+    df = build_features(pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="D"),
+        "retail_price": 6000 + np.cumsum(np.random.normal(0, 20, n)),
+    }))
+    scaler = PriceScaler()
+    scaler.fit_transform(df)
+    state_dict = EggPriceLSTM().state_dict()
+
+    pt_path, pkl_path = model_paths("대란", "bench", models_dir)
+    torch.save(state_dict, pt_path)
+    with open(pkl_path, "wb") as f:
+        pickle.dump(scaler, f)
+    with open(bundle_path("대란", "bench", models_dir), "wb") as f:
+        write_bundle(f, state_dict, scaler, "대란", "bench")
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model load benchmark")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        models_dir = Path(tmp)
+        _write(models_dir)
+        pt_path, pkl_path = model_paths("대란", "bench", models_dir)
+        bundle = bundle_path("대란", "bench", models_dir)
+
+        legacy_ms = _time(lambda: load_from_disk(pt_path, pkl_path), args.repeat)
+        bundle_ms = _time(lambda: load_from_disk(bundle, bundle), args.repeat)
+
+    print(f"legacy (.pt + .pkl) : {legacy_ms:8.3f} ms/load")
+    print(f"bundle (mmap)       : {bundle_ms:8.3f} ms/load")
+    print(f"speedup             : {legacy_ms / bundle_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark: nightly prediction run, per-grade loop vs batched engine.
+
+Seeds an in-memory SQLite DB with 2 years of prices for all grades, writes
+untrained models for each grade, and times `predict_prices` per grade
+against `predict_all_grades`.
+
+Usage:
+    python -m benchmarks.bench_nightly_predictions
+"""
+
+import pickle
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import torch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database import Base
+from app.ml.model import EggPriceLSTM
+from app.ml.predict import predict_all_grades, predict_prices
+from app.ml.preprocessing import PriceScaler, build_features_from_db
+from app.ml.registry import model_paths, model_registry
+from app.models import market_data, prediction, price  # noqa: F401
+from app.models.price import EggPrice
+
+GRADES = ["왕란", "특란", "대란", "중란", "소란"]
+
+
+def _seed(db, days: int = 730):
+    today = date.today()
+    rng = np.random.default_rng(0)
+    for grade in GRADES:
+        walk = 6000 + np.cumsum(rng.normal(0, 20, days))
+        db.add_all([
+            EggPrice(date=today - timedelta(days=days - 1 - i), grade=grade,
+                     retail_price=float(walk[i]), wholesale_price=float(walk[i] * 0.8), unit="30개")
+            for i in range(days)
+        ])
+    db.commit()
+
+
+def _write_models(db, models_dir: Path):
+    for grade in GRADES:
+        scaler = PriceScaler()
+        scaler.fit_transform(build_features_from_db(db, grade))
+        model_path, scaler_path = model_paths(grade, settings.MODEL_VERSION, models_dir)
+        torch.save(EggPriceLSTM().state_dict(), model_path)
+        with open(scaler_path, "wb") as f:
+            pickle.dump(scaler, f)
+
+
+def main():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    _seed(db)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_registry.models_dir = Path(tmp)
+        _write_models(db, Path(tmp))
+
+        # Cold: first run loads every model from disk
+        model_registry.invalidate()
+        start = time.perf_counter()
+        for grade in GRADES:
+            predict_prices(db, grade)
+        per_grade_cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for grade in GRADES:
+            predict_prices(db, grade)
+        per_grade_warm = time.perf_counter() - start
+
+        start = time.perf_counter()
+        predict_all_grades(db, GRADES)
+        batched_warm = time.perf_counter() - start
+
+    print(f"per-grade loop (cold registry): {per_grade_cold * 1000:8.1f} ms")
+    print(f"per-grade loop (warm registry): {per_grade_warm * 1000:8.1f} ms")
+    print(f"batched engine (warm registry): {batched_warm * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark: eager torch vs ONNX Runtime serving of EggPriceLSTM.
+
+Measures, each in a fresh subprocess, the import time and peak RSS of
+loading a model through the registry, plus the warm MC Dropout latency.
+
+Usage:
+    python -m benchmarks.bench_onnx_runtime
+    python -m benchmarks.bench_onnx_runtime --repeat 100
+"""
+
+import argparse
+import json
+import pickle
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+
+from app.ml.export import export_onnx
+from app.ml.model import EggPriceLSTM
+from app.ml.preprocessing import PriceScaler, build_features
+from app.ml.registry import model_paths
+
+_CHILD = """
+import json, sys, time
+import numpy as np
+start = time.perf_counter()
+from app.ml.predict import _forecast
+from app.ml.registry import ModelRegistry
+model, scaler = ModelRegistry(models_dir=__import__("pathlib").Path(sys.argv[1])).get(
+    "대란", "bench", runtime=sys.argv[2]
+)
+import_ms = (time.perf_counter() - start) * 1000
+x = np.random.default_rng(0).random((30, 15), dtype=np.float32)
+_forecast(model, x, scaler)  # warm-up
+repeat = int(sys.argv[3])
+start = time.perf_counter()
+for _ in range(repeat):
+    _forecast(model, x, scaler)
+latency_ms = (time.perf_counter() - start) / repeat * 1000
+print(json.dumps({
+    "import_ms": import_ms,
+    "latency_ms": latency_ms,
+    # VmHWM (not ru_maxrss) — the latter is inherited from the forking parent
+    "rss_mb": next(
+        int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmHWM")
+    ) / 1024,
+    "torch_loaded": "torch" in sys.modules,
+}))
+"""
+
+
+def _write_artifacts(models_dir: Path):
+    n = 365
+    df = build_features(pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="D"),
+        "retail_price": 6000 + np.cumsum(np.random.normal(0, 20, n)),
+    }))
+    scaler = PriceScaler()
+    scaler.fit_transform(df)
+
+    state_dict = EggPriceLSTM().state_dict()
+    pt_path, scaler_path = model_paths("대란", "bench", models_dir)
+    onnx_path, _ = model_paths("대란", "bench", models_dir, runtime="onnx")
+    torch.save(state_dict, pt_path)
+    onnx_path.write_bytes(export_onnx(state_dict))
+    with open(scaler_path, "wb") as f:
+        pickle.dump(scaler, f)
+
+
+def _run(models_dir: Path, runtime: str, repeat: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, str(models_dir), runtime, str(repeat)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eager vs ONNX Runtime serving benchmark")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        models_dir = Path(tmp)
+        _write_artifacts(models_dir)
+        results = {rt: _run(models_dir, rt, args.repeat) for rt in ("torch", "onnx")}
+
+    print(f"{'runtime':8} {'import+load ms':>15} {'peak RSS MB':>12} {'MC ms/grade':>12} {'torch loaded':>13}")
+    for rt, r in results.items():
+        print(
+            f"{rt:8} {r['import_ms']:15.1f} {r['rss_mb']:12.1f} "
+            f"{r['latency_ms']:12.2f} {r['torch_loaded']!s:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark: NumPy MinMaxScaler vs scikit-learn, startup and per-call cost.
+
+Import time is measured in fresh subprocesses; the "sklearn" row is what
+app.ml.preprocessing used to pay at import before the NumPy scaler.
+
+Usage:
+    python -m benchmarks.bench_scaler
+    python -m benchmarks.bench_scaler --repeat 2000
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler as SkMinMaxScaler
+
+from app.ml.preprocessing import MinMaxScaler
+
+_IMPORT = "import time; t = time.perf_counter(); {stmt}; print((time.perf_counter() - t) * 1000)"
+
+
+def _import_ms(stmt: str, runs: int = 5) -> float:
+    times = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _IMPORT.format(stmt=stmt)],
+            capture_output=True, text=True, check=True,
+        )
+        times.append(float(out.stdout.strip()))
+    return min(times)
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaler benchmark")
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    base_ms = _import_ms("import numpy, pandas")
+    ours_ms = _import_ms("import app.ml.preprocessing")
+    sk_ms = _import_ms("import app.ml.preprocessing, sklearn.preprocessing")
+
+    x = np.random.default_rng(0).random((30, 15))
+    ours, theirs = MinMaxScaler().fit(x), SkMinMaxScaler().fit(x)
+    ours_us = _time(lambda: ours.transform(x), args.repeat)
+    sk_us = _time(lambda: theirs.transform(x), args.repeat)
+
+    print(f"import numpy+pandas           : {base_ms:8.1f} ms")
+    print(f"import app.ml.preprocessing   : {ours_ms:8.1f} ms")
+    print(f"  + sklearn.preprocessing     : {sk_ms:8.1f} ms")
+    print(f"transform (30x15), numpy      : {ours_us:8.1f} µs")
+    print(f"transform (30x15), sklearn    : {sk_us:8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark: CPU epoch time, DataLoader vs in-memory tensor batches.
+
+Times one training epoch over 5 years of synthetic sequences with the
+previous TensorDataset + DataLoader path, the fast-path iterate_batches
+at the same batch size, and the fast path at larger batch sizes.
+
+Usage:
+    python -m benchmarks.bench_training_epoch
+"""
+
+import time
+
+import numpy as np
+import torch
+from torch import nn
+from torch.utils.data import DataLoader, TensorDataset
+
+from app.ml.model import EggPriceLSTM
+from app.ml.preprocessing import SEQUENCE_LENGTH, create_sequences
+from app.ml.train import BATCH_SIZE, LEARNING_RATE, iterate_batches
+
+
+def _epoch(model, optimizer, batches) -> float:
+    criterion = nn.MSELoss()
+    model.train()
+    start = time.perf_counter()
+    for X_batch, y_batch in batches:
+        optimizer.zero_grad()
+        loss = criterion(model(X_batch), y_batch)
+        loss.backward()
+        optimizer.step()
+    return (time.perf_counter() - start) * 1000
+
+
+def _time_epochs(make_batches, batch_size: int, epochs: int = 3) -> float:
+    torch.manual_seed(0)
+    model = EggPriceLSTM()
+    optimizer = torch.optim.Adam(model.parameters(), lr=LEARNING_RATE * batch_size / BATCH_SIZE)
+    _epoch(model, optimizer, make_batches())  # warm-up
+    return min(_epoch(model, optimizer, make_batches()) for _ in range(epochs))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    features = rng.random((365 * 5, 15), dtype=np.float32)
+    targets = rng.random((365 * 5, 3), dtype=np.float32)
+    X_np, y_np = create_sequences(features, targets, SEQUENCE_LENGTH)
+    X = torch.from_numpy(np.ascontiguousarray(X_np))
+    y = torch.from_numpy(np.ascontiguousarray(y_np))
+    dataset = TensorDataset(X, y)
+
+    print(f"sequences: {len(X)}, torch threads: {torch.get_num_threads()}")
+    loader_ms = _time_epochs(lambda: DataLoader(dataset, batch_size=BATCH_SIZE, shuffle=True), BATCH_SIZE)
+    print(f"DataLoader       bs={BATCH_SIZE:<4} {loader_ms:8.1f} ms/epoch")
+    for bs in [BATCH_SIZE, 128, 256]:
+        fast_ms = _time_epochs(lambda bs=bs: iterate_batches(X, y, bs, shuffle=True), bs)
+        print(f"iterate_batches  bs={bs:<4} {fast_ms:8.1f} ms/epoch  ({loader_ms / fast_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
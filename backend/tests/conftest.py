@@ -1,13 +1,15 @@
 """Shared test fixtures for the EggPrice AI backend."""
 
 import os
+import tempfile
 from datetime import date, datetime, timedelta
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 # Force test settings before importing app modules
 os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
@@ -19,7 +21,13 @@ os.environ.setdefault("RATE_LIMIT_AUTH", "9999/minute")
 os.environ.setdefault("RATE_LIMIT_API", "9999/minute")
 os.environ.setdefault("ALLOWED_HOSTS", "*")
 
-from app.core.database import Base, get_db
+from app.core.database import (
+    Base,
+    get_async_db,
+    get_async_sessionmaker,
+    get_db,
+    get_sessionmaker,
+)
 from app.core.security import create_access_token, hash_password
 from app.main import app
 from app.models.alert import Alert
@@ -35,15 +43,28 @@ from app.models.prediction import Prediction
 from app.models.price import EggPrice
 from app.models.user import User
 
-# ── In-memory SQLite engine for tests ───────────────────
+# ── SQLite engines for tests ────────────────────────────
+# The sync and async (aiosqlite) engines must see the same data, so the DB
+# is a temp file rather than :memory:. WAL keeps a reader on one engine from
+# blocking a writer on the other.
+
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="eggprice-test-"), "test.db")
 
 TEST_ENGINE = create_engine(
-    "sqlite:///:memory:",
+    f"sqlite:///{TEST_DB_PATH}",
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
 TestSession = sessionmaker(bind=TEST_ENGINE, autoflush=False, autocommit=False)
 
+with TEST_ENGINE.connect() as _conn:
+    _conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+# NullPool: each TestClient runs its own event loop, and aiosqlite
+# connections must not outlive the loop that opened them.
+TEST_ASYNC_ENGINE = create_async_engine(f"sqlite+aiosqlite:///{TEST_DB_PATH}", poolclass=NullPool)
+TestAsyncSession = async_sessionmaker(TEST_ASYNC_ENGINE, autoflush=False, expire_on_commit=False)
+
 
 def _override_get_db():
     db = TestSession()
@@ -53,6 +74,11 @@ def _override_get_db():
         db.close()
 
 
+async def _override_get_async_db():
+    async with TestAsyncSession() as db:
+        yield db
+
+
 @pytest.fixture(autouse=True)
 def setup_database():
     """Create all tables before each test, drop after. Clear caches."""
@@ -78,6 +104,9 @@ def db():
 def client():
     """FastAPI test client with overridden DB dependency."""
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_async_db] = _override_get_async_db
+    app.dependency_overrides[get_async_sessionmaker] = lambda: TestAsyncSession
+    app.dependency_overrides[get_sessionmaker] = lambda: TestSession
     with TestClient(app) as c:
         # Clear L1 cache populated by warm_cache during lifespan
         from app.core.cache import _l1
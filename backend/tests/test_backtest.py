@@ -0,0 +1,287 @@
+"""Tests for the walk-forward backtest engine, its service and the evaluation cache."""
+
+import json
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from app.core.config import settings
+from app.ml import train
+from app.ml.backtest import walk_forward_backtest
+from app.ml.bundle import ModelBundle, write_bundle
+from app.ml.model import QUANTILES, EggPriceLSTM
+from app.ml.preprocessing import (
+    HORIZONS,
+    SEQUENCE_LENGTH,
+    PriceScaler,
+    build_features,
+    build_features_from_db,
+)
+from app.ml.registry import bundle_path, model_registry
+from app.models.market_data import (
+    BacktestResult,
+    EvaluationCache,
+    FeedPrice,
+    ModelPerformance,
+)
+from app.models.price import EggPrice
+from app.services import model_evaluation
+from app.services.model_evaluation import (
+    artifact_hash,
+    backtest_all_grades,
+    backtest_model,
+    compare_models,
+    data_watermark,
+    evaluate_model_on_recent_data,
+    store_backtest_results,
+)
+from tests.conftest import TestSession
+
+METRIC_KEYS = {"mae", "rmse", "mape", "directional_accuracy", "coverage"}
+
+
+@pytest.fixture
+def series():
+    n = 200
+    df = build_features(pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="D"),
+        "retail_price": 6000 + np.cumsum(np.random.default_rng(0).normal(0, 20, n)),
+    }))
+    scaler = PriceScaler()
+    scaler.fit_transform(df)
+    return df, scaler
+
+
+class TestWalkForwardBacktest:
+    def test_shape_of_result(self, series):
+        df, scaler = series
+        result = walk_forward_backtest(EggPriceLSTM(), scaler, df, mc_passes=5)
+
+        # Targets are price[origin + 1 + h], as in training
+        expected = len(df) - SEQUENCE_LENGTH - max(HORIZONS)
+        assert result["origins"] == expected
+        assert set(result["horizons"]) == set(HORIZONS)
+        assert all(set(m) == METRIC_KEYS for m in result["horizons"].values())
+        assert set(result["overall"]) == METRIC_KEYS
+        assert result["last_origin"] == df["date"].iloc[-2 - max(HORIZONS)].date()
+
+    def test_max_origins_limits_to_latest(self, series):
+        df, scaler = series
+        result = walk_forward_backtest(EggPriceLSTM(), scaler, df, max_origins=10, mc_passes=2)
+        assert result["origins"] == 10
+        assert result["last_origin"] == df["date"].iloc[-2 - max(HORIZONS)].date()
+
+    def test_after_skips_in_sample_origins(self, series):
+        df, scaler = series
+        cutoff = df["date"].iloc[120].date()
+        result = walk_forward_backtest(EggPriceLSTM(), scaler, df, mc_passes=2, after=cutoff)
+        assert result["first_origin"] == cutoff + timedelta(days=1)
+        assert result["origins"] == len(df) - 2 - max(HORIZONS) - 120
+
+        last = df["date"].iloc[-1].date()
+        assert walk_forward_backtest(EggPriceLSTM(), scaler, df, mc_passes=2, after=last) is None
+
+    def test_perfect_forecast_scores_zero_error(self, series):
+        df, scaler = series
+        price = df["price"].to_numpy()
+        features = scaler.transform_features(df).astype(np.float32)
+
+        class Perfect(EggPriceLSTM):
+            def forward(self, x, stochastic=None):
+                # Identify each window's origin by its last feature row
+                out = []
+                for window in x:
+                    row = int(np.flatnonzero((features == window[-1].numpy()).all(axis=1))[0])
+                    true = np.array([[price[row + 1 + h] for h in HORIZONS]])
+                    out.append(torch.from_numpy(scaler.target_scaler.transform(true)[0]).float())
+                return torch.stack(out)
+
+        result = walk_forward_backtest(Perfect(dropout=0.0), scaler, df, max_origins=20, mc_passes=2)
+        for metrics in result["horizons"].values():
+            assert metrics["mae"] == pytest.approx(0.0, abs=0.05)
+            assert metrics["directional_accuracy"] == 100.0
+
+    def test_quantile_head(self, series):
+        df, scaler = series
+        result = walk_forward_backtest(EggPriceLSTM(quantiles=QUANTILES), scaler, df, max_origins=15)
+        assert result["origins"] == 15
+        assert 0.0 <= result["overall"]["coverage"] <= 100.0
+
+    def test_too_little_data_returns_none(self, series):
+        df, scaler = series
+        assert walk_forward_backtest(EggPriceLSTM(), scaler, df.head(40)) is None
+
+
+@pytest.fixture
+def long_history(db):
+    rng = np.random.default_rng(0)
+    walk = 6000 + np.cumsum(rng.normal(0, 20, 150))
+    dates = pd.date_range(end=date.today(), periods=150, freq="D")
+    db.add_all([
+        EggPrice(date=d.date(), grade="대란", retail_price=float(p), wholesale_price=float(p) * 0.8, unit="30개")
+        for d, p in zip(dates, walk)
+    ])
+    db.commit()
+
+
+@pytest.fixture
+def bundled_model(db, long_history, tmp_path):
+    scaler = PriceScaler()
+    scaler.fit_transform(build_features_from_db(db, "대란"))
+    for version, data_end in (("v-prod", 100), ("v-cand", 80)):
+        with open(bundle_path("대란", version, tmp_path), "wb") as f:
+            write_bundle(f, EggPriceLSTM().state_dict(), scaler, "대란", version)
+        report = {"train_date": date.today().isoformat(),
+                  "data_end": (date.today() - timedelta(days=data_end)).isoformat()}
+        (tmp_path / f"training_report_대란_{version}.json").write_text(json.dumps(report))
+
+    with patch.object(model_registry, "models_dir", tmp_path), \
+         patch.object(model_evaluation, "MODELS_DIR", tmp_path):
+        model_registry.invalidate()
+        yield
+    model_registry.invalidate()
+
+
+class TestBacktestService:
+    def test_backtest_model_missing_returns_none(self, db, long_history):
+        assert backtest_model(db, "대란", "v-missing") is None
+
+    def test_store_bulk_rows(self, db, bundled_model):
+        result = backtest_model(db, "대란", "v-cand", max_origins=30)
+
+        written = store_backtest_results(db, "v-cand", {"대란": result})
+
+        assert written == len(HORIZONS)
+        rows = db.query(BacktestResult).order_by(BacktestResult.horizon_days).all()
+        assert [r.horizon_days for r in rows] == HORIZONS
+        assert all(r.origins == 30 and r.model_version == "v-cand" for r in rows)
+
+    def test_all_grades_on_pool(self, db, bundled_model):
+        def thread_pool(max_workers, mp_context=None, initializer=None, initargs=()):
+            return ThreadPoolExecutor(max_workers=max_workers)
+
+        with patch.object(model_evaluation, "SessionLocal", TestSession), \
+             patch.object(model_evaluation, "ProcessPoolExecutor", side_effect=thread_pool):
+            results = backtest_all_grades("v-cand", workers=3, max_origins=10)
+
+        assert set(results) == {"대란"}
+        assert results["대란"]["origins"] == 10
+
+    def test_compare_models_uses_backtest_for_both(self, db, bundled_model):
+        model_evaluation.store_performance(
+            db, "v-prod", "대란",
+            {"mae": 1.0, "rmse": 1.0, "mape": 0.1, "directional_accuracy": 99.0},
+            is_production=True,
+        )
+
+        result = compare_models(db, "대란", "v-cand")
+
+        # Only origins after the later cutoff (v-cand, 80 days ago) with realised targets
+        backtest = result["candidate_backtest"]
+        assert backtest["first_origin"] == date.today() - timedelta(days=79)
+        assert backtest["origins"] == 80 - 1 - max(HORIZONS)
+        # Identical weights on identical origins → production metrics are not the stored ones
+        assert result["production_metrics"]["mae"] != 1.0
+        assert db.query(BacktestResult).filter(BacktestResult.model_version == "v-cand").count() == 3
+
+    def test_compare_models_stores_recent_metrics_not_backtest(self, db, bundled_model):
+        recent = {"mae": 42.0, "rmse": 43.0, "mape": 0.7, "directional_accuracy": 60.0}
+        with patch.object(model_evaluation, "evaluate_model_on_recent_data", return_value=recent):
+            result = compare_models(db, "대란", "v-cand")
+
+        assert result["candidate_metrics"]["mae"] == result["candidate_backtest"]["overall"]["mae"]
+        row = db.query(ModelPerformance).filter(ModelPerformance.model_version == "v-cand").one()
+        assert row.mae == 42.0
+
+    def test_compare_models_without_cutoff_skips_backtest(self, db, bundled_model, tmp_path):
+        (tmp_path / "training_report_대란_v-cand.json").unlink()
+        recent = {"mae": 42.0, "rmse": 43.0, "mape": 0.7, "directional_accuracy": 60.0}
+        with patch.object(model_evaluation, "evaluate_model_on_recent_data", return_value=recent), \
+             patch.object(model_evaluation, "walk_forward_backtest") as mock_bt:
+            result = compare_models(db, "대란", "v-cand")
+            mock_bt.assert_not_called()
+        assert result["candidate_backtest"] is None
+        assert result["candidate_metrics"] == recent
+
+class TestRetrainAndEvaluate:
+    def test_candidate_is_backtested_on_held_out_days(self, db, bundled_model, tmp_path):
+        model_evaluation.store_performance(
+            db, "v-prod", "대란",
+            {"mae": 1.0, "rmse": 1.0, "mape": 0.1, "directional_accuracy": 99.0},
+            is_production=True,
+        )
+        with patch.object(train, "SessionLocal", TestSession), \
+             patch.object(train, "MODELS_DIR", tmp_path), \
+             patch.object(train, "EPOCHS", 2), \
+             patch.object(settings, "BACKTEST_HOLDOUT_DAYS", 60), \
+             patch.object(model_evaluation, "train_model", wraps=train.train_model) as train_model:
+            model_evaluation._retrain_and_evaluate(db, "대란")
+
+        assert train_model.call_args_list[0].kwargs == {"holdout_days": 60}
+        version = train_model.call_args_list[0].args[1]
+        rows = db.query(BacktestResult).filter(BacktestResult.model_version == version).all()
+        # Held-out origins with a realised 30-day target: 60 - 1 - 30
+        assert [r.origins for r in rows] == [60 - 1 - max(HORIZONS)] * len(HORIZONS)
+        assert all(r.first_origin == date.today() - timedelta(days=59) for r in rows)
+
+
+class TestEvaluationCache:
+    def test_repeat_backtest_is_a_lookup(self, db, bundled_model):
+        first = backtest_model(db, "대란", "v-cand", max_origins=20)
+        with patch.object(model_evaluation, "walk_forward_backtest") as mock_bt:
+            second = backtest_model(db, "대란", "v-cand", max_origins=20)
+            mock_bt.assert_not_called()
+
+        assert second == first
+        assert db.query(EvaluationCache).count() == 1
+
+    def test_recent_evaluation_is_cached(self, db, bundled_model):
+        first = evaluate_model_on_recent_data(db, "대란", "v-cand", eval_days=60)
+        assert first is not None
+        with patch.object(model_evaluation, "load_model") as mock_load:
+            assert evaluate_model_on_recent_data(db, "대란", "v-cand", eval_days=60) == first
+            mock_load.assert_not_called()
+
+    def test_recent_evaluation_copies_read_only_windows(self, db, bundled_model):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", UserWarning)  # "NumPy array is not writable"
+            assert evaluate_model_on_recent_data(db, "대란", "v-cand", eval_days=60) is not None
+
+    def test_new_data_invalidates(self, db, bundled_model):
+        backtest_model(db, "대란", "v-cand", max_origins=20)
+        db.add(EggPrice(date=date.today() + timedelta(days=1), grade="대란",
+                        retail_price=6100, wholesale_price=5000, unit="30개"))
+        db.commit()
+
+        with patch.object(model_evaluation, "walk_forward_backtest", return_value=None) as mock_bt:
+            backtest_model(db, "대란", "v-cand", max_origins=20)
+            mock_bt.assert_called_once()
+
+    def test_new_market_data_moves_watermark(self, db, long_history):
+        before = data_watermark(db, "대란")
+        db.add(FeedPrice(date=before + timedelta(days=3), feed_type="옥수수", price=350.0, unit="kg"))
+        db.commit()
+        assert data_watermark(db, "대란") == before + timedelta(days=3)
+
+    def test_retrained_model_invalidates(self, db, bundled_model, tmp_path):
+        before = artifact_hash("대란", "v-cand")
+        backtest_model(db, "대란", "v-cand", max_origins=20)
+
+        scaler = ModelBundle(bundle_path("대란", "v-cand", tmp_path)).scaler()
+        with open(bundle_path("대란", "v-cand", tmp_path), "wb") as f:
+            write_bundle(f, EggPriceLSTM().state_dict(), scaler, "대란", "v-cand")
+
+        assert artifact_hash("대란", "v-cand") != before
+        with patch.object(model_evaluation, "walk_forward_backtest", return_value=None) as mock_bt:
+            backtest_model(db, "대란", "v-cand", max_origins=20)
+            mock_bt.assert_called_once()
+
+    def test_missing_model_not_cached(self, db, long_history):
+        assert backtest_model(db, "대란", "v-missing") is None
+        assert db.query(EvaluationCache).count() == 0
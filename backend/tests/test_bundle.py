@@ -0,0 +1,104 @@
+"""Tests for the pickle-free model bundle format."""
+
+import json
+import struct
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from app.ml.bundle import ModelBundle, write_bundle
+from app.ml.model import EggPriceLSTM
+from app.ml.preprocessing import FEATURE_COLUMNS, HORIZONS, PriceScaler, build_features
+from app.ml.registry import ModelRegistry, bundle_path
+
+
+def _fitted_scaler() -> PriceScaler:
+    n = 120
+    df = build_features(pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="D"),
+        "retail_price": 6000 + np.cumsum(np.random.default_rng(0).normal(0, 20, n)),
+    }))
+    scaler = PriceScaler()
+    scaler.fit_transform(df)
+    return scaler, df
+
+
+@pytest.fixture
+def bundle_file(tmp_path):
+    torch.manual_seed(0)
+    model = EggPriceLSTM()
+    scaler, df = _fitted_scaler()
+    path = bundle_path("대란", "v-test", tmp_path)
+    with open(path, "wb") as f:
+        write_bundle(f, model.state_dict(), scaler, "대란", "v-test")
+    return path, model, scaler, df
+
+
+class TestModelBundle:
+    def test_manifest(self, bundle_file):
+        path, *_ = bundle_file
+        manifest = ModelBundle(path).manifest
+
+        assert manifest["grade"] == "대란"
+        assert manifest["model_version"] == "v-test"
+        assert manifest["features"] == FEATURE_COLUMNS
+        assert manifest["horizons"] == HORIZONS
+
+    def test_header_is_plain_json(self, bundle_file):
+        path, *_ = bundle_file
+        raw = path.read_bytes()
+        (n,) = struct.unpack("<Q", raw[:8])
+        header = json.loads(raw[8:8 + n])
+        assert header["fc1.weight"]["dtype"] == "F32"
+        assert n % 8 == 0
+
+    def test_weights_round_trip(self, bundle_file):
+        path, model, *_ = bundle_file
+        restored = ModelBundle(path).state_dict()
+
+        assert restored.keys() == model.state_dict().keys()
+        for name, t in model.state_dict().items():
+            torch.testing.assert_close(restored[name], t)
+
+    def test_weights_are_memory_mapped(self, bundle_file):
+        path, *_ = bundle_file
+        arr = ModelBundle(path).arrays["fc1.weight"]
+        base = arr
+        while base.base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert isinstance(base, np.memmap)
+
+    def test_scaler_round_trip(self, bundle_file):
+        path, _, scaler, df = bundle_file
+        restored = ModelBundle(path).scaler()
+
+        np.testing.assert_allclose(restored.transform_features(df), scaler.transform_features(df))
+        preds = np.array([[0.1, 0.5, 0.9]])
+        np.testing.assert_allclose(
+            restored.inverse_transform_targets(preds), scaler.inverse_transform_targets(preds)
+        )
+
+    def test_incompatible_features_rejected(self, bundle_file):
+        path, *_ = bundle_file
+        bundle = ModelBundle(path)
+        bundle.manifest["features"] = FEATURE_COLUMNS[:-1]
+        with pytest.raises(ValueError):
+            bundle.check_compatible()
+
+
+class TestRegistryBundle:
+    def test_loads_without_unpickling(self, bundle_file):
+        path, model, *_ = bundle_file
+        registry = ModelRegistry(models_dir=path.parent)
+
+        with patch("app.ml.registry.pickle.load") as mock_pickle:
+            loaded, scaler = registry.get("대란", "v-test", runtime="torch")
+            mock_pickle.assert_not_called()
+
+        x = torch.randn(2, 30, 15)
+        with torch.no_grad():
+            torch.testing.assert_close(loaded.eval()(x), model.eval()(x))
+        assert scaler.target_scaler.n_features_in_ == 3
@@ -0,0 +1,448 @@
+"""Tests for the two-tier cache (app.core.cache)."""
+
+import asyncio
+import json
+import queue
+import time
+from unittest.mock import patch
+
+import redis
+
+from app.core import cache
+from app.core.cache import (
+    _apply_invalidation,
+    _invalidation_message,
+    _InvalidationListener,
+    _l1,
+    _new_entry,
+    cache_fetch_async,
+    cache_get_async,
+    cache_invalidate_async,
+    cache_set_async,
+    cached,
+    get_async_redis,
+    start_invalidation_listener,
+)
+from app.core.circuit_breaker import OPEN, CircuitBreaker
+
+
+class FakeAsyncRedis:
+    """In-memory stand-in for the redis.asyncio commands the cache uses."""
+
+    def __init__(self):
+        self.data: dict[str, str] = {}
+        self.sets: dict[str, set[str]] = {}
+        self.ttls: dict[str, int] = {}
+        self.published: list[tuple[str, str]] = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        # The lock release script: delete only if the token still matches
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    async def expire(self, key, ttl):
+        self.ttls[key] = ttl
+
+    async def sinter(self, keys):
+        return set.intersection(*(self.sets.get(k, set()) for k in keys))
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+            self.sets.pop(key, None)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and runs them in order on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue_command(*args):
+            self.commands.append((name, args))
+            return self
+        return queue_command
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args) for name, args in self.commands]
+
+
+def _l1_value(key):
+    entry = _l1.get(key)
+    return None if entry is None else entry["value"]
+
+
+def _with_redis(fake):
+    async def get():
+        return fake
+
+    return patch.object(cache, "get_async_redis", side_effect=get)
+
+
+class TestAsyncCache:
+    def test_set_writes_both_tiers(self):
+        fake = FakeAsyncRedis()
+        with _with_redis(fake):
+            asyncio.run(cache_set_async("prices:current", [{"grade": "대란"}], ttl=180, tags=["prices"]))
+
+        assert _l1_value("prices:current") == [{"grade": "대란"}]
+        assert json.loads(fake.data["prices:current"])["value"] == [{"grade": "대란"}]
+        assert fake.ttls["prices:current"] == 180 + cache.settings.CACHE_STALE_SECONDS
+        assert fake.sets["tag:prices"] == {"prices:current"}
+
+    def test_l2_hit_is_promoted_to_l1(self):
+        fake = FakeAsyncRedis()
+        fake.data["forecast:대란"] = json.dumps(_new_entry({"trend": "상승"}, 300))
+        with _with_redis(fake):
+            assert asyncio.run(cache_get_async("forecast:대란")) == {"trend": "상승"}
+        assert _l1_value("forecast:대란") == {"trend": "상승"}
+
+    def _fill(self, fake):
+        entries = {
+            "forecast:대란": ("prices", "predictions", "grade:대란"),
+            "forecast:특란": ("prices", "predictions", "grade:특란"),
+            "prices:history:대란:90:f": ("prices", "grade:대란"),
+        }
+        with _with_redis(fake):
+            for key, tags in entries.items():
+                asyncio.run(cache_set_async(key, key, tags=tags))
+
+    def test_invalidate_drops_only_tagged_keys(self):
+        fake = FakeAsyncRedis()
+        self._fill(fake)
+        with _with_redis(fake):
+            asyncio.run(cache_invalidate_async(("predictions", "grade:대란")))
+
+        assert set(fake.data) == {"forecast:특란", "prices:history:대란:90:f"}
+        assert _l1.get("forecast:대란") is None
+        assert _l1_value("forecast:특란") == "forecast:특란"
+        assert _l1_value("prices:history:대란:90:f") == "prices:history:대란:90:f"
+
+    def test_invalidate_groups_are_unioned(self):
+        fake = FakeAsyncRedis()
+        self._fill(fake)
+        with _with_redis(fake):
+            asyncio.run(cache_invalidate_async("grade:특란", ("prices", "grade:대란")))
+        assert fake.data == {}
+
+    def test_invalidate_drops_l1_entries_promoted_from_l2(self):
+        fake = FakeAsyncRedis()
+        self._fill(fake)
+        _l1.clear()
+        with _with_redis(fake):
+            asyncio.run(cache_get_async("forecast:대란"))  # promoted without tags
+            asyncio.run(cache_invalidate_async("predictions"))
+        assert _l1.get("forecast:대란") is None
+
+    def test_invalidate_without_redis_still_clears_l1(self):
+        _l1.set("forecast:대란", 1, ("predictions",))
+        _l1.set("prices:current", 2, ("prices",))
+        with patch.object(cache, "get_async_redis", return_value=None):
+            asyncio.run(cache_invalidate_async("predictions"))
+        assert _l1.get("forecast:대란") is None
+        assert _l1.get("prices:current") == 2
+
+    def test_invalidation_is_broadcast_to_other_workers(self):
+        fake = FakeAsyncRedis()
+        self._fill(fake)
+        with _with_redis(fake):
+            asyncio.run(cache_invalidate_async(("predictions", "grade:대란")))
+
+        [(channel, message)] = fake.published
+        assert channel == cache.settings.CACHE_INVALIDATION_CHANNEL
+        assert json.loads(message)["groups"] == [["predictions", "grade:대란"]]
+        assert json.loads(message)["keys"] == ["forecast:대란"]
+
+    def test_without_redis_l1_still_works(self):
+        with patch.object(cache, "get_async_redis", return_value=None):
+            asyncio.run(cache_set_async("k", 1))
+            assert asyncio.run(cache_get_async("k")) == 1
+
+    def test_unreachable_redis_opens_circuit(self):
+        breaker = CircuitBreaker("test_redis", failure_threshold=1, backoff=60)
+        with patch.object(cache.settings, "REDIS_URL", "redis://127.0.0.1:1/0"), \
+             patch.object(cache, "_redis_breaker", breaker):
+            assert asyncio.run(get_async_redis()) is None
+            assert breaker.state == OPEN
+            assert cache.get_redis() is None  # skipped without a connection attempt
+
+    def test_empty_url_disables_l2(self):
+        breaker = CircuitBreaker("test_redis", failure_threshold=1, backoff=60)
+        with patch.object(cache.settings, "REDIS_URL", ""), \
+             patch.object(cache, "_redis_breaker", breaker):
+            assert cache.get_redis() is None
+            assert asyncio.run(get_async_redis()) is None
+            asyncio.run(cache_set_async("k", 1))
+            assert asyncio.run(cache_get_async("k")) == 1
+        assert breaker.state != OPEN  # not an outage, so nothing to probe
+
+    def test_malformed_url_opens_circuit(self):
+        breaker = CircuitBreaker("test_redis", failure_threshold=1, backoff=60)
+        with patch.object(cache.settings, "REDIS_URL", "localhost:6379"), \
+             patch.object(cache, "_redis_pool", None), \
+             patch.object(cache, "_redis_client", None), \
+             patch.object(cache, "_redis_breaker", breaker):
+            assert asyncio.run(get_async_redis()) is None
+            assert breaker.state == OPEN
+
+    def test_failed_call_counts_against_circuit(self):
+        class Broken(FakeAsyncRedis):
+            async def get(self, key):
+                raise redis.ConnectionError("gone")
+
+        breaker = CircuitBreaker("test_redis", failure_threshold=1, backoff=60)
+        with _with_redis(Broken()), patch.object(cache, "_redis_breaker", breaker):
+            assert asyncio.run(cache_get_async("k")) is None
+        assert breaker.state == OPEN
+
+    def test_cached_decorator(self):
+        calls = []
+
+        @cached("answer", tags=("grade:{x}",))
+        async def compute(x):
+            calls.append(x)
+            return {"x": x}
+
+        fake = FakeAsyncRedis()
+        with _with_redis(fake):
+            assert asyncio.run(compute(x=1)) == {"x": 1}
+            assert asyncio.run(compute(x=1)) == {"x": 1}
+        assert calls == [1]
+        assert fake.sets["tag:grade:1"] == {"answer:1"}
+
+
+class TestStampedeProtection:
+    def _loader(self, value="fresh", delay=0.05):
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(delay)
+            return value
+
+        return load, calls
+
+    def test_concurrent_misses_share_one_load(self):
+        load, calls = self._loader()
+
+        async def run():
+            return await asyncio.gather(*(cache_fetch_async("prices:current", load) for _ in range(10)))
+
+        with _with_redis(FakeAsyncRedis()):
+            assert asyncio.run(run()) == ["fresh"] * 10
+            assert asyncio.run(cache_fetch_async("prices:current", load)) == "fresh"  # now cached
+        assert len(calls) == 1
+
+    def test_stale_value_is_served_while_refreshing(self):
+        load, calls = self._loader()
+        fake = FakeAsyncRedis()
+
+        async def run():
+            await cache_set_async("forecast:대란", "stale", ttl=0)
+            served = [await cache_fetch_async("forecast:대란", load, ttl=300) for _ in range(3)]
+            await asyncio.sleep(0.1)  # let the background refresh finish
+            return served, await cache_fetch_async("forecast:대란", load, ttl=300)
+
+        with _with_redis(fake):
+            served, after = asyncio.run(run())
+        assert served == ["stale"] * 3
+        assert after == "fresh"
+        assert len(calls) == 1
+        assert "lock:forecast:대란" not in fake.data  # released
+
+    def test_past_hard_ttl_is_a_miss(self):
+        load, calls = self._loader()
+
+        async def run():
+            await cache_set_async("forecast:대란", "expired", ttl=0)
+            return await cache_fetch_async("forecast:대란", load)
+
+        with _with_redis(FakeAsyncRedis()), patch.object(cache.settings, "CACHE_STALE_SECONDS", 0):
+            assert asyncio.run(run()) == "fresh"
+        assert len(calls) == 1
+
+    def test_waits_for_value_from_lock_holder(self):
+        load, calls = self._loader()
+        fake = FakeAsyncRedis()
+        fake.data["lock:market:snapshot:2025-01-06"] = "other-process"
+
+        async def peer():
+            await asyncio.sleep(0.1)
+            fake.data["market:snapshot:2025-01-06"] = json.dumps(_new_entry("from peer", 300))
+
+        async def run():
+            _, value = await asyncio.gather(peer(), cache_fetch_async("market:snapshot:2025-01-06", load))
+            return value
+
+        with _with_redis(fake):
+            assert asyncio.run(run()) == "from peer"
+        assert calls == []
+
+    def test_loads_anyway_when_lock_holder_never_finishes(self):
+        load, calls = self._loader()
+        fake = FakeAsyncRedis()
+        fake.data["lock:prices:current"] = "other-process"
+        with _with_redis(fake), patch.object(cache.settings, "CACHE_LOCK_SECONDS", 0.1):
+            assert asyncio.run(cache_fetch_async("prices:current", load)) == "fresh"
+        assert len(calls) == 1
+        assert fake.data["lock:prices:current"] == "other-process"  # not ours to release
+
+    def test_loader_errors_reach_every_waiter(self):
+        async def load():
+            await asyncio.sleep(0.01)
+            raise LookupError("no data")
+
+        async def run():
+            return await asyncio.gather(
+                *(cache_fetch_async("forecast:대란", load) for _ in range(3)), return_exceptions=True
+            )
+
+        with _with_redis(FakeAsyncRedis()):
+            results = asyncio.run(run())
+        assert all(isinstance(r, LookupError) for r in results)
+        assert _l1.get("forecast:대란") is None
+
+    def test_none_is_not_cached(self):
+        load, calls = self._loader(value=None)
+        with _with_redis(FakeAsyncRedis()):
+            assert asyncio.run(cache_fetch_async("models:current:대란", load)) is None
+            assert asyncio.run(cache_fetch_async("models:current:대란", load)) is None
+        assert len(calls) == 2
+
+    def test_works_without_redis(self):
+        load, calls = self._loader()
+
+        async def run():
+            return await asyncio.gather(*(cache_fetch_async("prices:current", load) for _ in range(5)))
+
+        with patch.object(cache, "get_async_redis", return_value=None):
+            assert asyncio.run(run()) == ["fresh"] * 5
+        assert len(calls) == 1
+
+
+class FakePubSub:
+    """Sync pub/sub stand-in fed from a queue; raises queued exceptions."""
+
+    def __init__(self, inbox: queue.Queue):
+        self.inbox = inbox
+        self.subscribed: list[str] = []
+
+    def subscribe(self, channel):
+        self.subscribed.append(channel)
+
+    def get_message(self, timeout=0.0):
+        try:
+            item = self.inbox.get(timeout=min(timeout, 0.05))
+        except queue.Empty:
+            return None
+        if isinstance(item, Exception):
+            raise item
+        return {"type": "message", "data": item}
+
+    def close(self):
+        pass
+
+
+class FakePubSubClient:
+    def __init__(self, inbox: queue.Queue):
+        self.pubsubs: list[FakePubSub] = []
+        self.inbox = inbox
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        self.pubsubs.append(FakePubSub(self.inbox))
+        return self.pubsubs[-1]
+
+    def close(self):
+        pass
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+class TestCrossWorkerInvalidation:
+    def _peer_message(self, groups=(("prices",),), keys=()):
+        return json.dumps({"origin": "another-worker", "groups": groups, "keys": keys})
+
+    def test_peer_message_invalidates_l1(self):
+        _l1.set("prices:current", 1, ("prices",))
+        _l1.set("forecast:대란", 2)  # promoted from L2, untagged
+        _l1.set("predictions:대란", 3, ("predictions",))
+        assert _apply_invalidation(self._peer_message(keys=["forecast:대란"])) is True
+        assert _l1.get("prices:current") is None
+        assert _l1.get("forecast:대란") is None
+        assert _l1.get("predictions:대란") == 3
+
+    def test_own_message_is_ignored(self):
+        _l1.set("prices:current", 1, ("prices",))
+        assert _apply_invalidation(_invalidation_message([("prices",)], [])) is False
+        assert _l1.get("prices:current") == 1
+
+    def test_malformed_message_is_ignored(self):
+        _l1.set("prices:current", 1)
+        assert _apply_invalidation("not json") is False
+        assert _l1.get("prices:current") == 1
+
+    def test_listener_applies_messages_and_resubscribes(self):
+        inbox = queue.Queue()
+        client = FakePubSubClient(inbox)
+        listener = _InvalidationListener()
+        with patch.object(cache.redis.Redis, "from_url", return_value=client), \
+             patch.object(cache.settings, "CIRCUIT_BREAKER_BACKOFF_SECONDS", 0.01):
+            listener.start()
+            try:
+                _wait_for(lambda: len(client.pubsubs) == 1)
+                _l1.set("forecast:대란", 1, ("predictions",))
+                inbox.put(self._peer_message([["predictions"]]))
+                _wait_for(lambda: _l1.get("forecast:대란") is None)
+
+                # Dropped connection: reconnect, and clear L1 for anything missed
+                _l1.set("forecast:대란", 2)
+                inbox.put(redis.ConnectionError("gone"))
+                _wait_for(lambda: len(client.pubsubs) == 2)
+                _wait_for(lambda: _l1.get("forecast:대란") is None)
+            finally:
+                listener.stop()
+        assert not listener.is_alive()
+        assert client.pubsubs[0].subscribed == [cache.settings.CACHE_INVALIDATION_CHANNEL]
+
+    def test_not_started_without_redis_url(self):
+        with patch.object(cache.settings, "REDIS_URL", ""), patch.object(cache, "_listener", None):
+            start_invalidation_listener()
+            assert cache._listener is None
+
+    def test_malformed_url_stops_listener(self):
+        listener = _InvalidationListener()
+        with patch.object(cache.settings, "REDIS_URL", "localhost:6379"):
+            listener.start()
+            listener.join(2.0)
+        assert not listener.is_alive()
@@ -0,0 +1,103 @@
+"""Tests for the circuit breaker (app.core.circuit_breaker)."""
+
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY
+
+from app.core import scheduler
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(clock, **kwargs):
+    return CircuitBreaker("test", **{"failure_threshold": 2, "backoff": 1.0, "max_backoff": 8.0, **kwargs}, clock=clock)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = _breaker(FakeClock())
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.record_success()  # resets the count
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow_request()
+
+    def test_half_open_lets_one_probe_through(self):
+        clock = FakeClock()
+        breaker = _breaker(clock, failure_threshold=1)
+        breaker.record_failure()
+
+        clock.now = 1.0
+        assert breaker.allow_request()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow_request()  # probe still in flight
+
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.allow_request()
+
+    def test_failed_probes_back_off_exponentially(self):
+        clock = FakeClock()
+        breaker = _breaker(clock, failure_threshold=1)
+        breaker.record_failure()
+
+        waits = []
+        for _ in range(5):
+            opened = clock.now
+            while not breaker.allow_request():
+                clock.now += 0.5
+            waits.append(clock.now - opened)
+            breaker.record_failure()
+        assert waits == [1.0, 2.0, 4.0, 8.0, 8.0]
+
+        clock.now += 8.0
+        assert breaker.allow_request()
+        breaker.record_success()
+        breaker.record_failure()
+        clock.now += 1.0
+        assert breaker.allow_request()  # backoff reset after recovery
+
+    def test_lost_probe_is_replaced(self):
+        clock = FakeClock()
+        breaker = _breaker(clock, failure_threshold=1)
+        breaker.record_failure()
+        clock.now = 1.0
+        assert breaker.allow_request()
+        clock.now = 1.0 + breaker.max_backoff
+        assert breaker.allow_request()
+
+    def test_transitions_are_exported(self):
+        breaker = CircuitBreaker("metrics_test", failure_threshold=1, backoff=60)
+        breaker.record_failure()
+
+        state = REGISTRY.get_sample_value("eggprice_circuit_breaker_state", {"name": "metrics_test"})
+        opened = REGISTRY.get_sample_value(
+            "eggprice_circuit_breaker_transitions_total",
+            {"name": "metrics_test", "from_state": CLOSED, "to_state": OPEN},
+        )
+        assert state == 2
+        assert opened == 1
+
+
+class TestCeleryAvailability:
+    def test_recovers_after_broker_outage(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("celery_test", failure_threshold=1, backoff=1.0, clock=clock)
+        with patch.object(scheduler, "_celery_breaker", breaker), \
+             patch("redis.Redis.ping", side_effect=[ConnectionError("down"), True]) as ping:
+            assert not scheduler._celery_available()
+            assert not scheduler._celery_available()  # open: no ping
+            clock.now = 1.0
+            assert scheduler._celery_available()
+        assert ping.call_count == 2
+        assert breaker.state == CLOSED
@@ -0,0 +1,53 @@
+"""Tests for the async database stack (app.core.database)."""
+
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.core.database import async_database_url, gather_scalars
+from app.models.price import EggPrice
+from app.services.prediction_service import get_predictions, get_predictions_async
+from app.services.price_service import (
+    get_current_prices,
+    get_current_prices_async,
+    get_price_history,
+    get_price_history_async,
+)
+from tests.conftest import TestAsyncSession
+
+
+async def _with_session(fn, *args):
+    async with TestAsyncSession() as db:
+        return await fn(db, *args)
+
+
+class TestAsyncDatabaseUrl:
+    def test_postgres_uses_asyncpg(self):
+        assert async_database_url("postgresql://u:p@db:5432/egg") == "postgresql+asyncpg://u:p@db:5432/egg"
+        assert async_database_url("postgresql+psycopg2://u@db/egg") == "postgresql+asyncpg://u@db/egg"
+
+    def test_sqlite_uses_aiosqlite(self):
+        assert async_database_url("sqlite:///./egg.db") == "sqlite+aiosqlite:///./egg.db"
+
+
+class TestGatherScalars:
+    def test_results_in_argument_order(self, seed_all_grades):
+        stmts = [
+            select(func.count()).select_from(EggPrice).where(EggPrice.grade == grade)
+            for grade in ["왕란", "대란", "없음"]
+        ]
+        counts = asyncio.run(gather_scalars(TestAsyncSession, *stmts))
+        assert counts == [[30], [30], [0]]
+
+
+class TestAsyncServices:
+    def test_current_prices_match_sync(self, db, seed_all_grades):
+        assert asyncio.run(_with_session(get_current_prices_async)) == get_current_prices(db)
+
+    def test_price_history_matches_sync(self, db, seed_prices):
+        rows = asyncio.run(_with_session(get_price_history_async, "대란", 30))
+        assert [r.date for r in rows] == [r.date for r in get_price_history(db, "대란", 30)]
+
+    def test_predictions_match_sync(self, db, seed_predictions):
+        preds = asyncio.run(_with_session(get_predictions_async, "대란"))
+        assert [p.horizon_days for p in preds] == [p.horizon_days for p in get_predictions(db, "대란")]
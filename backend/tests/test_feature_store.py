@@ -0,0 +1,138 @@
+"""Tests for the incremental feature store."""
+
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import event
+
+from app.ml.feature_store import (
+    get_recent_features,
+    refresh_features,
+    update_feature_store,
+)
+from app.ml.preprocessing import FEATURE_COLUMNS, build_features_from_db
+from app.models.feature import EggPriceFeature
+from app.models.market_data import FeedPrice
+from app.models.price import EggPrice
+from tests.conftest import TestSession
+
+
+def _stored_frame(db, grade: str) -> np.ndarray:
+    rows = (
+        db.query(EggPriceFeature)
+        .filter(EggPriceFeature.grade == grade)
+        .order_by(EggPriceFeature.date)
+        .all()
+    )
+    return np.array([[getattr(r, col) for col in FEATURE_COLUMNS] for r in rows])
+
+
+class TestRefreshFeatures:
+    def test_full_rebuild_matches_build_features(self, db, seed_prices, seed_market_data):
+        written = refresh_features(db, "대란")
+        assert written == 60
+
+        expected = build_features_from_db(db, "대란")[FEATURE_COLUMNS].to_numpy()
+        np.testing.assert_allclose(_stored_frame(db, "대란"), expected)
+
+    def test_missing_grade_writes_nothing(self, db, seed_prices):
+        assert refresh_features(db, "왕란") == 0
+
+    def test_incremental_update_matches_full_rebuild(self, db, seed_prices):
+        refresh_features(db, "대란")
+
+        tomorrow = date.today() + timedelta(days=1)
+        db.add(EggPrice(date=tomorrow, grade="대란", retail_price=7000, wholesale_price=5800, unit="30개"))
+        db.add(FeedPrice(date=tomorrow, feed_type="옥수수", price=355.0, unit="kg"))
+        db.commit()
+
+        written = update_feature_store(db, ["대란"], since=tomorrow)
+        assert written == {"대란": 1}
+
+        expected = build_features_from_db(db, "대란")[FEATURE_COLUMNS].to_numpy()
+        np.testing.assert_allclose(_stored_frame(db, "대란"), expected)
+
+    def test_update_fills_days_missed_by_earlier_runs(self, db, seed_prices):
+        refresh_features(db, "대란")
+        today = date.today()
+        db.add_all([
+            EggPrice(date=today + timedelta(days=d), grade="대란", retail_price=7000 + d,
+                     wholesale_price=5800, unit="30개")
+            for d in range(1, 7)
+        ])
+        db.commit()
+
+        # Only the last day is reported as new; the five before it were never stored
+        written = update_feature_store(db, ["대란"], since=today + timedelta(days=6))
+        assert written == {"대란": 6}
+
+        expected = build_features_from_db(db, "대란")[FEATURE_COLUMNS].to_numpy()
+        np.testing.assert_allclose(_stored_frame(db, "대란"), expected)
+
+    def test_update_recomputes_corrected_past_prices(self, db, seed_prices):
+        refresh_features(db, "대란")
+        day = date.today() - timedelta(days=10)
+        db.query(EggPrice).filter(EggPrice.grade == "대란", EggPrice.date == day).update(
+            {EggPrice.retail_price: 9000}
+        )
+        db.commit()
+
+        assert update_feature_store(db, ["대란"], since=day) == {"대란": 11}
+        expected = build_features_from_db(db, "대란")[FEATURE_COLUMNS].to_numpy()
+        np.testing.assert_allclose(_stored_frame(db, "대란"), expected)
+
+    def test_concurrent_refresh_upserts(self, db, seed_prices):
+        refresh_features(db, "대란")
+        tomorrow = date.today() + timedelta(days=1)
+        db.add(EggPrice(date=tomorrow, grade="대란", retail_price=7000, wholesale_price=5800, unit="30개"))
+        db.commit()
+
+        raced = []
+
+        @event.listens_for(db, "do_orm_execute")
+        def race(state):
+            if state.is_insert and not raced:
+                # Another refresh stores the same (grade, date) rows first
+                raced.append(True)
+                other = TestSession()
+                try:
+                    refresh_features(other, "대란", since=tomorrow)
+                finally:
+                    other.close()
+
+        assert refresh_features(db, "대란", since=tomorrow) == 1
+        assert raced
+        assert db.query(EggPriceFeature).filter(EggPriceFeature.grade == "대란").count() == 61
+
+    def test_drops_rows_for_removed_prices(self, db, seed_prices):
+        refresh_features(db, "대란")
+        day = date.today() - timedelta(days=3)
+        db.query(EggPrice).filter(EggPrice.grade == "대란", EggPrice.date == day).delete()
+        db.commit()
+
+        update_feature_store(db, ["대란"], since=day)
+        assert db.query(EggPriceFeature).filter(EggPriceFeature.date == day).count() == 0
+
+
+class TestGetRecentFeatures:
+    def test_returns_last_n_rows_oldest_first(self, db, seed_prices):
+        frames = get_recent_features(db, ["대란"], n=30)
+
+        df = frames["대란"]
+        assert len(df) == 30
+        assert list(df.columns) == ["date"] + FEATURE_COLUMNS
+        assert df["date"].is_monotonic_increasing
+        assert df["date"].iloc[-1].date() == date.today()
+
+    def test_catches_up_when_prices_are_newer(self, db, seed_prices):
+        refresh_features(db, "대란")
+        tomorrow = date.today() + timedelta(days=1)
+        db.add(EggPrice(date=tomorrow, grade="대란", retail_price=7000, wholesale_price=5800, unit="30개"))
+        db.commit()
+
+        df = get_recent_features(db, ["대란"], n=5)["대란"]
+        assert df["date"].iloc[-1].date() == tomorrow
+        assert df["price"].iloc[-1] == 7000
+
+    def test_omits_grades_without_prices(self, db, seed_prices):
+        assert set(get_recent_features(db, ["대란", "왕란"])) == {"대란"}
@@ -1,11 +1,32 @@
 """Tests for EggPriceLSTM model architecture and MC Dropout inference."""
 
 import numpy as np
+import pandas as pd
 import torch
 import pytest
 
-from app.ml.model import EggPriceLSTM
-from app.ml.predict import _enable_mc_dropout, CI_Z_SCORE, MC_DROPOUT_PASSES
+from app.ml.model import QUANTILES, EggPriceLSTM, pinball_loss
+from app.ml.predict import (
+    _enable_mc_dropout,
+    _quantile_interval,
+    mc_dropout_predict,
+    quantile_predict,
+    CI_Z_SCORE,
+    MC_DROPOUT_PASSES,
+)
+from app.ml.preprocessing import PriceScaler, build_features
+
+
+def _fitted_scaler() -> PriceScaler:
+    """PriceScaler fitted on a synthetic price series."""
+    n = 120
+    df = build_features(pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="D"),
+        "retail_price": np.linspace(6000, 6500, n),
+    }))
+    scaler = PriceScaler()
+    scaler.fit_transform(df)
+    return scaler
 
 
 class TestEggPriceLSTM:
@@ -125,6 +146,45 @@ class TestMCDropout:
         # With dropout active, there should be non-trivial variance
         assert (stds > 0).any(), "MC Dropout should produce variance in outputs"
 
+    def test_batched_mc_dropout_shape(self):
+        """Batched MC Dropout should return one row per pass on price scale."""
+        model = EggPriceLSTM()
+        scaler = _fitted_scaler()
+        x = torch.randn(1, 30, 15)
+
+        preds = mc_dropout_predict(model, x, scaler)
+        assert preds.shape == (MC_DROPOUT_PASSES, 3)
+        assert np.isfinite(preds).all()
+
+    def test_batched_mc_dropout_draws_independent_masks(self):
+        """Each tiled row should get its own dropout mask."""
+        model = EggPriceLSTM(dropout=0.3)
+        scaler = _fitted_scaler()
+        x = torch.randn(1, 30, 15)
+
+        preds = mc_dropout_predict(model, x, scaler, passes=20)
+        assert (preds.std(axis=0) > 0).any()
+
+    def test_batched_mc_dropout_leaves_module_mode_alone(self):
+        """Dropout is forced per call, so a shared eval-mode model stays in eval."""
+        model = EggPriceLSTM(dropout=0.3).eval()
+        x = torch.randn(1, 30, 15)
+
+        preds = mc_dropout_predict(model, x, _fitted_scaler(), passes=20)
+        assert (preds.std(axis=0) > 0).any()
+        assert not any(m.training for m in model.modules())
+
+    def test_batched_mc_dropout_matches_loop_without_dropout(self):
+        """With dropout=0, the batched pass must equal a single forward pass."""
+        model = EggPriceLSTM(dropout=0.0)
+        scaler = _fitted_scaler()
+        x = torch.randn(1, 30, 15)
+
+        preds = mc_dropout_predict(model, x, scaler, passes=5)
+        with torch.no_grad():
+            single = scaler.inverse_transform_targets(model(x).numpy())
+        np.testing.assert_allclose(preds, np.repeat(single, 5, axis=0), rtol=1e-5)
+
     def test_confidence_interval_math(self):
         """Verify CI calculation: mean ± z * std."""
         np.random.seed(42)
@@ -142,3 +202,51 @@ class TestMCDropout:
         expected_width = 2 * CI_Z_SCORE * std
         actual_width = upper - lower
         np.testing.assert_allclose(actual_width, expected_width, atol=1e-10)
+
+
+class TestQuantileHead:
+    def test_output_shape(self):
+        model = EggPriceLSTM(quantiles=QUANTILES)
+        out = model(torch.randn(4, 30, 15))
+        assert out.shape == (4, 3, 3)
+        assert model.point(out).shape == (4, 3)
+        torch.testing.assert_close(model.point(out), out[..., 1])
+
+    def test_point_is_identity_for_point_head(self):
+        model = EggPriceLSTM()
+        out = model(torch.randn(2, 30, 15))
+        assert model.point(out) is out
+
+    def test_pinball_loss(self):
+        target = torch.tensor([[1.0]])
+        preds = torch.tensor([[[0.0, 1.0, 2.0]]])  # under, exact, over
+        # q=0.05 under by 1 → 0.05; q=0.5 exact → 0; q=0.95 over by 1 → 0.05
+        expected = (0.05 + 0.0 + 0.05) / 3
+        assert pinball_loss(preds, target, QUANTILES).item() == pytest.approx(expected)
+
+    def test_quantile_predict_shape(self):
+        model = EggPriceLSTM(quantiles=QUANTILES)
+        preds = quantile_predict(model, torch.randn(1, 30, 15), _fitted_scaler())
+        assert preds.shape == (3, 3)
+
+    def test_quantile_predict_ignores_train_mode(self):
+        model = EggPriceLSTM(dropout=0.5, quantiles=QUANTILES).train()
+        scaler = _fitted_scaler()
+        x = torch.randn(1, 30, 15)
+        np.testing.assert_array_equal(
+            quantile_predict(model, x, scaler), quantile_predict(model, x, scaler)
+        )
+
+    def test_mc_dropout_uses_median(self):
+        model = EggPriceLSTM(dropout=0.0, quantiles=QUANTILES)
+        scaler = _fitted_scaler()
+        x = torch.randn(1, 30, 15)
+
+        preds = mc_dropout_predict(model, x, scaler, passes=2)
+        expected = quantile_predict(model, x, scaler)[:, 1]
+        np.testing.assert_allclose(preds[0], expected, rtol=1e-5)
+
+    def test_interval_sorts_crossed_quantiles(self):
+        preds = np.array([[6100.0, 6000.0, 5900.0]] * 3)
+        center, lower, upper = _quantile_interval(preds, QUANTILES)
+        assert (lower == 5900.0).all() and (center == 6000.0).all() and (upper == 6100.0).all()
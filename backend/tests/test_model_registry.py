@@ -0,0 +1,111 @@
+"""Tests for the in-process model registry."""
+
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+import torch
+
+from app.core.config import settings
+from app.ml.model import EggPriceLSTM
+from app.ml.preprocessing import PriceScaler
+from app.ml.registry import ModelRegistry, int8_marker_path, load_from_disk, model_paths
+
+
+def _write_model(models_dir, grade: str, version: str):
+    model_path, scaler_path = model_paths(grade, version, models_dir)
+    torch.save(EggPriceLSTM().state_dict(), model_path)
+    with open(scaler_path, "wb") as f:
+        pickle.dump(PriceScaler(), f)
+    return model_path, scaler_path
+
+
+class TestModelRegistry:
+    def test_missing_model_raises(self, tmp_path):
+        registry = ModelRegistry(models_dir=tmp_path)
+        with pytest.raises(FileNotFoundError):
+            registry.get("대란", "v-test")
+
+    def test_second_get_is_served_from_memory(self, tmp_path):
+        _write_model(tmp_path, "대란", "v-test")
+        registry = ModelRegistry(models_dir=tmp_path)
+
+        model1, scaler1 = registry.get("대란", "v-test")
+        with patch("app.ml.registry.load_from_disk") as mock_load:
+            model2, scaler2 = registry.get("대란", "v-test")
+            mock_load.assert_not_called()
+
+        assert model1 is model2
+        assert scaler1 is scaler2
+
+    def test_concurrent_misses_load_once(self, tmp_path):
+        _write_model(tmp_path, "대란", "v-test")
+        registry = ModelRegistry(models_dir=tmp_path)
+
+        with (
+            patch("app.ml.registry.load_from_disk", wraps=load_from_disk) as mock_load,
+            ThreadPoolExecutor(max_workers=4) as pool,
+        ):
+            models = list(pool.map(lambda _: registry.get("대란", "v-test")[0], range(8)))
+        assert mock_load.call_count == 1
+        assert all(m is models[0] for m in models)
+
+    def test_loaded_model_is_in_eval_mode(self, tmp_path):
+        _write_model(tmp_path, "대란", "v-test")
+        model, _ = ModelRegistry(models_dir=tmp_path).get("대란", "v-test")
+        assert not model.training
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        model_path, _ = _write_model(tmp_path, "대란", "v-test")
+        registry = ModelRegistry(models_dir=tmp_path)
+        model1, _ = registry.get("대란", "v-test")
+
+        torch.save(EggPriceLSTM().state_dict(), model_path)
+        st = os.stat(model_path)
+        os.utime(model_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        model2, _ = registry.get("대란", "v-test")
+        assert model1 is not model2
+
+    def test_lru_eviction(self, tmp_path):
+        for grade in ["왕란", "특란", "대란"]:
+            _write_model(tmp_path, grade, "v-test")
+        registry = ModelRegistry(models_dir=tmp_path, max_size=2)
+
+        registry.get("왕란", "v-test")
+        registry.get("특란", "v-test")
+        registry.get("왕란", "v-test")  # 특란 becomes least recently used
+        registry.get("대란", "v-test")
+
+        assert len(registry) == 2
+        assert ("왕란", "v-test") in registry
+        assert ("특란", "v-test") not in registry
+
+    def test_invalidate_by_grade(self, tmp_path):
+        for grade in ["특란", "대란"]:
+            _write_model(tmp_path, grade, "v-test")
+        registry = ModelRegistry(models_dir=tmp_path)
+        registry.get("특란", "v-test")
+        registry.get("대란", "v-test")
+
+        registry.invalidate("대란")
+        assert ("대란", "v-test") not in registry
+        assert ("특란", "v-test") in registry
+
+        registry.invalidate()
+        assert len(registry) == 0
+
+    def test_int8_served_only_with_marker(self, tmp_path):
+        _write_model(tmp_path, "대란", "v-test")
+        registry = ModelRegistry(models_dir=tmp_path)
+
+        with patch.object(settings, "MODEL_QUANTIZE_INT8", True):
+            fp32, _ = registry.get("대란", "v-test")
+            int8_marker_path("대란", "v-test", tmp_path).write_text("{}")
+            int8, _ = registry.get("대란", "v-test")
+
+        assert isinstance(fp32.fc1, torch.nn.Linear)
+        assert isinstance(int8.fc1, torch.ao.nn.quantized.dynamic.Linear)
+        assert list(int8.parameters()) == []
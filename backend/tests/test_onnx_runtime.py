@@ -0,0 +1,138 @@
+"""Tests for ONNX export and the torch-free inference runtime."""
+
+import pickle
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import torch
+
+from app.ml.export import export_onnx
+from app.ml.model import QUANTILES, EggPriceLSTM
+from app.ml.onnx_runtime import OnnxLSTM
+from app.ml.preprocessing import PriceScaler
+from app.ml.registry import ModelRegistry, model_paths
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+
+
+@pytest.fixture
+def exported(tmp_path):
+    torch.manual_seed(0)
+    model = EggPriceLSTM()
+    path = tmp_path / "model.onnx"
+    path.write_bytes(export_onnx(model.state_dict()))
+    return model, OnnxLSTM(path)
+
+
+def _fitted_scaler() -> PriceScaler:
+    scaler = PriceScaler()
+    scaler.target_scaler.fit(np.array([[3000.0], [9000.0]]))
+    return scaler
+
+
+class TestOnnxExport:
+    def test_export_on_torch_without_dynamo_argument(self):
+        def export_2_2(model, args, f, input_names=None, output_names=None,
+                       dynamic_axes=None, opset_version=None):
+            f.write(b"graph")
+
+        with patch.object(torch.onnx, "export", export_2_2):
+            assert export_onnx(EggPriceLSTM().state_dict()) == b"graph"
+
+    def test_all_ones_masks_match_eager_eval(self, exported):
+        model, onnx_model = exported
+        x = np.random.default_rng(0).random((4, 30, 15), dtype=np.float32)
+
+        with torch.no_grad():
+            expected = model.eval()(torch.from_numpy(x)).numpy()
+        got = onnx_model.run(x, np.ones((4, 30, 64)), np.ones((4, 32)))
+
+        np.testing.assert_allclose(got, expected, atol=1e-5)
+
+    def test_masks_change_output(self, exported):
+        _, onnx_model = exported
+        x = np.random.default_rng(0).random((1, 30, 15), dtype=np.float32)
+        mask1, mask2 = onnx_model.sample_masks(1, 30, np.random.default_rng(1))
+
+        base = onnx_model.run(x, np.ones_like(mask1), np.ones_like(mask2))
+        dropped = onnx_model.run(x, mask1, mask2)
+        assert not np.allclose(base, dropped)
+
+
+class TestOnnxQuantileHead:
+    def test_quantile_predict_matches_eager(self, tmp_path):
+        torch.manual_seed(0)
+        model = EggPriceLSTM(quantiles=QUANTILES).eval()
+        path = tmp_path / "model.onnx"
+        path.write_bytes(export_onnx(model.state_dict(), QUANTILES))
+        onnx_model = OnnxLSTM(path, quantiles=QUANTILES)
+        scaler = _fitted_scaler()
+        x = np.random.default_rng(0).random((1, 30, 15), dtype=np.float32)
+
+        with torch.no_grad():
+            expected = model(torch.from_numpy(x))[0].numpy()
+        expected = scaler.inverse_transform_targets(expected.T).T
+
+        np.testing.assert_allclose(onnx_model.quantile_predict(x, scaler), expected, rtol=1e-4)
+        assert onnx_model.mc_dropout_predict(x, scaler, passes=4).shape == (4, 3)
+
+
+class TestOnnxMcDropout:
+    def test_shape_and_spread(self, exported):
+        _, onnx_model = exported
+        x = np.random.default_rng(0).random((1, 30, 15), dtype=np.float32)
+
+        preds = onnx_model.mc_dropout_predict(x, _fitted_scaler(), passes=50)
+
+        assert preds.shape == (50, 3)
+        assert (preds.std(axis=0) > 0).all()
+
+    def test_masks_are_inverted_dropout(self, exported):
+        _, onnx_model = exported
+        mask1, mask2 = onnx_model.sample_masks(2000, 30, np.random.default_rng(0))
+
+        assert set(np.unique(mask2)) <= {0.0, np.float32(1 / 0.8)}
+        assert abs(mask1.mean() - 1.0) < 0.01
+
+
+class TestRegistryOnnxRuntime:
+    def test_loads_onnx_session(self, tmp_path):
+        model_path, scaler_path = model_paths("대란", "v-test", tmp_path, runtime="onnx")
+        model_path.write_bytes(export_onnx(EggPriceLSTM().state_dict()))
+        with open(scaler_path, "wb") as f:
+            pickle.dump(PriceScaler(), f)
+
+        registry = ModelRegistry(models_dir=tmp_path)
+        model, _ = registry.get("대란", "v-test", runtime="onnx")
+        assert isinstance(model, OnnxLSTM)
+
+    def test_torch_and_onnx_entries_coexist(self, tmp_path):
+        state_dict = EggPriceLSTM().state_dict()
+        onnx_path, scaler_path = model_paths("대란", "v-test", tmp_path, runtime="onnx")
+        onnx_path.write_bytes(export_onnx(state_dict))
+        torch.save(state_dict, model_paths("대란", "v-test", tmp_path)[0])
+        with open(scaler_path, "wb") as f:
+            pickle.dump(PriceScaler(), f)
+
+        registry = ModelRegistry(models_dir=tmp_path)
+        served, _ = registry.get("대란", "v-test", runtime="onnx")
+        registry.get("대란", "v-test", runtime="torch")  # e.g. an evaluation run
+        with patch("app.ml.registry.load_from_disk") as mock_load:
+            assert registry.get("대란", "v-test", runtime="onnx")[0] is served
+            registry.get("대란", "v-test", runtime="torch")
+            mock_load.assert_not_called()
+
+    def test_missing_onnx_file_falls_back_to_torch(self, tmp_path):
+        torch.save(EggPriceLSTM().state_dict(), model_paths("대란", "v-test", tmp_path)[0])
+        with open(model_paths("대란", "v-test", tmp_path)[1], "wb") as f:
+            pickle.dump(PriceScaler(), f)
+
+        model, _ = ModelRegistry(models_dir=tmp_path).get("대란", "v-test", runtime="onnx")
+        assert isinstance(model, EggPriceLSTM)
+
+    def test_missing_onnx_file_raises(self, tmp_path):
+        registry = ModelRegistry(models_dir=tmp_path)
+        with pytest.raises(FileNotFoundError):
+            registry.get("대란", "v-test", runtime="onnx")
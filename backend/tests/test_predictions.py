@@ -1,5 +1,12 @@
 """Tests for prediction endpoints."""
 
+import threading
+from unittest.mock import MagicMock, patch
+
+from app.api import predictions
+from app.core.database import get_sessionmaker
+from app.main import app
+
 
 class TestForecast:
     def test_forecast_with_data(self, client, seed_prices, seed_predictions):
@@ -35,3 +42,59 @@ class TestPredictionsForGrade:
         assert resp.status_code == 200
         data = resp.json()
         assert data["predictions"] == []
+
+
+class TestRefreshPredictions:
+    def test_runs_off_the_event_loop(self, client):
+        threads = []
+
+        def fake_run(db):
+            threads.append(threading.current_thread().name)
+            return []
+
+        with patch.object(predictions, "run_all_predictions", side_effect=fake_run):
+            resp = client.post("/api/v1/predictions/refresh")
+
+        assert resp.status_code == 404  # no models trained
+        assert threads and threads[0].startswith("ml-worker")
+
+    def test_job_opens_and_closes_its_own_session(self, client):
+        session = MagicMock()
+        events = []
+
+        def fake_run(db):
+            events.append(("run", db, threading.current_thread().name))
+            return []
+
+        session.close.side_effect = lambda: events.append(("close", session, threading.current_thread().name))
+        app.dependency_overrides[get_sessionmaker] = lambda: lambda: session
+        with patch.object(predictions, "run_all_predictions", side_effect=fake_run):
+            client.post("/api/v1/predictions/refresh")
+
+        assert [(kind, db) for kind, db, _ in events] == [("run", session), ("close", session)]
+        assert all(thread.startswith("ml-worker") for _, _, thread in events)
+
+    def test_saturated_pool_returns_503(self, client):
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_run(db):
+            started.set()
+            release.wait(5)
+            return []
+
+        with patch.object(predictions, "run_all_predictions", side_effect=slow_run), \
+             patch("app.core.executors._ml_slots", threading.BoundedSemaphore(1)):
+            worker = threading.Thread(target=client.post, args=("/api/v1/predictions/refresh",))
+            worker.start()
+            assert started.wait(5)
+            try:
+                resp = client.post("/api/v1/predictions/refresh")
+                # Other endpoints keep answering while the refresh is in flight
+                assert client.get("/api/v1/prices/current").status_code == 200
+            finally:
+                release.set()
+                worker.join()
+
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "30"
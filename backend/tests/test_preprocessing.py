@@ -1,16 +1,24 @@
 """Tests for ML preprocessing pipeline (build_features, create_sequences, PriceScaler)."""
 
+from datetime import date, timedelta
+
 import numpy as np
 import pandas as pd
 import pytest
 
 from app.ml.preprocessing import (
     FEATURE_COLUMNS,
+    HORIZONS,
     SEQUENCE_LENGTH,
     PriceScaler,
+    SequenceDataset,
     build_features,
+    build_features_from_db,
+    build_features_from_db_for_grades,
+    build_horizon_targets,
     create_sequences,
 )
+from app.models.market_data import AvianFluStatus, TradingVolume
 
 
 def _make_price_df(n_days: int = 60) -> pd.DataFrame:
@@ -93,6 +101,69 @@ class TestBuildFeatures:
             assert not df[col].isna().any(), f"NaN found in {col}"
 
 
+class TestBuildFeaturesFromDb:
+    def test_joins_market_data_on_date(self, db, seed_prices, seed_market_data):
+        df = build_features_from_db(db, "대란")
+
+        assert len(df) == 60
+        # Market rows exist only for today: earlier rows fall back to 0, today has values
+        assert (df["volume"].iloc[:-1] == 0).all()
+        assert df["volume"].iloc[-1] == 50000.0
+        assert df["corn_price"].iloc[-1] == 350.0
+        assert df["exchange_rate"].iloc[-1] == 1320.0
+        assert df["avian_flu"].iloc[-1] == 0.0
+        assert df["temperature"].iloc[-1] == 15.0
+
+    def test_forward_fills_gaps(self, db, seed_prices):
+        start = date.today() - timedelta(days=10)
+        db.add(TradingVolume(date=start, volume_kg=42000.0))
+        db.add(AvianFluStatus(date=start, is_outbreak=True, case_count=1))
+        db.commit()
+
+        df = build_features_from_db(db, "대란")
+        assert (df["volume"].iloc[-11:] == 42000.0).all()
+        assert (df["avian_flu"].iloc[-11:] == 1.0).all()
+        assert (df["avian_flu"].iloc[:-11] == 0.0).all()
+
+    def test_missing_grade_raises(self, db, seed_prices):
+        with pytest.raises(ValueError):
+            build_features_from_db(db, "왕란")
+
+    def test_multi_grade_matches_single(self, db, seed_all_grades, seed_market_data):
+        frames = build_features_from_db_for_grades(db, ["특란", "소란"])
+        assert set(frames) == {"특란", "소란"}
+        for grade, df in frames.items():
+            single = build_features_from_db(db, grade)
+            pd.testing.assert_frame_equal(df[FEATURE_COLUMNS], single[FEATURE_COLUMNS])
+
+
+class TestBuildHorizonTargets:
+    def test_matches_per_row_loop(self):
+        price = np.random.uniform(5000, 7000, 100)
+        targets = build_horizon_targets(price)
+
+        expected = np.full((100, 3), np.nan)
+        for i in range(100):
+            for j, h in enumerate(HORIZONS):
+                if i + h < 100:
+                    expected[i, j] = price[i + h]
+        np.testing.assert_array_equal(targets, expected)
+
+    def test_arbitrary_horizons(self):
+        price = np.arange(10, dtype=float)
+        targets = build_horizon_targets(price, horizons=[1, 3])
+
+        assert targets.shape == (10, 2)
+        assert targets[0, 0] == 1.0
+        assert targets[0, 1] == 3.0
+        assert np.isnan(targets[9, 0])
+        assert np.isnan(targets[7:, 1]).all()
+
+    def test_horizon_longer_than_series(self):
+        targets = build_horizon_targets(np.arange(5, dtype=float), horizons=[7])
+        assert np.isnan(targets).all()
+
+
 class TestCreateSequences:
     def test_output_shapes_with_targets(self):
         n, f = 100, 15
@@ -140,6 +211,56 @@ class TestCreateSequences:
         assert y.dtype == np.float32
 
 
+    def test_matches_explicit_slicing(self):
+        """Strided windows should equal the straightforward slice-per-window result."""
+        features = np.random.randn(80, 4).astype(np.float32)
+        targets = np.random.randn(80, 3).astype(np.float32)
+        sl = 12
+        X, y = create_sequences(features, targets, seq_length=sl)
+
+        expected_X = np.array([features[i : i + sl] for i in range(80 - sl)])
+        expected_y = np.array([targets[i + sl] for i in range(80 - sl)])
+        np.testing.assert_array_equal(X, expected_X)
+        np.testing.assert_array_equal(y, expected_y)
+
+    def test_windows_share_memory_with_features(self):
+        """float32 input should be windowed without copying."""
+        features = np.random.randn(60, 5).astype(np.float32)
+        X, _ = create_sequences(features, seq_length=10)
+        assert np.shares_memory(X, features)
+
+
+class TestSequenceDataset:
+    def test_items_match_create_sequences(self):
+        features = np.random.randn(70, 5)
+        targets = np.random.randn(70, 3)
+        X, y = create_sequences(features, targets, seq_length=10)
+        ds = SequenceDataset(features, targets, seq_length=10)
+
+        assert len(ds) == len(X)
+        for i in [0, 1, len(ds) - 1]:
+            xi, yi = ds[i]
+            np.testing.assert_array_equal(xi, X[i])
+            np.testing.assert_array_equal(yi, y[i])
+            assert xi.dtype == np.float32
+
+    def test_start_stop_split(self):
+        features = np.random.randn(70, 5)
+        targets = np.random.randn(70, 3)
+        X, y = create_sequences(features, targets, seq_length=10)
+        train = SequenceDataset(features, targets, seq_length=10, stop=48)
+        val = SequenceDataset(features, targets, seq_length=10, start=48)
+
+        assert len(train) + len(val) == len(X)
+        np.testing.assert_array_equal(val[0][0], X[48])
+        np.testing.assert_array_equal(val[-1][1], y[-1])
+
+    def test_index_out_of_range(self):
+        ds = SequenceDataset(np.zeros((20, 2)), np.zeros((20, 3)), seq_length=10)
+        with pytest.raises(IndexError):
+            ds[len(ds)]
+
+
 class TestPriceScaler:
     def _make_scaler_df(self, n: int = 100):
         df = build_features(_make_full_df(n))
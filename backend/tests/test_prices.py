@@ -1,5 +1,11 @@
 """Tests for price endpoints."""
 
+import time
+from unittest.mock import patch
+
+from app.core.cache import cache_set
+from app.core.config import settings
+
 
 class TestCurrentPrices:
     def test_current_prices_with_data(self, client, seed_all_grades):
@@ -19,6 +25,23 @@ class TestCurrentPrices:
         data = resp.json()
         assert isinstance(data, list)
 
+    def test_empty_redis_url_serves_from_db(self, client, seed_all_grades):
+        # render.yaml deploys with REDIS_URL=""
+        with patch.object(settings, "REDIS_URL", ""):
+            resp = client.get("/api/v1/prices/current")
+        assert resp.status_code == 200
+        assert len(resp.json()) == 5
+
+    def test_stale_cache_is_served_then_refreshed(self, client, seed_all_grades):
+        cache_set("prices:current", [], ttl=0)  # past its soft TTL
+        assert client.get("/api/v1/prices/current").json() == []
+
+        deadline = time.monotonic() + 2
+        while not (data := client.get("/api/v1/prices/current").json()):
+            assert time.monotonic() < deadline, "background refresh never landed"
+            time.sleep(0.02)
+        assert {item["grade"] for item in data} == {"왕란", "특란", "대란", "중란", "소란"}
+
 
 class TestPriceHistory:
     def test_price_history_default(self, client, seed_prices):
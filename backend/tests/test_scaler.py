@@ -0,0 +1,106 @@
+"""Parity tests for the NumPy MinMaxScaler / PriceScaler."""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from sklearn.preprocessing import MinMaxScaler as SkMinMaxScaler
+
+from app.ml.convert_legacy import convert_models_dir, convert_scaler
+from app.ml.model import EggPriceLSTM
+from app.ml.preprocessing import MinMaxScaler, PriceScaler, build_features
+from app.ml.registry import bundle_path, load_from_disk, model_paths
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(100, 30, (200, 5))
+    X[:, 2] = 7.0  # constant column
+    X[5, 1] = np.nan
+    return X
+
+
+def _legacy_scaler() -> PriceScaler:
+    """A PriceScaler as pickled before the NumPy scaler (sklearn inside)."""
+    n = 120
+    df = build_features(pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="D"),
+        "retail_price": 6000 + np.cumsum(np.random.default_rng(1).normal(0, 20, n)),
+    }))
+    scaler = PriceScaler()
+    scaler.feature_scaler = SkMinMaxScaler()
+    scaler.target_scaler = SkMinMaxScaler()
+    scaler.fit_transform(df)
+    return scaler, df
+
+
+class TestMinMaxScalerParity:
+    def test_fitted_attributes_match(self, data):
+        ours, theirs = MinMaxScaler().fit(data), SkMinMaxScaler().fit(data)
+        for attr in ("min_", "scale_", "data_min_", "data_max_", "data_range_"):
+            np.testing.assert_allclose(getattr(ours, attr), getattr(theirs, attr))
+        assert ours.n_features_in_ == theirs.n_features_in_
+
+    def test_transform_and_inverse_match(self, data):
+        ours, theirs = MinMaxScaler().fit(data), SkMinMaxScaler().fit(data)
+        np.testing.assert_allclose(ours.transform(data), theirs.transform(data))
+
+        scaled = np.random.default_rng(1).random((10, 5))
+        np.testing.assert_allclose(ours.inverse_transform(scaled), theirs.inverse_transform(scaled))
+
+    def test_preserves_float32(self, data):
+        x32 = data.astype(np.float32)
+        ours, theirs = MinMaxScaler().fit(x32), SkMinMaxScaler().fit(x32)
+        assert ours.transform(x32).dtype == theirs.transform(x32).dtype == np.float32
+
+    def test_does_not_modify_input(self, data):
+        before = data.copy()
+        MinMaxScaler().fit_transform(data)
+        np.testing.assert_array_equal(data, before)
+
+    def test_wrong_feature_count_raises(self, data):
+        scaler = MinMaxScaler().fit(data)
+        with pytest.raises(ValueError):
+            scaler.transform(data[:, :3])
+
+    def test_unfitted_raises(self, data):
+        with pytest.raises(ValueError):
+            MinMaxScaler().transform(data)
+
+
+class TestLegacyPickles:
+    def test_unpickles_as_numpy_scaler(self):
+        legacy, df = _legacy_scaler()
+        restored = pickle.loads(pickle.dumps(legacy))
+
+        assert isinstance(restored.feature_scaler, MinMaxScaler)
+        assert isinstance(restored.target_scaler, MinMaxScaler)
+        np.testing.assert_allclose(restored.transform_features(df), legacy.transform_features(df))
+
+    def test_convert_scaler_is_one_time(self, tmp_path):
+        legacy, _ = _legacy_scaler()
+        path = tmp_path / "scaler_대란_v-test.pkl"
+        path.write_bytes(pickle.dumps(legacy))
+
+        assert convert_scaler(path) is True
+        assert b"sklearn" not in path.read_bytes()
+        assert convert_scaler(path) is False
+
+    def test_convert_models_dir_writes_bundle(self, tmp_path):
+        legacy, df = _legacy_scaler()
+        model_path, scaler_path = model_paths("대란", "v-test", tmp_path)
+        torch.save(EggPriceLSTM().state_dict(), model_path)
+        scaler_path.write_bytes(pickle.dumps(legacy))
+
+        result = convert_models_dir(tmp_path)
+
+        assert result == {
+            "scalers": ["scaler_대란_v-test.pkl"],
+            "bundles": ["egg_price_lstm_대란_v-test.safetensors"],
+        }
+        bundle = bundle_path("대란", "v-test", tmp_path)
+        _, scaler = load_from_disk(bundle, bundle)
+        np.testing.assert_allclose(scaler.transform_features(df), legacy.transform_features(df))
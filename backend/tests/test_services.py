@@ -1,9 +1,20 @@
 """Tests for backend services (price, alert, prediction, model evaluation)."""
 
+import pickle
 from datetime import date, timedelta
 from unittest.mock import AsyncMock, patch
 
+import numpy as np
 import pytest
+import torch
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.ml.bundle import write_bundle
+from app.ml.export import export_onnx
+from app.ml.model import QUANTILES, EggPriceLSTM
+from app.ml.preprocessing import PriceScaler, build_features_from_db
+from app.ml.registry import bundle_path, model_paths, model_registry
 
 from app.models.alert import Alert
 from app.models.market_data import ModelPerformance
@@ -23,8 +34,17 @@ from app.services.model_evaluation import (
     promote_model,
     store_performance,
 )
-from app.services.prediction_service import get_predictions, run_predictions
-from app.services.price_service import get_current_prices, get_price_history
+from app.services.prediction_service import (
+    get_predictions,
+    run_all_predictions,
+    run_predictions,
+)
+from app.services.price_service import (
+    fetch_and_store_prices,
+    get_current_prices,
+    get_price_history,
+    market_tags,
+)
 
 
 # ── Price Service ─────────────────────────────────────────
@@ -83,6 +103,40 @@ class TestGetPriceHistory:
         assert result == []
 
 
+class TestFetchAndStorePrices:
+    @pytest.mark.asyncio
+    async def test_invalidates_affected_cache_tags(self, db):
+        day = date.today() - timedelta(days=2)
+        rows = [{"date": day, "grade": "대란", "retail_price": 6500, "wholesale_price": 5400}]
+        with patch("app.services.price_service.fetch_daily_prices", AsyncMock(return_value=rows)), \
+             patch("app.services.price_service.cache_invalidate") as invalidate:
+            stored = await fetch_and_store_prices(db, day)
+
+        assert len(stored) == 1
+        invalidate.assert_called_once_with(("prices", "grade:대란"), *market_tags(day))
+
+    @pytest.mark.asyncio
+    async def test_backfilled_price_refreshes_features(self, db, seed_prices):
+        day = date.today() - timedelta(days=5)
+        rows = [{"date": day, "grade": "대란", "retail_price": 9000, "wholesale_price": 5400}]
+        with patch("app.services.price_service.fetch_daily_prices", AsyncMock(return_value=rows)), \
+             patch("app.ml.feature_store.update_feature_store") as update:
+            await fetch_and_store_prices(db, date.today())
+            update.assert_called_once_with(db, ["대란"], since=day)
+
+            await fetch_and_store_prices(db, date.today(), update_features=False)
+            update.assert_called_once()
+
+    def test_market_tags_span_through_today(self):
+        today = date.today()
+        assert market_tags(today - timedelta(days=2)) == [
+            f"market:{today - timedelta(days=2)}",
+            f"market:{today - timedelta(days=1)}",
+            f"market:{today}",
+        ]
+        assert market_tags(today + timedelta(days=1)) == [f"market:{today + timedelta(days=1)}"]
+
+
 # ── Alert Service ─────────────────────────────────────────
 
 
@@ -248,6 +302,113 @@ class TestRunPredictions:
         assert result == []
 
 
+class TestRunAllPredictions:
+    @pytest.fixture()
+    def trained_model(self, db, seed_prices, tmp_path):
+        """Write an untrained model + fitted scaler for 대란 into a temp registry dir."""
+        scaler = PriceScaler()
+        scaler.fit_transform(build_features_from_db(db, "대란"))
+        model_path, scaler_path = model_paths("대란", settings.MODEL_VERSION, tmp_path)
+        torch.save(EggPriceLSTM().state_dict(), model_path)
+        with open(scaler_path, "wb") as f:
+            pickle.dump(scaler, f)
+
+        with patch.object(model_registry, "models_dir", tmp_path):
+            model_registry.invalidate()
+            yield
+        model_registry.invalidate()
+
+    def test_returns_empty_without_models(self, db, seed_prices):
+        assert run_all_predictions(db) == []
+
+    def test_predicts_grades_with_models(self, db, trained_model):
+        result = run_all_predictions(db)
+        assert [p.horizon_days for p in result] == [7, 14, 30]
+        assert all(p.grade == "대란" for p in result)
+        assert all(p.id is not None and p.created_at is not None for p in result)
+        assert all(p.confidence_lower <= p.predicted_price <= p.confidence_upper for p in result)
+
+        stored = db.query(Prediction).filter(Prediction.grade == "대란").count()
+        assert stored == 3
+
+    def test_failing_grade_does_not_drop_others(self, db, trained_model):
+        from app.ml import predict
+
+        real_load = predict.load_model
+
+        def load(grade, version=None, runtime=None):
+            if grade == "왕란":
+                raise ValueError("Bundle was trained on different features")
+            return real_load(grade, version, runtime)
+
+        with patch.object(predict, "load_model", side_effect=load):
+            result = run_all_predictions(db)
+        assert {p.grade for p in result} == {"대란"}
+
+    def test_forecast_error_is_logged_and_skipped(self, db, trained_model):
+        with patch("app.ml.predict._forecast", side_effect=RuntimeError("boom")):
+            assert run_all_predictions(db) == []
+
+    def test_feature_read_error_retries_per_grade(self, db, trained_model, tmp_path):
+        from app.ml import predict
+
+        for src, dst in zip(
+            model_paths("대란", settings.MODEL_VERSION, tmp_path),
+            model_paths("특란", settings.MODEL_VERSION, tmp_path),
+        ):
+            dst.write_bytes(src.read_bytes())
+        real_read = predict.get_recent_features
+
+        def read(session, grades):
+            if "특란" in grades:  # e.g. a failing refresh of 특란's features
+                raise OperationalError("INSERT", {}, Exception("database is locked"))
+            return real_read(session, grades)
+
+        with patch.object(predict, "get_recent_features", side_effect=read):
+            result = run_all_predictions(db)
+        assert [(p.grade, p.horizon_days) for p in result] == [("대란", 7), ("대란", 14), ("대란", 30)]
+
+    def test_invalidates_cached_predictions(self, db, trained_model):
+        with patch("app.services.prediction_service.cache_invalidate") as invalidate:
+            run_all_predictions(db)
+        invalidate.assert_called_once_with(("predictions", "grade:대란"))
+
+    def test_quantile_model_uses_quantile_interval(self, db, seed_prices, tmp_path):
+        scaler = PriceScaler()
+        scaler.fit_transform(build_features_from_db(db, "대란"))
+        path = bundle_path("대란", settings.MODEL_VERSION, tmp_path)
+        with open(path, "wb") as f:
+            model = EggPriceLSTM(quantiles=QUANTILES)
+            write_bundle(f, model.state_dict(), scaler, "대란", settings.MODEL_VERSION, QUANTILES)
+
+        with patch.object(model_registry, "models_dir", tmp_path), \
+             patch("app.ml.predict.mc_dropout_predict") as mock_mc:
+            model_registry.invalidate()
+            result = run_all_predictions(db)
+            mock_mc.assert_not_called()
+
+            with patch.object(settings, "PREDICTION_INTERVAL", "mc"):
+                mock_mc.return_value = np.full((50, 3), 6000.0)
+                run_all_predictions(db)
+                mock_mc.assert_called_once()
+        model_registry.invalidate()
+
+        assert [p.horizon_days for p in result] == [7, 14, 30]
+        assert all(p.confidence_lower <= p.predicted_price <= p.confidence_upper for p in result)
+
+    def test_onnx_runtime(self, db, trained_model, tmp_path):
+        pytest.importorskip("onnxruntime")
+        model_path, _ = model_paths("대란", settings.MODEL_VERSION, tmp_path)
+        onnx_path, _ = model_paths("대란", settings.MODEL_VERSION, tmp_path, runtime="onnx")
+        onnx_path.write_bytes(export_onnx(torch.load(model_path, weights_only=True)))
+
+        with patch.object(settings, "INFERENCE_RUNTIME", "onnx"):
+            result = run_all_predictions(db)
+
+        assert [p.horizon_days for p in result] == [7, 14, 30]
+        assert all(p.confidence_lower <= p.predicted_price <= p.confidence_upper for p in result)
+
+
 # ── Model Evaluation Service ──────────────────────────────
 
 
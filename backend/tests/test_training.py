@@ -0,0 +1,207 @@
+"""Tests for the training pipeline (app.ml.train)."""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import torch
+
+from app.core.config import settings
+from app.ml import train
+from app.ml.bundle import ModelBundle
+from app.models.price import EggPrice
+from tests.conftest import TestSession
+
+
+@pytest.fixture()
+def seed_long_prices(db):
+    """Insert 200 days of noisy price data for 대란."""
+    today = date.today()
+    rng = np.random.default_rng(0)
+    walk = 6000 + np.cumsum(rng.normal(0, 20, 200))
+    db.add_all([
+        EggPrice(
+            date=today - timedelta(days=199 - i),
+            grade="대란",
+            retail_price=float(walk[i]),
+            wholesale_price=float(walk[i] * 0.8),
+            unit="30개",
+        )
+        for i in range(200)
+    ])
+    db.commit()
+
+
+@pytest.fixture()
+def train_env(tmp_path):
+    """Point training at the test DB and a temp models dir, with few epochs."""
+    with patch.object(train, "SessionLocal", TestSession), \
+         patch.object(train, "MODELS_DIR", tmp_path), \
+         patch.object(train, "EPOCHS", 3):
+        yield tmp_path
+
+
+class TestTrainModel:
+    def test_trains_and_writes_artifacts(self, seed_long_prices, train_env):
+        report = train.train_model("대란", "v-test")
+
+        assert report["epochs_trained"] >= 1
+        assert report["train_samples"] + report["val_samples"] == report["total_samples"]
+        assert set(report["metrics"]) == {"mae", "rmse", "mape", "directional_accuracy"}
+        assert (train_env / "egg_price_lstm_대란_v-test.safetensors").exists()
+        assert not (train_env / "scaler_대란_v-test.pkl").exists()
+        assert (train_env / "egg_price_lstm_대란_v-test.onnx").exists()
+
+        with open(train_env / "training_report_대란_v-test.json", encoding="utf-8") as f:
+            report = json.load(f)
+        assert report["grade"] == "대란"
+        assert report["data_end"] == date.today().isoformat()
+
+    def test_lazy_dataset_path(self, seed_long_prices, train_env):
+        report = train.train_model("대란", "v-test", lazy=True)
+        assert report["train_samples"] + report["val_samples"] == report["total_samples"]
+
+    def test_batch_size_scales_learning_rate(self, seed_long_prices, train_env):
+        report = train.train_model("대란", "v-test", batch_size=train.BATCH_SIZE * 4)
+        assert report["batch_size"] == train.BATCH_SIZE * 4
+        assert report["learning_rate"] == pytest.approx(train.LEARNING_RATE * 4)
+
+    def test_best_weights_persisted_once(self, seed_long_prices, train_env):
+        with patch.object(train, "_save_artifacts", wraps=train._save_artifacts) as save:
+            train.train_model("대란", "v-test")
+        assert save.call_count == 1
+
+    def test_checkpoint_interval(self, seed_long_prices, train_env):
+        with patch.object(train, "_save_artifacts", wraps=train._save_artifacts) as save:
+            train.train_model("대란", "v-test", checkpoint_every=1)
+        # Every improving epoch is checkpointed; nothing left to write at the end
+        assert 1 <= save.call_count <= train.EPOCHS
+
+    def test_not_enough_data_raises(self, train_env):
+        with pytest.raises(ValueError):
+            train.train_model("대란", "v-test")
+
+
+def _fake_train_model(grade, model_version=None, batch_size=None, head=None):
+    if grade == "소란":
+        raise ValueError("Not enough data")
+    return {"grade": grade, "model_version": model_version}
+
+
+class TestQuantileTraining:
+    def test_quantile_head_recorded_in_bundle(self, seed_long_prices, train_env):
+        report = train.train_model("대란", "v-test", head="quantile")
+
+        assert report["head"] == "quantile"
+        assert report["quantiles"] == [0.05, 0.5, 0.95]
+        manifest = ModelBundle(train_env / "egg_price_lstm_대란_v-test.safetensors").manifest
+        assert manifest["head"] == "quantile"
+        assert manifest["quantiles"] == [0.05, 0.5, 0.95]
+
+    def test_unknown_head_rejected(self, train_env):
+        with pytest.raises(ValueError):
+            train.train_model("대란", "v-test", head="gaussian")
+
+
+class TestInt8Quantization:
+    def test_disabled_by_default(self, seed_long_prices, train_env):
+        report = train.train_model("대란", "v-test")
+        assert report["quantization"] is None
+        assert not (train_env / "egg_price_lstm_대란_v-test.int8.json").exists()
+
+    def test_accepted_within_tolerance(self, seed_long_prices, train_env):
+        with patch.object(settings, "MODEL_QUANTIZE_INT8", True), \
+             patch.object(settings, "MODEL_QUANTIZE_MAE_TOLERANCE", 10.0):
+            report = train.train_model("대란", "v-test")
+
+        q = report["quantization"]
+        assert q["accepted"] is True
+        assert set(q["int8"]) == {"mae", "rmse", "mape", "directional_accuracy"}
+        assert (train_env / "egg_price_lstm_대란_v-test.int8.json").exists()
+
+    def test_rejected_beyond_tolerance_clears_marker(self, seed_long_prices, train_env):
+        marker = train_env / "egg_price_lstm_대란_v-test.int8.json"
+        marker.write_text("{}")
+        worse = {"mae": 1e9, "rmse": 1e9, "mape": 100.0, "directional_accuracy": 0.0}
+        with patch.object(settings, "MODEL_QUANTIZE_INT8", True), \
+             patch("app.ml.quantize.quantize_int8", side_effect=lambda m: m), \
+             patch.object(train, "compute_metrics", side_effect=[
+                 {"mae": 1.0, "rmse": 1.0, "mape": 1.0, "directional_accuracy": 50.0},
+                 worse,
+                 {"mae": 1.0, "rmse": 1.0, "mape": 1.0, "directional_accuracy": 50.0},
+             ]):
+            report = train.train_model("대란", "v-test")
+
+        assert report["quantization"]["accepted"] is False
+        assert not marker.exists()
+
+
+    def test_retraining_without_int8_clears_stale_marker(self, seed_long_prices, train_env):
+        marker = train_env / "egg_price_lstm_대란_v-test.int8.json"
+        marker.write_text("{}")  # approved an earlier run's weights
+        train.train_model("대란", "v-test")
+        assert not marker.exists()
+
+
+class TestAtomicWrite:
+    def test_replaces_file_without_leftovers(self, tmp_path):
+        path = tmp_path / "model.pt"
+        path.write_bytes(b"old")
+        train._atomic_write(path, lambda f: f.write(b"new"))
+
+        assert path.read_bytes() == b"new"
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_failed_write_keeps_original(self, tmp_path):
+        path = tmp_path / "model.pt"
+        path.write_bytes(b"old")
+
+        def broken(f):
+            f.write(b"partial")
+            raise RuntimeError("disk full")
+
+        with pytest.raises(RuntimeError):
+            train._atomic_write(path, broken)
+        assert path.read_bytes() == b"old"
+        assert list(tmp_path.iterdir()) == [path]
+
+
+class TestIterateBatches:
+    def test_covers_every_sample_once(self):
+        X = torch.arange(10, dtype=torch.float32).reshape(10, 1)
+        y = X * 2
+        batches = list(train.iterate_batches(X, y, batch_size=4, shuffle=True))
+
+        assert [len(b[0]) for b in batches] == [4, 4, 2]
+        seen = torch.cat([b[0] for b in batches]).flatten().sort().values
+        torch.testing.assert_close(seen, X.flatten())
+        for xb, yb in batches:
+            torch.testing.assert_close(yb, xb * 2)
+
+    def test_no_shuffle_keeps_order(self):
+        X = torch.arange(6, dtype=torch.float32).reshape(6, 1)
+        batches = list(train.iterate_batches(X, X, batch_size=4))
+        torch.testing.assert_close(torch.cat([b[0] for b in batches]), X)
+
+
+class TestTrainAllGrades:
+    def test_sequential_skips_failed_grades(self):
+        with patch.object(train, "train_model", side_effect=_fake_train_model):
+            reports = train.train_all_grades("v-test", workers=1)
+
+        assert [r["grade"] for r in reports] == ["왕란", "특란", "대란", "중란"]
+
+    def test_pool_aggregates_in_grade_order(self):
+        def thread_pool(max_workers, mp_context=None, initializer=None, initargs=()):
+            return ThreadPoolExecutor(max_workers=max_workers)
+
+        with patch.object(train, "train_model", side_effect=_fake_train_model), \
+             patch.object(train, "ProcessPoolExecutor", side_effect=thread_pool) as pool_cls:
+            reports = train.train_all_grades("v-test", workers=3)
+
+        assert pool_cls.call_args.kwargs["max_workers"] == 3
+        assert [r["grade"] for r in reports] == ["왕란", "특란", "대란", "중란"]
+        assert all(r["model_version"] == "v-test" for r in reports)
@@ -0,0 +1,96 @@
+"""Tests for the hyperparameter search (app.ml.tune)."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.ml import train, tune
+from app.ml.bundle import ModelBundle
+from app.ml.registry import ModelRegistry
+from tests.conftest import TestSession
+from tests.test_training import seed_long_prices  # noqa: F401
+
+
+@pytest.fixture()
+def tune_env(tmp_path):
+    with patch.object(tune, "SessionLocal", TestSession), \
+         patch.object(train, "SessionLocal", TestSession), \
+         patch.object(train, "MODELS_DIR", tmp_path), \
+         patch.object(train, "EPOCHS", 3):
+        yield tmp_path
+
+
+class TestSampleConfigs:
+    def test_defaults_first_then_distinct(self):
+        configs = tune.sample_configs(8)
+        assert configs[0] == tune.default_config()
+        assert len({tuple(c.values()) for c in configs}) == 8
+        for config in configs[1:]:
+            assert all(config[k] in values for k, values in tune.SEARCH_SPACE.items())
+
+    def test_seeded(self):
+        assert tune.sample_configs(5, seed=3) == tune.sample_configs(5, seed=3)
+
+
+class TestShouldPrune:
+    def test_worse_than_median_is_pruned(self):
+        curves = {i: ([1.0] * 6, True) for i in range(3)}
+        curves[9] = ([2.0] * 6, False)
+        assert tune.should_prune(curves, 9, epoch=5)
+
+    def test_better_than_median_survives(self):
+        curves = {i: ([1.0] * 6, True) for i in range(3)}
+        curves[9] = ([0.5] * 6, False)
+        assert not tune.should_prune(curves, 9, epoch=5)
+
+    def test_warmup_and_min_peers(self):
+        curves = {i: ([1.0] * 6, True) for i in range(3)}
+        curves[9] = ([2.0] * 6, False)
+        assert not tune.should_prune(curves, 9, epoch=tune.PRUNE_WARMUP_EPOCHS - 2)
+        del curves[0]
+        assert not tune.should_prune(curves, 9, epoch=5)
+
+    def test_running_peer_counts_only_once_it_got_there(self):
+        curves = {0: ([1.0] * 6, True), 1: ([1.0] * 6, True), 2: ([1.0] * 2, False)}
+        curves[9] = ([2.0] * 6, False)
+        assert not tune.should_prune(curves, 9, epoch=5)
+        curves[2] = ([1.0] * 2, True)  # stopped early: its final best counts
+        assert tune.should_prune(curves, 9, epoch=5)
+
+
+class TestSearch:
+    def test_sequential_search(self, seed_long_prices, tune_env):  # noqa: F811
+        result = tune.search("대란", n_trials=3, workers=1, head="point")
+
+        assert [t["trial"] for t in result["trials"]] == [0, 1, 2]
+        assert result["best"]["best_val_loss"] == min(t["best_val_loss"] for t in result["trials"])
+        assert all(1 <= t["epochs_trained"] <= 3 for t in result["trials"])
+
+    def test_process_pool_search(self, seed_long_prices, tune_env):  # noqa: F811
+        result = tune.search("대란", n_trials=2, workers=2, head="point", epochs=1)
+        assert sorted(t["trial"] for t in result["trials"]) == [0, 1]
+
+    def test_not_enough_data_raises(self, tune_env):
+        with pytest.raises(ValueError):
+            tune.search("대란", n_trials=2, workers=1)
+
+    def test_unknown_head_rejected(self, tune_env):
+        with pytest.raises(ValueError, match="Unknown model head"):
+            tune.search("대란", head="median")
+
+    def test_winner_saved_and_trained(self, seed_long_prices, tune_env):  # noqa: F811
+        best = {**tune.default_config(), "hidden_size_1": 16, "hidden_size_2": 8, "dropout": 0.1}
+        fake = {"grade": "대란", "head": "point", "trials": [], "best": {"config": best}}
+        with patch.object(tune, "search", return_value=fake):
+            result = tune.tune_and_train("대란", "v-test")
+
+        with open(tune_env / "hyperparameters_대란_v-test.json", encoding="utf-8") as f:
+            assert json.load(f)["best"]["config"] == best
+        assert result["report"]["architecture"]["hidden_size_1"] == 16
+
+        bundle = tune_env / "egg_price_lstm_대란_v-test.safetensors"
+        assert ModelBundle(bundle).architecture["hidden_size_2"] == 8
+        model, _ = ModelRegistry(models_dir=tune_env).get("대란", "v-test", runtime="torch")
+        assert model.lstm1.hidden_size == 16
+        assert model.dropout1.p == 0.1